@@ -1,12 +1,20 @@
 import pygame
 import sys
-import json
-import math
 import os
-from datetime import datetime
-
-# Initialize pygame
-pygame.init()
+import argparse
+from functools import partial
+from usage_store import UsageStore
+from history_journal import HistoryJournal
+from history_db import HistoryDB
+from calculator_engine import CONTEXT_MODES, CONTEXT_SUGGESTIONS, NUMBER_LABELS, CalculatorSession
+from recipe import Recipe
+from ledger import load_ledger, unreadable_message
+from text_cache import TextCache
+from frame_pacer import FramePacer, IDLE_AFTER
+from hit_index import HitIndex
+from profiling import Profiler, FRAME_BUDGET
+from latency_trace import LatencyTracer
+from background_worker import BackgroundWorker
 
 # Constants - Increased width for input panel
 SCREEN_WIDTH = 950  # Increased from 700
@@ -34,202 +42,258 @@ INPUT_LABEL_COLOR = (180, 185, 200)
 ERROR_COLOR = (255, 50, 50)
 SUCCESS_COLOR = (50, 255, 100)
 HINT_COLOR = (255, 215, 0)
+DESCRIPTION_COLOR = (200, 200, 220)
+CONTEXT_HINT_COLOR = (180, 180, 220)
+INSTRUCTION_COLOR = (150, 170, 200)
+SUGGESTION_TEXT_COLOR = (200, 230, 255)
+PLACEHOLDER_COLOR = (100, 100, 120)
+RECIPE_PAGE_SIZE = 9  # Ingredient lines shown per page in the input panel
 
-# Context modes with specific colors and features
-CONTEXT_MODES = {
-    "Standard": {
-        "color": (70, 70, 90),
-        "buttons": ["C", "Del", "/", "×", "-", "+", "=", "."],
-        "description": "Basic arithmetic operations",
-        "input_fields": []  # No input fields for standard mode
-    },
-    "Homework": {
-        "color": (60, 100, 180),
-        "buttons": ["C", "Del", "√", "x²", "π", "sin", "cos", "tan"],
-        "description": "Math homework and studies",
-        "input_fields": ["Angle (deg):", "Value:"]
-    },
-    "Shopping": {
-        "color": (40, 160, 80),
-        "buttons": ["C", "Del", "%", "Tax", "Tip", "Split", "Save", "Total"],
-        "description": "Shopping and expenses",
-        "input_fields": ["Amount / original amount(fcfa):", "People:", "Tip %:", "Tax %:"]
-    },
-    "Budgeting": {
-        "color": (180, 100, 60),
-        "buttons": ["C", "Del", "%", "Avg", "Inc", "Dec", "Save", "Goal"],
-        "description": "Personal budgeting",
-        "input_fields": ["Base Amount:", "Percentage:", "Target Goal:", "Current:", "num1:", "num2:"]
-    },
-    "Cooking": {
-        "color": (200, 120, 50),
-        "buttons": ["C", "Del", "½", "⅓", "¼", "2×", "3×", "°C/°F"],
-        "description": "Cooking and recipes",
-        "input_fields": ["Amount:", "Servings:", "Temperature (°C):", "Scale Factor:"]
-    }
+# Events that count as user input and end idle mode
+INPUT_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                pygame.MOUSEWHEEL, pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT)
+
+# Hint shown in the context panel while there are no suggestions
+CONTEXT_HINTS = {
+    "Standard": "Enter numbers and operations",
+    "Homework": "Try sin(), cos(), or √ functions",
+    "Shopping": "Use input boxes for total, people, tip %",
+    "Budgeting": "Use input boxes for base, percentage, goal",
+    "Cooking": "Use input boxes for amount, servings, temperature"
 }
 
-# Create the screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Smart Context-Aware Calculator")
-clock = pygame.time.Clock()
-
-# Fonts
-display_font = pygame.font.SysFont('Arial', 40)
-button_font = pygame.font.SysFont('Arial', 26)
-small_font = pygame.font.SysFont('Arial', 18)
-context_font = pygame.font.SysFont('Arial', 16, bold=True)
-hint_font = pygame.font.SysFont('Arial', 14)
-input_font = pygame.font.SysFont('Arial', 20)
-
-# Calculator state
-current_input = ""
-previous_input = ""
-current_operator = ""
-result = None
-error_message = ""
-current_context = "Standard"
-context_history = []
-smart_suggestions = []
-last_calculation_time = 0
-calculation_pattern = []
-
-# Input panel state
-input_fields = {}
-active_input_field = None
-input_field_values = {}
+INPUT_INSTRUCTIONS = [
+    "Instructions:",
+    "1. Click a field to activate",
+    "2. Type values directly",
+    "3. Use buttons with inputs",
+    "4. Press Enter to apply"
+]
+
+# Display, clock and fonts are created by init_display() when the GUI starts
+screen = None
+clock = None
+display_font = None
+button_font = None
+small_font = None
+context_font = None
+hint_font = None
+input_font = None
+
+# Calculator state lives in a headless engine session
+session = CalculatorSession()
 
 # Context data storage
 CONTEXT_FILE = "context_data.json"
+JOURNAL_FILE = "context_journal.jsonl"
+JOURNAL_COMPACT_EVENTS = 5000  # Fold the journal into CONTEXT_FILE after this many events
+USAGE_FLUSH_INTERVAL = 5.0  # Seconds between batched writes of usage counters
+HISTORY_DB_FILE = os.environ.get("CALC_HISTORY_DB")  # Optional SQLite history, off when unset
+
+usage_store = None
+history_journal = None
+history_db = None
+
+# Rendered text surfaces, reused across frames
+text_cache = TextCache()
+
+# Disk writes and heavy jobs run here; the main loop drains results once per frame
+worker = BackgroundWorker()
+
+# Latency histograms, switched on with --profile or CALC_PROFILE
+PROFILE_FILE = "calculator_profile.json"
+PROFILED_FUNCTIONS = ("present_frame", "render_frame", "draw_display", "draw_context_panel",
+                      "draw_input_panel", "draw_buttons", "render_text", "record_operation",
+                      "on_context_change")
+profiler = Profiler()
+_profile_overlay = {"shown": False}
+
+# Input-to-photon traces, switched on with --trace or CALC_TRACE
+TRACE_FILE = "calculator_trace.jsonl"
+TRACED_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN)
+tracer = LatencyTracer()
+
+def init_display():
+    """Initialize pygame, the window and fonts"""
+    global screen, clock, display_font, button_font, small_font, context_font, hint_font, input_font
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Smart Context-Aware Calculator")
+    clock = pygame.time.Clock()
+
+    # Fonts
+    display_font = pygame.font.SysFont('Arial', 40)
+    button_font = pygame.font.SysFont('Arial', 26)
+    small_font = pygame.font.SysFont('Arial', 18)
+    context_font = pygame.font.SysFont('Arial', 16, bold=True)
+    hint_font = pygame.font.SysFont('Arial', 14)
+    input_font = pygame.font.SysFont('Arial', 20)
+
+    # Anything composed for a previous window must be drawn again
+    invalidate_chrome()
+    invalidate_frame()
+
+def render_text(font, text, color):
+    """Render anti-aliased text through the surface cache"""
+    return text_cache.render(font, text, color)
+
+def static_text_items(context):
+    """Return (font, text, color) for the labels drawn every frame in a context"""
+    items = [
+        (context_font, f"{context} Mode", TEXT_COLOR),
+        (small_font, CONTEXT_MODES[context]["description"], DESCRIPTION_COLOR),
+        (small_font, "Smart Suggestions:", HINT_COLOR),
+        (hint_font, CONTEXT_HINTS.get(context, ""), CONTEXT_HINT_COLOR),
+        (context_font, f"{context} Inputs", HINT_COLOR),
+        (input_font, "Enter value...", PLACEHOLDER_COLOR),
+        (display_font, "", TEXT_COLOR),
+        (small_font, f"Mode: {context}" + (" (exact fcfa)" if session.money_mode else ""),
+         CONTEXT_MODES[context]["color"]),
+    ]
+    items += [(small_font, mode_name, TEXT_COLOR) for mode_name in CONTEXT_MODES]
+    items += [(hint_font, suggestion, SUGGESTION_TEXT_COLOR) for suggestion in CONTEXT_SUGGESTIONS.get(context, [])]
+    items += [(small_font, label, INPUT_LABEL_COLOR) for label in CONTEXT_MODES[context]["input_fields"]]
+    items += [(hint_font, instruction, INSTRUCTION_COLOR) for instruction in INPUT_INSTRUCTIONS]
+    items += [(button_font, label, TEXT_COLOR) for label in NUMBER_LABELS + [".", "="]]
+    label_color = TEXT_COLOR if context == "Standard" else HINT_COLOR
+    items += [(button_font, label, label_color) for label in CONTEXT_MODES[context]["buttons"]]
+    return items
+
+def warm_text_cache(context):
+    """Render the static labels of a context before its first frame"""
+    text_cache.warm(static_text_items(context))
+
+def on_context_switch(calc, old_context, new_context):
+    """Pre-render the labels of the mode being switched to"""
+    warm_text_cache(new_context)
+
+def init_persistence():
+    """Load usage counters and open the history stores"""
+    global usage_store, history_journal, history_db
+
+    # Usage counters are loaded once and written behind the UI
+    usage_store = UsageStore(CONTEXT_FILE, USAGE_FLUSH_INTERVAL)
+
+    # Every operation is journaled, replaying whatever the summary does not cover yet
+    history_journal = HistoryJournal(JOURNAL_FILE, usage_store, JOURNAL_COMPACT_EVENTS,
+                                     submit=partial(worker.submit, label="Saving"))
+    session.context_history.extend(history_journal.recent)
+
+    # Full indexed history for analytics, only when a database path is configured
+    if HISTORY_DB_FILE:
+        history_db = HistoryDB(HISTORY_DB_FILE, flush_interval=USAGE_FLUSH_INTERVAL,
+                               submit=partial(worker.submit, label="Saving history"))
+
+    session.operation_listeners.append(record_operation)
+    session.context_listeners.append(on_context_change)
+    profiler.instrument(history_journal, ("maybe_compact", "compact"), prefix="history_journal.")
+
+def close_persistence():
+    """Write everything still pending and close the history stores"""
+    if history_journal is not None:
+        history_journal.close()
+    if history_db is not None:
+        history_db.close()
+
+def record_operation(calc, operation):
+    """Persist one operation recorded by the session"""
+    entry = calc.current_input[:10] if calc.current_input else ""
+    history_journal.record(operation, calc.current_context, entry)
+    if history_db is not None:
+        history_db.record(operation, calc.current_context, entry)
+
+def on_context_change(calc, old_context, new_context):
+    """Persist pending usage counters whenever the mode changes"""
+    history_journal.compact()
+
+# Button and input field layouts per (context, screen size), built once and reused
+_layout_cache = {}
+
+def cached_layout(kind, build):
+    """Return the layout of a kind for the current context, building it on first use"""
+    key = (kind, session.current_context, SCREEN_WIDTH, SCREEN_HEIGHT)
+    layout = _layout_cache.get(key)
+    if layout is None:
+        layout = _layout_cache[key] = build(session.current_context)
+    return layout
 
-def load_context_data():
-    """Load context patterns and preferences"""
-    if os.path.exists(CONTEXT_FILE):
-        try:
-            with open(CONTEXT_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {"patterns": {}, "mode_usage": {}, "preferences": {}}
-    return {"patterns": {}, "mode_usage": {}, "preferences": {}}
-
-def save_context_data(data):
-    """Save context data"""
-    with open(CONTEXT_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
-
-def initialize_input_fields():
-    """Initialize input fields for current context"""
-    global input_fields, input_field_values, active_input_field
-    
+def warm_layout_cache():
+    """Build the button, field and hit-test layouts of every context mode up front"""
+    current_context = session.current_context
+    try:
+        for mode in CONTEXT_MODES:
+            session.current_context = mode
+            get_buttons_for_context()
+            get_input_fields()
+            get_hit_index()
+    finally:
+        session.current_context = current_context
+
+def clear_layout_cache():
+    """Forget all layouts, e.g. after the window size changes"""
+    _layout_cache.clear()
+
+def get_mode_buttons():
+    """Return (mode name, rect) for the mode bar, as drawn in the context panel"""
+    return cached_layout("modes", build_mode_buttons)
+
+def build_mode_buttons(current_context):
+    """Lay out one mode button per context, centered in the left panel"""
+    btn_width = 90
+    btn_height = 30
+    spacing = 10
+    total_width = len(CONTEXT_MODES) * btn_width + (len(CONTEXT_MODES) - 1) * spacing
+    mode_x = (SCREEN_WIDTH - INPUT_PANEL_WIDTH - total_width) // 2
+
+    mode_buttons = []
+    for mode_name in CONTEXT_MODES:
+        mode_buttons.append((mode_name, pygame.Rect(mode_x, DISPLAY_HEIGHT + 60, btn_width, btn_height)))
+        mode_x += btn_width + spacing
+    return mode_buttons
+
+def get_input_fields():
+    """Return input field labels and rectangles for the current context"""
+    return cached_layout("fields", build_input_fields)
+
+def build_input_fields(current_context):
+    """Build input field labels and rectangles for a context"""
     input_fields = {}
-    input_field_values = {}
-    active_input_field = {}
-    
-    context_info = CONTEXT_MODES[current_context]
-    field_labels = context_info["input_fields"]
-    
+
     # Calculate positions for input fields
     start_x = SCREEN_WIDTH - INPUT_PANEL_WIDTH + 20
     start_y = DISPLAY_HEIGHT + 30
     field_height = 40
     field_spacing = 60
-    
-    for i, label in enumerate(field_labels):
+
+    for i, label in enumerate(CONTEXT_MODES[current_context]["input_fields"]):
         field_id = f"field_{i}"
         input_fields[field_id] = {
             "label": label,
-            "rect": pygame.Rect(start_x, start_y + i * field_spacing, INPUT_PANEL_WIDTH - 40, field_height),
-            "value": "",
-            "active": False
+            "rect": pygame.Rect(start_x, start_y + i * field_spacing, INPUT_PANEL_WIDTH - 40, field_height)
         }
-        input_field_values[field_id] = ""
-
-def detect_context_pattern():
-    """Analyze current calculation to detect context"""
-    global smart_suggestions, current_context
-    
-    # Analyze current input pattern
-    if current_input and previous_input:
-        # Shopping/Tipping pattern
-        if "Tip" in calculation_pattern or ("+" in calculation_pattern and current_input.replace('.', '').isdigit() and float(current_input) < 100):
-            if current_context != "Shopping":
-                current_context = "Shopping"
-                initialize_input_fields()
-                smart_suggestions = ["15%", "18%", "20%", "Split Bill"]
-        
-        # Percentage calculations
-        elif "%" in current_operator or ("/" in calculation_pattern and "100" in calculation_pattern):
-            if current_context != "Budgeting":
-                current_context = "Budgeting"
-                initialize_input_fields()
-                smart_suggestions = ["Increase by %", "Decrease by %", "Average", "Savings"]
-        
-        # Fraction/decimal patterns (cooking)
-        elif "." in current_input or any(x in current_input for x in ["0.25", "0.33", "0.5", "0.75"]):
-            if current_context != "Cooking":
-                current_context = "Cooking"
-                initialize_input_fields()
-                smart_suggestions = ["Double", "Half", "Convert Units", "°C to °F"]
-        
-        # Complex math patterns (homework)
-        elif any(op in calculation_pattern for op in ["sin", "cos", "tan", "√", "^"]):
-            if current_context != "Homework":
-                current_context = "Homework"
-                initialize_input_fields()
-                smart_suggestions = ["π", "e", "Solve", "Graph"]
-
-def update_context_history(operation):
-    """Update history of operations for pattern recognition"""
-    context_history.append({
-        "operation": operation,
-        "time": datetime.now().isoformat(),
-        "context": current_context,
-        "input": current_input[:10] if current_input else ""
-    })
-    
-    if len(context_history) > 20:
-        context_history.pop(0)
-    
-    calculation_pattern.append(operation)
-    if len(calculation_pattern) > 5:
-        calculation_pattern.pop(0)
-    
-    data = load_context_data()
-    if current_context not in data["mode_usage"]:
-        data["mode_usage"][current_context] = 0
-    data["mode_usage"][current_context] += 1
-    save_context_data(data)
-
-def get_input_value(field_id):
-    """Get value from input field or main display"""
-    if input_field_values.get(field_id):
-        try:
-            return float(input_field_values[field_id])
-        except:
-            return None
-    return None
-
-def set_input_value(field_id, value):
-    """Set value to input field"""
-    if field_id in input_fields:
-        input_field_values[field_id] = str(value)
+    return input_fields
 
 # Dynamic button layout based on context (fits in left panel)
 def get_buttons_for_context():
-    """Generate buttons based on current context with dynamic positioning"""
+    """Return the buttons of the current context, laid out once per context"""
+    return cached_layout("buttons", build_buttons_for_context)
+
+def build_buttons_for_context(current_context):
+    """Generate buttons for a context with dynamic positioning"""
     base_buttons = []
-    
+
     # Calculate grid dimensions (only in left panel)
     button_area_width = SCREEN_WIDTH - INPUT_PANEL_WIDTH
     button_area_y = DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT
-    
+
     num_cols = 3
     special_cols = 2
     total_cols = num_cols + special_cols
-    
+
     button_width = (button_area_width - (total_cols + 1) * BUTTON_MARGIN) // total_cols
     button_height = BUTTON_SIZE
-    
+
     # Common number buttons
     numbers = [
         {"label": "7", "x": 0, "y": 0},
@@ -244,17 +308,17 @@ def get_buttons_for_context():
         {"label": "0", "x": 0, "y": 3, "colspan": 2},
         {"label": ".", "x": 2, "y": 3},
     ]
-    
+
     for num in numbers:
         colspan = num.get("colspan", 1)
         x_pos = BUTTON_MARGIN + num["x"] * (button_width + BUTTON_MARGIN)
         y_pos = button_area_y + BUTTON_MARGIN + num["y"] * (button_height + BUTTON_MARGIN)
         width = button_width * colspan + BUTTON_MARGIN * (colspan - 1)
-        
+
         btn_type = "number"
         if num["label"] == ".":
             btn_type = "decimal"
-        
+
         base_buttons.append({
             "label": num["label"],
             "rect": pygame.Rect(x_pos, y_pos, width, button_height),
@@ -262,27 +326,27 @@ def get_buttons_for_context():
             "hover_color": BUTTON_HOVER_COLOR,
             "type": btn_type
         })
-    
+
     # Context-specific special buttons
     context = CONTEXT_MODES[current_context]
     special_buttons = context["buttons"]
-    
+
     for i, btn_label in enumerate(special_buttons[:8]):
         col = i // 4
         row = i % 4
-        
+
         x_pos = BUTTON_MARGIN * 4 + button_width * 3 + col * (button_width + BUTTON_MARGIN)
         y_pos = button_area_y + BUTTON_MARGIN + row * (button_height + BUTTON_MARGIN)
-        
+
         btn_type = f"context_{current_context.lower()}"
-        
+
         if current_context == "Standard" and btn_label in ["+", "-", "×", "/"]:
             btn_type = "operator"
         elif current_context == "Standard" and btn_label == "=":
             btn_type = "equals"
         elif current_context == "Standard" and btn_label in ["C", "Del"]:
             btn_type = btn_label.lower()
-        
+
         base_buttons.append({
             "label": btn_label,
             "rect": pygame.Rect(x_pos, y_pos, button_width, button_height),
@@ -290,11 +354,11 @@ def get_buttons_for_context():
             "hover_color": SPECIAL_HOVER_COLOR if btn_type.startswith("context_") else OPERATOR_HOVER_COLOR,
             "type": btn_type
         })
-    
+
     if current_context != "Standard" or "=" not in [b["label"] for b in base_buttons]:
         equals_x = BUTTON_MARGIN * 4 + button_width * 3 + (button_width + BUTTON_MARGIN)
         equals_y = button_area_y + BUTTON_MARGIN + 3 * (button_height + BUTTON_MARGIN)
-        
+
         base_buttons.append({
             "label": "=",
             "rect": pygame.Rect(equals_x, equals_y, button_width, button_height),
@@ -302,147 +366,185 @@ def get_buttons_for_context():
             "hover_color": OPERATOR_HOVER_COLOR,
             "type": "equals"
         })
-    
+
     return base_buttons
 
-def draw_display():
-    """Draw the calculator display area"""
+# Static chrome of the current context, composed off-screen once
+_chrome = {"key": None, "surface": None}
+
+def get_chrome():
+    """Return the pre-rendered static chrome, rebuilt on context switch or resize"""
+    show_details = panel_details() is not None
+    key = (session.current_context, SCREEN_WIDTH, SCREEN_HEIGHT, session.money_mode, show_details)
+    if _chrome["key"] != key:
+        _chrome["surface"] = build_chrome(session.current_context, show_details)
+        _chrome["key"] = key
+    return _chrome["surface"]
+
+def invalidate_chrome():
+    """Drop the pre-rendered chrome so the next frame composes it again"""
+    _chrome["key"] = None
+    _chrome["surface"] = None
+
+def build_chrome(current_context, show_details=False):
+    """Compose backgrounds, headers, separators, mode buttons and field boxes of a context"""
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    surface.fill(BACKGROUND_COLOR)
+    left_width = SCREEN_WIDTH - INPUT_PANEL_WIDTH
     context_color = CONTEXT_MODES[current_context]["color"]
+
+    # Display: background tinted with the mode color and the mode indicator
     tinted_color = (
         int(DISPLAY_COLOR[0] * 0.7 + context_color[0] * 0.3),
         int(DISPLAY_COLOR[1] * 0.7 + context_color[1] * 0.3),
         int(DISPLAY_COLOR[2] * 0.7 + context_color[2] * 0.3)
     )
-    pygame.draw.rect(screen, tinted_color, (0, 0, SCREEN_WIDTH - INPUT_PANEL_WIDTH, DISPLAY_HEIGHT))
-    
-    if previous_input:
-        prev_text = small_font.render(previous_input + (" " + current_operator if current_operator else ""), True, (180, 180, 200))
+    pygame.draw.rect(surface, tinted_color, (0, 0, left_width, DISPLAY_HEIGHT))
+    mode_label = f"Mode: {current_context}" + (" (exact fcfa)" if session.money_mode else "")
+    surface.blit(render_text(small_font, mode_label, context_color), (20, DISPLAY_HEIGHT - 30))
+
+    # Context panel: header bar, title, description and the mode bar
+    pygame.draw.rect(surface, CONTEXT_COLOR, (0, DISPLAY_HEIGHT, left_width, CONTEXT_PANEL_HEIGHT))
+    pygame.draw.rect(surface, context_color, (0, DISPLAY_HEIGHT, left_width, 35))
+
+    title = render_text(context_font, f"{current_context} Mode", TEXT_COLOR)
+    surface.blit(title, (left_width // 2 - title.get_width() // 2, DISPLAY_HEIGHT + 8))
+
+    description = render_text(small_font, CONTEXT_MODES[current_context]["description"], DESCRIPTION_COLOR)
+    surface.blit(description, (left_width // 2 - description.get_width() // 2, DISPLAY_HEIGHT + 32))
+
+    for mode_name, btn_rect in get_mode_buttons():
+        draw_mode_button(surface, mode_name, btn_rect, False)
+
+    suggestions_title = render_text(small_font, "Smart Suggestions:", HINT_COLOR)
+    surface.blit(suggestions_title, (15, DISPLAY_HEIGHT + 100))
+
+    pygame.draw.line(surface, (80, 80, 100), (0, DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT),
+                    (left_width, DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT), 2)
+
+    # Input panel: background, title, field labels and empty boxes
+    pygame.draw.rect(surface, (30, 35, 50), (left_width, 0, INPUT_PANEL_WIDTH, SCREEN_HEIGHT))
+
+    title = render_text(context_font, f"{current_context} Inputs", HINT_COLOR)
+    surface.blit(title, (left_width + 20, 10))
+
+    for field in get_input_fields().values():
+        label = render_text(small_font, field["label"], INPUT_LABEL_COLOR)
+        surface.blit(label, (field["rect"].x, field["rect"].y - 22))
+        draw_input_box(surface, field["rect"], False)
+
+    if not show_details:
+        # Usage instructions
+        y_pos = DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT + 80
+        for instruction in INPUT_INSTRUCTIONS:
+            inst_text = render_text(hint_font, instruction, INSTRUCTION_COLOR)
+            surface.blit(inst_text, (left_width + 20, y_pos + 130))
+            y_pos += 22
+
+    pygame.draw.line(surface, (60, 65, 85), (left_width, 0), (left_width, SCREEN_HEIGHT), 2)
+    return surface
+
+def blit_chrome(region):
+    """Copy the pre-rendered chrome of one region to the screen"""
+    rect = get_regions()[region]
+    screen.blit(get_chrome(), rect, rect)
+
+def draw_mode_button(surface, mode_name, btn_rect, is_hover):
+    """Draw one button of the mode bar"""
+    is_active = mode_name == session.current_context
+    color = CONTEXT_MODES[mode_name]["color"] if is_active else (60, 65, 85)
+    if is_hover and not is_active:
+        color = (min(color[0] + 30, 255), min(color[1] + 30, 255), min(color[2] + 30, 255))
+
+    pygame.draw.rect(surface, color, btn_rect, border_radius=5)
+    if is_active:
+        pygame.draw.rect(surface, (255, 255, 200), btn_rect, 2, border_radius=5)
+
+    mode_text = render_text(small_font, mode_name, TEXT_COLOR)
+    surface.blit(mode_text, mode_text.get_rect(center=btn_rect.center))
+
+def draw_input_box(surface, rect, is_active):
+    """Draw an input box with its border"""
+    box_color = INPUT_BOX_ACTIVE_COLOR if is_active else INPUT_BOX_COLOR
+    pygame.draw.rect(surface, box_color, rect, border_radius=5)
+    pygame.draw.rect(surface, INPUT_BOX_BORDER_COLOR, rect, 2, border_radius=5)
+
+def draw_display():
+    """Draw the calculator display area"""
+    blit_chrome("display")
+
+    if session.previous_input:
+        prev_text = render_text(small_font, session.previous_input + (" " + session.current_operator if session.current_operator else ""), (180, 180, 200))
         screen.blit(prev_text, (20, 20))
-    
-    display_text = current_input if not error_message else error_message
-    text_color = ERROR_COLOR if error_message else TEXT_COLOR
-    
+
+    display_text = session.display_text()
+    text_color = ERROR_COLOR if session.error_message else TEXT_COLOR
+
     if len(display_text) > 40:
         display_text = display_text[:40] + "..."
-    
-    text_surface = display_font.render(display_text, True, text_color)
+
+    text_surface = render_text(display_font, display_text, text_color)
     text_rect = text_surface.get_rect()
     text_rect.right = SCREEN_WIDTH - INPUT_PANEL_WIDTH - 20
     text_rect.centery = DISPLAY_HEIGHT // 2 + 10
     screen.blit(text_surface, text_rect)
-    
-    context_indicator = small_font.render(f"Mode: {current_context}", True, context_color)
-    screen.blit(context_indicator, (20, DISPLAY_HEIGHT - 30))
-    
-    pygame.draw.line(screen, (70, 70, 90), (0, DISPLAY_HEIGHT), (SCREEN_WIDTH - INPUT_PANEL_WIDTH, DISPLAY_HEIGHT), 2)
+
+    # Background jobs still running, instead of a frozen window
+    pending = worker.pending_labels()
+    if pending:
+        pending_text = render_text(small_font, pending[0] + "...", HINT_COLOR)
+        screen.blit(pending_text, (SCREEN_WIDTH - INPUT_PANEL_WIDTH - pending_text.get_width() - 20, 20))
 
 def draw_context_panel():
     """Draw the smart context panel"""
-    pygame.draw.rect(screen, CONTEXT_COLOR, (0, DISPLAY_HEIGHT, SCREEN_WIDTH - INPUT_PANEL_WIDTH, CONTEXT_PANEL_HEIGHT))
-    
-    mode_color = CONTEXT_MODES[current_context]["color"]
-    pygame.draw.rect(screen, mode_color, (0, DISPLAY_HEIGHT, SCREEN_WIDTH - INPUT_PANEL_WIDTH, 35))
-    
-    title = context_font.render(f"{current_context} Mode", True, TEXT_COLOR)
-    screen.blit(title, ((SCREEN_WIDTH - INPUT_PANEL_WIDTH) // 2 - title.get_width() // 2, DISPLAY_HEIGHT + 8))
-    
-    description = small_font.render(CONTEXT_MODES[current_context]["description"], True, (200, 200, 220))
-    screen.blit(description, ((SCREEN_WIDTH - INPUT_PANEL_WIDTH) // 2 - description.get_width() // 2, DISPLAY_HEIGHT + 32))
-    
-    btn_width = 90
-    btn_height = 30
-    spacing = 10
-    total_width = len(CONTEXT_MODES) * btn_width + (len(CONTEXT_MODES) - 1) * spacing
-    mode_x = (SCREEN_WIDTH - INPUT_PANEL_WIDTH - total_width) // 2
-    
-    for i, (mode_name, mode_info) in enumerate(CONTEXT_MODES.items()):
-        is_active = mode_name == current_context
-        
-        btn_rect = pygame.Rect(mode_x, DISPLAY_HEIGHT + 60, btn_width, btn_height)
-        color = mode_info["color"] if is_active else (60, 65, 85)
-        hover_color = (min(color[0] + 30, 255), min(color[1] + 30, 255), min(color[2] + 30, 255))
-        
-        mouse_pos = pygame.mouse.get_pos()
-        is_hover = btn_rect.collidepoint(mouse_pos) and not is_active
-        
-        btn_color = hover_color if is_hover else color
-        pygame.draw.rect(screen, btn_color, btn_rect, border_radius=5)
-        
-        if is_active:
-            pygame.draw.rect(screen, (255, 255, 200), btn_rect, 2, border_radius=5)
-        
-        mode_text = small_font.render(mode_name, True, TEXT_COLOR)
-        text_rect = mode_text.get_rect(center=btn_rect.center)
-        screen.blit(mode_text, text_rect)
-        
-        mode_x += btn_width + spacing
-    
+    blit_chrome("context")
+
+    # Only the hovered mode button differs from the chrome
+    hovered = hovered_mode()
+    if hovered is not None and hovered != session.current_context:
+        draw_mode_button(screen, hovered, dict(get_mode_buttons())[hovered], True)
+
     suggestion_y = DISPLAY_HEIGHT + 100
-    suggestions_title = small_font.render("Smart Suggestions:", True, HINT_COLOR)
-    screen.blit(suggestions_title, (15, suggestion_y))
-    
-    if smart_suggestions:
+    if session.smart_suggestions:
         suggestion_x = 15
-        for suggestion in smart_suggestions[:4]:
+        for suggestion in session.smart_suggestions[:4]:
             suggestion_bg = pygame.Rect(suggestion_x, suggestion_y + 25, 100, 25)
             pygame.draw.rect(screen, (60, 65, 90), suggestion_bg, border_radius=4)
-            
-            suggestion_text = hint_font.render(suggestion, True, (200, 230, 255))
+
+            suggestion_text = render_text(hint_font, suggestion, SUGGESTION_TEXT_COLOR)
             text_rect = suggestion_text.get_rect(center=suggestion_bg.center)
             screen.blit(suggestion_text, text_rect)
-            
+
             suggestion_x += 105
     else:
-        hints = {
-            "Standard": "Enter numbers and operations",
-            "Homework": "Try sin(), cos(), or √ functions",
-            "Shopping": "Use input boxes for total, people, tip %",
-            "Budgeting": "Use input boxes for base, percentage, goal",
-            "Cooking": "Use input boxes for amount, servings, temperature"
-        }
-        hint = hints.get(current_context, "")
-        hint_text = hint_font.render(hint, True, (180, 180, 220))
+        hint = CONTEXT_HINTS.get(session.current_context, "")
+        hint_text = render_text(hint_font, hint, CONTEXT_HINT_COLOR)
         screen.blit(hint_text, (15, suggestion_y + 30))
-    
-    if calculation_pattern:
-        pattern_text = hint_font.render(f"Pattern: {', '.join(calculation_pattern[-3:])}", True, (150, 200, 255))
+
+    if len(session.pattern):
+        pattern_text = render_text(hint_font, f"Pattern: {', '.join(session.pattern.recent(3))}", (150, 200, 255))
         screen.blit(pattern_text, (SCREEN_WIDTH - INPUT_PANEL_WIDTH - pattern_text.get_width() - 15, suggestion_y + 30))
-    
-    pygame.draw.line(screen, (80, 80, 100), (0, DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT), 
-                    (SCREEN_WIDTH - INPUT_PANEL_WIDTH, DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT), 2)
 
 def draw_input_panel():
     """Draw the right-side input panel with fields for context-specific values"""
-    # Input panel background
-    pygame.draw.rect(screen, (30, 35, 50), (SCREEN_WIDTH - INPUT_PANEL_WIDTH, 0, INPUT_PANEL_WIDTH, SCREEN_HEIGHT))
-    
-    # Panel title
-    title = context_font.render(f"{current_context} Inputs", True, HINT_COLOR)
-    screen.blit(title, (SCREEN_WIDTH - INPUT_PANEL_WIDTH + 20, 10))
-    
-    # Draw input fields
-    for field_id, field in input_fields.items():
-        # Draw label
-        label = small_font.render(field["label"], True, INPUT_LABEL_COLOR)
-        screen.blit(label, (field["rect"].x, field["rect"].y - 22))
-        
-        # Draw input box
-        is_active = (field_id == active_input_field)
-        box_color = INPUT_BOX_ACTIVE_COLOR if is_active else INPUT_BOX_COLOR
-        pygame.draw.rect(screen, box_color, field["rect"], border_radius=5)
-        pygame.draw.rect(screen, INPUT_BOX_BORDER_COLOR, field["rect"], 2, border_radius=5)
-        
-        # Draw value
-        value = input_field_values.get(field_id, "")
+    blit_chrome("inputs")
+
+    # Field labels and empty boxes come from the chrome; draw focus and values
+    for field_id, field in get_input_fields().items():
+        is_active = (field_id == session.active_input_field)
+        if is_active:
+            draw_input_box(screen, field["rect"], True)
+
+        value = session.input_field_values.get(field_id, "")
         if not value and not is_active:
             value = "Enter value..."
-            color = (100, 100, 120)
+            color = PLACEHOLDER_COLOR
         else:
             color = TEXT_COLOR
-        
-        value_surface = input_font.render(value, True, color)
+
+        value_surface = render_text(input_font, value, color)
         value_rect = value_surface.get_rect(midleft=(field["rect"].x + 10, field["rect"].centery))
-        
+
         # Handle overflow
         if value_surface.get_width() > field["rect"].width - 20:
             # Scroll text
@@ -450,696 +552,337 @@ def draw_input_panel():
             if is_active:
                 offset = max(0, text_width - field["rect"].width + 20)
                 value_rect.x -= offset
-        
+
         screen.blit(value_surface, value_rect)
-    
-    # Draw usage instructions
-    instructions = [
-        "Instructions:",
-        "1. Click a field to activate",
-        "2. Type values directly",
-        "3. Use buttons with inputs",
-        "4. Press Enter to apply"
-    ]
-    
-    y_pos = DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT + 80
-    for instruction in instructions:
-        inst_text = hint_font.render(instruction, True, (150, 170, 200))
-        screen.blit(inst_text, (SCREEN_WIDTH - INPUT_PANEL_WIDTH + 20, y_pos + 130))
-        y_pos += 22
-    
-    # Draw separator
-    pygame.draw.line(screen, (60, 65, 85), (SCREEN_WIDTH - INPUT_PANEL_WIDTH, 0), 
-                    (SCREEN_WIDTH - INPUT_PANEL_WIDTH, SCREEN_HEIGHT), 2)
+
+    details = panel_details()
+    if details is not None:
+        details()
+
+def panel_details():
+    """Return the function drawing a recipe or ledger below the fields, or None"""
+    if session.current_context == "Cooking" and session.recipe is not None:
+        return draw_recipe
+    if session.current_context == "Budgeting" and session.ledger is not None:
+        return draw_ledger
+    return None
+
+def draw_recipe():
+    """Draw the current page of the scaled recipe below the Cooking fields"""
+    lines, pages = session.recipe_lines(RECIPE_PAGE_SIZE)
+    x_pos = SCREEN_WIDTH - INPUT_PANEL_WIDTH + 20
+    y_pos = DISPLAY_HEIGHT + 30 + len(session.field_labels()) * 60
+
+    factor = session.recipe_factor()
+    header = f"{session.recipe.name} ×{round(factor, 3):g}  ({session.recipe_page + 1}/{pages})"
+    header_text = render_text(hint_font, header, HINT_COLOR)
+    screen.blit(header_text, (x_pos, y_pos))
+
+    for line in lines:
+        y_pos += 20
+        line_text = render_text(hint_font, line, SUGGESTION_TEXT_COLOR)
+        screen.blit(line_text, (x_pos, y_pos))
+
+    if pages > 1:
+        page_hint = render_text(hint_font, "PgUp/PgDn or scroll for more", INSTRUCTION_COLOR)
+        screen.blit(page_hint, (x_pos, SCREEN_HEIGHT - 24))
+
+def draw_ledger():
+    """Draw the imported ledger's aggregates below the Budgeting fields"""
+    x_pos = SCREEN_WIDTH - INPUT_PANEL_WIDTH + 20
+    y_pos = DISPLAY_HEIGHT + 30 + len(session.field_labels()) * 60
+
+    for i, line in enumerate(session.ledger_lines()):
+        color = HINT_COLOR if i == 0 else SUGGESTION_TEXT_COLOR
+        screen.blit(render_text(hint_font, line, color), (x_pos, y_pos))
+        y_pos += 20
+
+def submit_or_run(func, path, label, on_done, cpu=False):
+    """Run func(path) on the worker, or right away when its queue is full"""
+    if worker.submit(func, path, label=label, on_done=on_done, cpu=cpu) is not None:
+        return
+    try:
+        result = func(path)
+    except Exception as error:
+        on_done(None, error)
+    else:
+        on_done(result, None)
+
+def import_ledger(path):
+    """Aggregate a ledger in a worker process and show it in Budgeting mode once done"""
+    submit_or_run(load_ledger, path, "Importing ledger", ledger_imported, cpu=True)
+
+def ledger_imported(ledger, error):
+    """Install the aggregates from import_ledger(), or show why the ledger could not be read or used"""
+    if error is None:
+        error = unreadable_message(ledger)
+    if error is not None:
+        session.error_message = f"Ledger error: {error}"
+        return
+    session.ledger = ledger
+    if session.current_context == "Budgeting":
+        session.smart_suggestions = session.ledger_suggestions()
+
+def load_recipe(path):
+    """Read a recipe file in the background and show it in Cooking mode once loaded"""
+    submit_or_run(Recipe.load, path, "Loading recipe", recipe_loaded)
+
+def recipe_loaded(recipe, error):
+    """Install a recipe read by load_recipe(), or show why it could not be read"""
+    if error is not None:
+        session.error_message = f"Recipe error: {error}"
+        return
+    session.recipe = recipe
+    session.recipe_page = 0
+
+def turn_recipe_page(step):
+    """Move the recipe listing by step pages"""
+    if session.current_context == "Cooking" and session.recipe is not None:
+        session.recipe_page = max(0, session.recipe_page + step)
+        return True
+    return False
 
 def draw_buttons():
     """Draw all calculator buttons"""
-    buttons = get_buttons_for_context()
-    mouse_pos = pygame.mouse.get_pos()
-    
-    for button in buttons:
-        is_hover = button["rect"].collidepoint(mouse_pos)
-        color = button["hover_color"] if is_hover else button["color"]
-        
-        if button["type"].startswith("context_"):
-            context_color = CONTEXT_MODES[current_context]["color"]
-            color = (
-                int(color[0] * 0.7 + context_color[0] * 0.3),
-                int(color[1] * 0.7 + context_color[1] * 0.3),
-                int(color[2] * 0.7 + context_color[2] * 0.3)
-            )
-        
-        pygame.draw.rect(screen, color, button["rect"], border_radius=8)
-        
-        label_color = HINT_COLOR if button["type"].startswith("context_") else TEXT_COLOR
-        text_surface = button_font.render(button["label"], True, label_color)
-        text_rect = text_surface.get_rect(center=button["rect"].center)
-        screen.blit(text_surface, text_rect)
-        
-        if button["label"] in smart_suggestions:
-            pygame.draw.rect(screen, HINT_COLOR, button["rect"], 3, border_radius=8)
+    screen.fill(BACKGROUND_COLOR, get_regions()["buttons"])
+    hovered = hovered_button()
+    for index, button in enumerate(get_buttons_for_context()):
+        draw_button(button, index == hovered)
+
+def draw_button(button, is_hover):
+    """Draw one calculator button, highlighted when hovered or suggested"""
+    color = button["hover_color"] if is_hover else button["color"]
+
+    if button["type"].startswith("context_"):
+        context_color = CONTEXT_MODES[session.current_context]["color"]
+        color = (
+            int(color[0] * 0.7 + context_color[0] * 0.3),
+            int(color[1] * 0.7 + context_color[1] * 0.3),
+            int(color[2] * 0.7 + context_color[2] * 0.3)
+        )
+
+    pygame.draw.rect(screen, color, button["rect"], border_radius=8)
+
+    label_color = HINT_COLOR if button["type"].startswith("context_") else TEXT_COLOR
+    text_surface = render_text(button_font, button["label"], label_color)
+    text_rect = text_surface.get_rect(center=button["rect"].center)
+    screen.blit(text_surface, text_rect)
+
+    if button["label"] in session.smart_suggestions:
+        pygame.draw.rect(screen, HINT_COLOR, button["rect"], 3, border_radius=8)
+
+def get_regions():
+    """Return the screen regions that are redrawn independently"""
+    return cached_layout("regions", build_regions)
+
+def build_regions(current_context):
+    """Split the window into display, context panel, input panel and button area"""
+    left_width = SCREEN_WIDTH - INPUT_PANEL_WIDTH
+    # The context panel keeps the 2px separator line below it
+    buttons_y = DISPLAY_HEIGHT + CONTEXT_PANEL_HEIGHT + 2
+    return {
+        "display": pygame.Rect(0, 0, left_width, DISPLAY_HEIGHT),
+        "context": pygame.Rect(0, DISPLAY_HEIGHT, left_width, CONTEXT_PANEL_HEIGHT + 2),
+        "inputs": pygame.Rect(left_width, 0, INPUT_PANEL_WIDTH, SCREEN_HEIGHT),
+        "buttons": pygame.Rect(0, buttons_y, left_width, SCREEN_HEIGHT - buttons_y),
+    }
+
+# What each region showed when it was last drawn; empty means redraw everything
+_frame_state = {}
+
+def invalidate_frame():
+    """Make the next render_frame() redraw the whole window"""
+    _frame_state.clear()
+
+def get_hit_index():
+    """Return the grid index of every clickable widget in the current context"""
+    return cached_layout("hits", build_hit_index)
+
+def build_hit_index(current_context):
+    """Index mode buttons, calculator buttons and input fields by grid cell
+
+    Widgets are ("mode", name), ("button", index) or ("field", field_id).
+    """
+    index = HitIndex(SCREEN_WIDTH, SCREEN_HEIGHT)
+    for mode_name, rect in get_mode_buttons():
+        index.add(rect, ("mode", mode_name))
+    for i, button in enumerate(get_buttons_for_context()):
+        index.add(button["rect"], ("button", i))
+    for field_id, field in get_input_fields().items():
+        index.add(field["rect"], ("field", field_id))
+    return index
+
+def hit_test(pos):
+    """Return the widget at a screen position, or None"""
+    return get_hit_index().lookup(pos)
+
+# Widget under the mouse, updated on MOUSEMOTION only
+_hover = {"pos": None, "index": None, "widget": None}
+
+def update_hover(pos):
+    """Remember the mouse position and the widget under it"""
+    index = get_hit_index()
+    _hover["pos"] = pos
+    _hover["index"] = index
+    _hover["widget"] = index.lookup(pos) if pos is not None else None
+
+def hovered_widget():
+    """Return the hovered widget, looked up again only if the layout changed"""
+    if _hover["index"] is not get_hit_index():
+        update_hover(_hover["pos"])
+    return _hover["widget"]
+
+def hovered_mode():
+    """Return the name of the mode button under the mouse, or None"""
+    widget = hovered_widget()
+    return widget[1] if widget and widget[0] == "mode" else None
+
+def hovered_button():
+    """Return the index of the calculator button under the mouse, or None"""
+    widget = hovered_widget()
+    return widget[1] if widget and widget[0] == "button" else None
+
+def region_states():
+    """Return, per region, everything its drawing depends on"""
+    context = session.current_context
+    suggestions = tuple(session.smart_suggestions)
+    return {
+        "display": (context, session.money_mode, session.previous_input, session.current_operator,
+                    session.display_text(), bool(session.error_message), tuple(worker.pending_labels()[:1])),
+        "context": (context, hovered_mode(), suggestions[:4], tuple(session.pattern.recent(3))),
+        "inputs": (context, session.active_input_field, tuple(sorted(session.input_field_values.items())),
+                   id(session.recipe), session.recipe_page, id(session.ledger)),
+        "buttons": (context, suggestions),
+    }
+
+def redraw_region(rect, draw, *args):
+    """Run a draw function with everything outside rect left untouched"""
+    screen.set_clip(rect)
+    try:
+        draw(*args)
+    finally:
+        screen.set_clip(None)
+
+def render_frame():
+    """Redraw only the regions whose content changed and return their rects"""
+    states = region_states()
+    regions = get_regions()
+    dirty = []
+
+    for name, draw in (("display", draw_display), ("context", draw_context_panel),
+                       ("inputs", draw_input_panel), ("buttons", draw_buttons)):
+        if states[name] != _frame_state.get(name):
+            redraw_region(regions[name], draw)
+            dirty.append(regions[name])
+
+    # Hovering only changes the button left and the button entered
+    hovered = hovered_button()
+    last_hovered = _frame_state.get("hover")
+    if regions["buttons"] not in dirty and hovered != last_hovered:
+        buttons = get_buttons_for_context()
+        for index in (last_hovered, hovered):
+            if index is not None:
+                rect = buttons[index]["rect"]
+                redraw_region(rect, screen.fill, BACKGROUND_COLOR, rect)
+                redraw_region(rect, draw_button, buttons[index], index == hovered)
+                dirty.append(rect)
+
+    _frame_state.update(states)
+    _frame_state["hover"] = hovered
+    return dirty
+
+def present_frame():
+    """Render what changed, plus the profiling overlay, and push it to the screen"""
+    tracer.frame_started()
+    dirty = render_frame()
+    if _profile_overlay["shown"]:
+        dirty.append(draw_profile_overlay())
+    tracer.frame_rendered()
+    if dirty:
+        pygame.display.update(dirty)
+    tracer.frame_presented(bool(dirty))
+    return dirty
+
+def init_profiling(path):
+    """Time the draw functions, button dispatch and persistence calls"""
+    global profiler
+    profiler = Profiler(enabled=True, path=path)
+    profiler.instrument(sys.modules[__name__], PROFILED_FUNCTIONS)
+    profiler.instrument(session, ("handle_button_click", "update_context_history"), prefix="session.")
+
+def toggle_profile_overlay():
+    """Show or hide the frame budget overlay"""
+    _profile_overlay["shown"] = not _profile_overlay["shown"]
+    if not _profile_overlay["shown"]:
+        # Whatever the overlay covered has to be drawn again
+        invalidate_frame()
+
+def draw_profile_overlay():
+    """Draw the last frame time against the frame budget and return its rect"""
+    lines = profiler.overlay_lines("present_frame")
+    line_height = hint_font.get_linesize()
+    rect = pygame.Rect(0, 0, 260, line_height * len(lines) + 8)
+    screen.fill(DISPLAY_COLOR, rect)
+    over_budget = profiler.last.get("present_frame", 0.0) > FRAME_BUDGET
+    color = ERROR_COLOR if over_budget else SUCCESS_COLOR
+    for i, line in enumerate(lines):
+        # Numbers change every frame, so these bypass the text cache
+        screen.blit(hint_font.render(line, True, color), (6, 4 + i * line_height))
+    return rect
 
 def handle_button_click(button):
     """Handle button click events for calculator buttons"""
-    global current_input, previous_input, current_operator, result, error_message, active_input_field
-    
-    button_type = button["type"]
-    button_label = button["label"]
-    
-    update_context_history(button_label)
-    
-    if error_message and button_type not in ["clear", "context_switch"]:
-        error_message = ""
-    
-    # Handle clear button
-    if button_type == "clear" or button_label == "C":
-        if active_input_field is not None:
-            # Clear only the active input field
-            input_field_values[active_input_field] = ""
-        else:
-            # Clear main display
-            current_input = ""
-            previous_input = ""
-            current_operator = ""
-            result = None
-            error_message = ""
-            smart_suggestions.clear()
-            # Also clear all input fields
-            for field_id in input_field_values:
-                input_field_values[field_id] = ""
-    
-    # Handle delete button
-    elif button_type == "del" or button_label == "Del":
-        if active_input_field is not None:
-            # Delete from active input field
-            current_value = input_field_values.get(active_input_field, "")
-            input_field_values[active_input_field] = current_value[:-1]
-        elif current_input:
-            # Delete from main display
-            current_input = current_input[:-1]
-        elif error_message:
-            error_message = ""
-    
-    # Handle numbers - type into active field or main display
-    elif button_type == "number":
-        if active_input_field is not None:
-            # Append to active input field
-            current_value = input_field_values.get(active_input_field, "")
-            input_field_values[active_input_field] = current_value + button_label
-        else:
-            # Append to main display
-            current_input += button_label
-    
-    # Handle decimal point
-    elif button_type == "decimal":
-        if active_input_field is not None:
-            # Add decimal to active input field
-            current_value = input_field_values.get(active_input_field, "")
-            if "." not in current_value:
-                if not current_value:
-                    input_field_values[active_input_field] = "0."
-                else:
-                    input_field_values[active_input_field] = current_value + "."
-        else:
-            # Add decimal to main display
-            if "." not in current_input:
-                if not current_input:
-                    current_input = "0."
-                else:
-                    current_input += "."
-    
-    # Handle operators (only for main display)
-    elif button_type == "operator":
-        if active_input_field is not None:
-            # Operators not allowed in input fields
-            # You could choose to ignore or show an error
-            # For now, let's ignore operator clicks when input field is active
-            return
-        else:
-            # Original operator logic for main display
-            if current_input:
-                if previous_input and current_operator:
-                    calculate_result()
-                    if error_message:
-                        return
-                    previous_input = str(result) if result is not None else ""
-                else:
-                    previous_input = current_input
-                
-                current_operator = button_label
-                current_input = ""
-    
-    # Handle equals (only for main display)
-    elif button_type == "equals":
-        if active_input_field is not None:
-            # Pressing equals on input field applies the value
-            # You could choose to move focus back to main display
-            # For now, let's clear the active field
-            active_input_field = None
-        else:
-            # Original equals logic for main display
-            if previous_input and current_operator and current_input:
-                calculate_result()
-                if not error_message:
-                    previous_input = ""
-                    current_operator = ""
-    
-    # Handle context-specific functions
-    elif current_context == "Shopping" and button_type.startswith("context_shopping"):
-        handle_shopping_function(button_label)
-    
-    elif current_context == "Homework" and button_type.startswith("context_homework"):
-        handle_homework_function(button_label)
-    
-    elif current_context == "Budgeting" and button_type.startswith("context_budgeting"):
-        handle_budgeting_function(button_label)
-    
-    elif current_context == "Cooking" and button_type.startswith("context_cooking"):
-        handle_cooking_function(button_label)
-    
-    detect_context_pattern()
-
-def handle_shopping_function(label):
-    """Handle shopping-specific functions using input fields"""
-    global current_input, smart_suggestions, error_message, previous_input, active_input_field 
- 
-    try:
-        if label == "Tip":
-            # Get amount from field_0 or current input
-            amount = get_input_value("field_0")
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            # Get tip percentage from field_2 or use default
-            tip_percent = get_input_value("field_2")
-            if tip_percent is None:
-                tip_percent = 15  # Default 15%
-            
-            tip_amount = amount * (tip_percent / 100)
-            total = amount + tip_amount
-            
-            current_input = str(round(total, 2))
-            smart_suggestions = [f"Tip: {tip_amount:.2f} fcfa", f"Total: {total:.2f} fcfa"]
-            set_input_value("field_0", str(amount))
-            if tip_percent != 15:
-                set_input_value("field_2", str(tip_percent))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Tax":
-            amount = get_input_value("field_0")
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            tax_percent = get_input_value("field_3")
-            if tax_percent is None:
-                tax_percent = 8  # Default 8%
-            
-            tax = amount * (tax_percent / 100)
-            total = amount + tax
-            
-            current_input = str(round(total, 2))
-            smart_suggestions = [f"Tax: fcfa{tax:.2f}", f"Total: fcfa{total:.2f}"]
-            set_input_value("field_0", str(amount))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Split":
-            total = get_input_value("field_0")
-            people = get_input_value("field_1")
-            
-            if total is None or people is None:
-                error_message = "Enter Total and People in input fields"
-                return
-            
-            if people == 0:
-                error_message = "Cannot split by 0 people"
-                return
-            
-            per_person = total / people
-            current_input = str(round(per_person, 2))
-            smart_suggestions = [f"Each pays: {per_person:.2f} fcfa"]
-            set_input_value("field_0", str(total))
-            set_input_value("field_1", str(int(people)))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Total":
-            # For shopping, calculate price * quantity
-            if previous_input and current_input:
-                try:
-                    price = float(previous_input)
-                    quantity = float(current_input)
-                    total = price * quantity
-                    current_input = str(round(total, 2))
-                    smart_suggestions = [f"Total: {total:.2f} fcfa"]
-                except:
-                    error_message = "Invalid values"
-            else:
-                error_message = "Enter price and quantity"
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Save":
-            original = get_input_value("field_0")
-            discount = current_input
-            
-            if original is None:
-                error_message = "Enter original price in Amount field"
-                return
-            
-            if not discount:
-                error_message = "Enter discount percentage"
-                return
-            
-            try:
-                discount_pct = float(discount)
-                if discount_pct < 0 or discount_pct > 100:
-                    error_message = "Discount must be 0-100%"
-                    return
-                
-                saved = original * (discount_pct / 100)
-                final_price = original - saved
-                current_input = str(round(final_price, 2))
-                smart_suggestions = [f"Saved: {saved:.2f} fcfa", f"Final: {final_price:.2f} fcfa"]
-                set_input_value("field_0", str(original))
-            except:
-                error_message = "Invalid discount"
-            # Clear active input field after operation
-            active_input_field = None
-    
-    except ValueError:
-        error_message = "Invalid number format"
-    except Exception as e:
-        error_message = f"Error: {str(e)[:30]}"
-
-def handle_homework_function(label):
-    """Handle homework-specific functions"""
-    global current_input, error_message, smart_suggestions, active_input_field 
-    
-    if label == "π":
-        current_input = str(math.pi)
-        smart_suggestions = ["e", "√", "x²", "sin()"]
-        set_input_value("field_1", str(math.pi))
-        # Clear active input field after operation
-        active_input_field = None
-    
-    elif label == "√":
-        value = get_input_value("field_1")
-        if value is None:
-            if current_input:
-                value = float(current_input)
-            else:
-                error_message = "Enter value in Value field or display"
-                return
-        
-        if value >= 0:
-            result = math.sqrt(value)
-            current_input = str(round(result, 10)).rstrip('0').rstrip('.')
-            set_input_value("field_1", str(result))
-        else:
-            error_message = "Error: Negative sqrt"
-        # Clear active input field after operation
-        active_input_field = None
-    
-    elif label == "x²":
-        value = get_input_value("field_1")
-        if value is None:
-            if current_input:
-                value = float(current_input)
-            else:
-                error_message = "Enter value in Value field or display"
-                return
-        
-        result = value ** 2
-        current_input = str(round(result, 10)).rstrip('0').rstrip('.')
-        set_input_value("field_1", str(result))
-        # Clear active input field after operation
-        active_input_field = None
-    
-    elif label in ["sin", "cos", "tan"]:
-        angle = get_input_value("field_0")
-        if angle is None:
-            if current_input:
-                angle = float(current_input)
-            else:
-                error_message = "Enter angle in Angle field or display"
-                return
-        
-        radians = math.radians(angle)
-        
-        if label == "sin":
-            result = math.sin(radians)
-        elif label == "cos":
-            result = math.cos(radians)
-        elif label == "tan":
-            if abs(math.cos(radians)) < 1e-10:
-                error_message = "Error: Undefined tan"
-                return
-            result = math.tan(radians)
-        
-        current_input = str(round(result, 10)).rstrip('0').rstrip('.')
-        smart_suggestions = ["sin", "cos", "tan", "π", "√"]
-        set_input_value("field_0", str(angle))
-        set_input_value("field_1", str(result))
-        # Clear active input field after operation
-        active_input_field = None
-    
-    elif label == "e":
-        current_input = str(math.e)
-        smart_suggestions = ["π", "ln", "log", "√"]
-        set_input_value("field_1", str(math.e))
-        # Clear active input field after operation
-        active_input_field = None
-
-def handle_budgeting_function(label):
-    """Handle budgeting-specific functions using input fields"""
-    global current_input, smart_suggestions, error_message, previous_input, active_input_field 
-    
-    try:
-        if label == "%":
-            value = get_input_value("field_1")
-            if value is None:
-                if current_input:
-                    value = float(current_input)
-                else:
-                    error_message = "Enter value in Percentage field or display"
-                    return
-            
-            current_input = str(value / 100)
-            smart_suggestions = ["Converted to decimal"]
-            set_input_value("field_1", str(value))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Inc":
-            base = get_input_value("field_0")
-            percentage = get_input_value("field_1")
-            
-            if base is None or percentage is None:
-                error_message = "Enter Base Amount and Percentage in input fields"
-                return
-            
-            increased = base * (1 + percentage/100)
-            current_input = str(round(increased, 2))
-            smart_suggestions = [f"Increased by {percentage}% to {increased:.2f}"]
-            set_input_value("field_0", str(base))
-            set_input_value("field_1", str(percentage))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Dec":
-            base = get_input_value("field_0")
-            percentage = get_input_value("field_1")
-            
-            if base is None or percentage is None:
-                error_message = "Enter Base Amount and Percentage in input fields"
-                return
-            
-            decreased = base * (1 - percentage/100)
-            current_input = str(round(decreased, 2))
-            smart_suggestions = [f"Decreased by {percentage}% to {decreased:.2f}"]
-            set_input_value("field_0", str(base))
-            set_input_value("field_1", str(percentage))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Avg":
-            # For avg, use two input values or previous and current
-            num1 = get_input_value("field_4")
-            num2 = get_input_value("field_5")
-            
-            # Check if values are in input fields first
-            if num1 is None or num2 is None:
-                # Fall back to using previous and current inputs
-                if previous_input and current_input:
-                    try:
-                        num1 = float(previous_input)
-                        num2 = float(current_input)
-                        average = (num1 + num2) / 2
-                        current_input = str(round(average, 2))
-                        smart_suggestions = ["Average calculated"]
-                    except:
-                        error_message = "Enter num1 and num2 for average"
-                else:
-                    error_message = "Enter num1 and num2 for average"
-            else:
-                # Use values from input fields
-                average = (num1 + num2) / 2
-                current_input = str(round(average, 2))
-                smart_suggestions = ["Average calculated"]
-            
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Save":
-            income = get_input_value("field_0")
-            if income is None:
-                if current_input:
-                    income = float(current_input)
-                else:
-                    error_message = "Enter income in Base Amount field or display"
-                    return
-            
-            save_10 = income * 0.10
-            save_20 = income * 0.20
-            save_30 = income * 0.30
-            
-            smart_suggestions = [
-                f"Save 10%: {save_10:.2f} fcfa",
-                f"Save 20%: {save_20:.2f} fcfa",
-                f"Save 30%: {save_30:.2f} fcfa"
-            ]
-            set_input_value("field_0", str(income))
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "Goal":
-            target = get_input_value("field_2")
-            current_saved = get_input_value("field_3")
-            
-            if target is None or current_saved is None:
-                error_message = "Enter Target Goal and Current in input fields"
-                return
-            
-            if target <= 0:
-                error_message = "Goal must be positive"
-                return
-            
-            progress = (current_saved / target) * 100
-            current_input = f"{progress:.1f}%"
-            smart_suggestions = [f"Progress: {progress:.1f}% of {target:.2f} fcfa"]
-            set_input_value("field_2", str(target))
-            set_input_value("field_3", str(current_saved))
-            # Clear active input field after operation
-            active_input_field = None
-    
-    except ValueError:
-        error_message = "Invalid number format"
-    except Exception as e:
-        error_message = f"Error: {str(e)[:30]}"
-
-def handle_cooking_function(label):
-    """Handle cooking-specific functions using input fields"""
-    global current_input, error_message, smart_suggestions, previous_input, active_input_field 
-    
-    try:
-        amount = get_input_value("field_0")
-        servings = get_input_value("field_1")
-        temperature = get_input_value("field_2")
-        scale = get_input_value("field_3")
-        
-        if label == "½":
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            current_input = str(round(amount / 2, 3)).rstrip('0').rstrip('.')
-            smart_suggestions = ["2×", "⅓", "¼"]
-            set_input_value("field_0", current_input)
-            set_input_value("field_3", "0.5")
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "⅓":
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            current_input = str(round(amount / 3, 3)).rstrip('0').rstrip('.')
-            smart_suggestions = ["½", "¼", "2×"]
-            set_input_value("field_0", current_input)
-            set_input_value("field_3", "0.333")
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "¼":
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            current_input = str(round(amount / 4, 3)).rstrip('0').rstrip('.')
-            smart_suggestions = ["½", "⅓", "2×"]
-            set_input_value("field_0", current_input)
-            set_input_value("field_3", "0.25")
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "2×":
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            current_input = str(round(amount * 2, 3)).rstrip('0').rstrip('.')
-            smart_suggestions = ["½", "⅓", "3×"]
-            set_input_value("field_0", current_input)
-            set_input_value("field_3", "2")
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "3×":
-            if amount is None:
-                if current_input:
-                    amount = float(current_input)
-                else:
-                    error_message = "Enter amount in Amount field or display"
-                    return
-            
-            current_input = str(round(amount * 3, 3)).rstrip('0').rstrip('.')
-            smart_suggestions = ["½", "⅓", "2×"]
-            set_input_value("field_0", current_input)
-            set_input_value("field_3", "3")
-            # Clear active input field after operation
-            active_input_field = None
-        
-        elif label == "°C/°F":
-            if temperature is None:
-                if current_input:
-                    temp = float(current_input)
-                else:
-                    error_message = "Enter temperature in Temperature field or display"
-                    return
-            else:
-                temp = temperature
-            
-            # Check if input might already be °F (high temp)
-            if temp > 100:  # Likely °F
-                converted = (temp - 32) * 5/9
-                current_input = f"{converted:.1f}°C"
-                smart_suggestions = ["Converted °F to °C"]
-                set_input_value("field_2", current_input)
-            else:  # Likely °C
-                converted = (temp * 9/5) + 32
-                current_input = f"{converted:.1f}°F"
-                smart_suggestions = ["Converted °C to °F"]
-                set_input_value("field_2", current_input)
-            # Clear active input field after operation
-            active_input_field = None
-    
-    except ValueError:
-        error_message = "Invalid number format"
-    except ZeroDivisionError:
-        error_message = "Cannot divide by zero"
-    except Exception as e:
-        error_message = f"Error: {str(e)[:30]}"
-
-def calculate_result():
-    """Perform calculation"""
-    global current_input, result, error_message, active_input_field
-    
-    try:
-        num1 = float(previous_input)
-        num2 = float(current_input)
-        
-        if current_operator == "+":
-            result = num1 + num2
-        elif current_operator == "-":
-            result = num1 - num2
-        elif current_operator == "×":
-            result = num1 * num2
-        elif current_operator == "/":
-            if num2 == 0:
-                error_message = "Error: Division by 0"
-                return
-            result = num1 / num2
-        
-        if result.is_integer():
-            current_input = str(int(result))
-        else:
-            current_input = str(round(result, 10)).rstrip('0').rstrip('.')
-        
-        # Clear active input field after calculation
-        active_input_field = None
-    
-    except ValueError:
-        error_message = "Error: Invalid input"
-    except Exception as e:
-        error_message = f"Error: {str(e)}"
+    tracer.dispatch_started(button["label"])
+    session.handle_button_click(button)
+    tracer.dispatched()
 
 def handle_input_field_click(mouse_pos):
     """Handle clicks on input fields"""
-    global active_input_field
-    
-    for field_id, field in input_fields.items():
-        if field["rect"].collidepoint(mouse_pos):
-            active_input_field = field_id
-            return True
-    
-    active_input_field = None
+    widget = hit_test(mouse_pos)
+    if widget and widget[0] == "field":
+        session.active_input_field = widget[1]
+        return True
+
+    session.active_input_field = None
     return False
 
+def handle_click(mouse_pos):
+    """Dispatch a left click to the input field, mode button or button under it"""
+    if handle_input_field_click(mouse_pos):
+        return
+
+    widget = hit_test(mouse_pos)
+    if widget is None:
+        return
+    kind, target = widget
+    if kind == "mode":
+        print(f"Clicked context mode: {target}")
+        session.switch_context(target)
+    elif kind == "button":
+        handle_button_click(get_buttons_for_context()[target])
+
 def handle_keypress_in_input(event):
     """Handle keyboard input for active input field"""
-    global active_input_field, input_field_values
-    
+    active_input_field = session.active_input_field
+    input_field_values = session.input_field_values
+
     if active_input_field is None:
         return False
-    
+
     if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-        # Apply the value from input field to calculator
-        value = input_field_values.get(active_input_field, "")
-        if value:
-            try:
-                # Set the current input to the field value
-                current_value = float(value)
-                # You might want to do something with this value
-                # For now, just clear the active field
-                active_input_field = None
-                return True
-            except:
-                pass
-        active_input_field = None
+        # Applying the value just moves focus back to the main display
+        session.active_input_field = None
         return True
-    
+
     elif event.key == pygame.K_BACKSPACE:
         current_value = input_field_values.get(active_input_field, "")
         input_field_values[active_input_field] = current_value[:-1]
         return True
-    
+
     elif event.key == pygame.K_ESCAPE:
-        active_input_field = None
+        session.active_input_field = None
         return True
-    
+
     elif event.unicode.isdigit() or event.unicode == '.':
         current_value = input_field_values.get(active_input_field, "")
         # Allow only one decimal point
@@ -1147,27 +890,68 @@ def handle_keypress_in_input(event):
             return True
         input_field_values[active_input_field] = current_value + event.unicode
         return True
-    
+
     elif event.unicode == '-':
         current_value = input_field_values.get(active_input_field, "")
         # Allow minus only at the beginning
         if not current_value.startswith('-'):
             input_field_values[active_input_field] = '-' + current_value
         return True
-    
+
     return False
 
+def parse_args(argv=None):
+    """Parse command-line options for the GUI"""
+    parser = argparse.ArgumentParser(description="Smart Context-Aware Calculator")
+    parser.add_argument("--recipe", help="Recipe file (CSV name,quantity,unit or JSON) to scale in Cooking mode")
+    parser.add_argument("--ledger", help="Transaction ledger (CSV or JSON lines) summarized in Budgeting mode")
+    parser.add_argument("--money", action="store_true", default=os.environ.get("CALC_MONEY_MODE") == "1",
+                        help="Exact Decimal fcfa arithmetic in Shopping and Budgeting (or CALC_MONEY_MODE=1)")
+    parser.add_argument("--idle-after", type=float, default=float(os.environ.get("CALC_IDLE_AFTER", IDLE_AFTER)),
+                        help="Seconds without input before the loop sleeps until the next event (0 disables)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_FILE, default=os.environ.get("CALC_PROFILE"),
+                        metavar="PATH",
+                        help="Record latency histograms and write p50/p95/p99 to PATH on exit "
+                             "(or CALC_PROFILE=PATH); F3 shows the frame budget, F4 writes the file now")
+    parser.add_argument("--trace", nargs="?", const=TRACE_FILE, default=os.environ.get("CALC_TRACE"),
+                        metavar="PATH",
+                        help="Append input-to-photon latency of every click and key press to PATH "
+                             "as JSON lines (or CALC_TRACE=PATH)")
+    return parser.parse_args(argv)
+
+def next_events(pacer):
+    """Poll for events, or block until the next one while idle"""
+    if not pacer.idle():
+        return pygame.event.get(), False
+
+    first = pygame.event.wait(pacer.wait_ms)
+    if first.type == pygame.NOEVENT:
+        return [], True
+    return [first] + pygame.event.get(), True
+
 # Main game loop
-def main():
-    global current_context, smart_suggestions, calculation_pattern, current_input
-    global previous_input, current_operator, result, error_message, active_input_field
-    
+def main(argv=None):
+    global tracer
     running = True
-    
-    # Load initial context data
-    load_context_data()
-    initialize_input_fields()
-    
+    args = parse_args(argv)
+    pacer = FramePacer(args.idle_after if args.idle_after > 0 else None)
+
+    if args.recipe:
+        load_recipe(args.recipe)
+    if args.ledger:
+        import_ledger(args.ledger)
+    session.money_mode = args.money
+    if args.profile:
+        init_profiling(PROFILE_FILE if args.profile == "1" else args.profile)
+    if args.trace:
+        tracer = LatencyTracer(TRACE_FILE if args.trace == "1" else args.trace)
+
+    init_display()
+    warm_layout_cache()
+    warm_text_cache(session.current_context)
+    session.context_listeners.append(on_context_switch)
+    init_persistence()
+
     print(f"\nCalculator started with screen size: {SCREEN_WIDTH}x{SCREEN_HEIGHT}")
     print("Features:")
     print("  - Left panel: Calculator buttons")
@@ -1175,44 +959,65 @@ def main():
     print("  - Click input fields to enter values")
     print("  - Press Enter to apply input field values")
     print("  - Close window to exit")
-    
+
     while running:
         # Handle events
-        for event in pygame.event.get():
+        events, was_idle = next_events(pacer)
+        for event in events:
+            # The previous event is handled once the loop comes back here
+            tracer.end_event()
+            if event.type in TRACED_EVENTS:
+                tracer.begin(pygame.event.event_name(event.type))
+            if event.type in INPUT_EVENTS:
+                pacer.note_input(woke=was_idle)
+
             if event.type == pygame.QUIT:
                 running = False
-            
+
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                invalidate_frame()
+
+            elif event.type == pygame.KEYDOWN and profiler.enabled and event.key in (pygame.K_F3, pygame.K_F4):
+                if event.key == pygame.K_F3:
+                    toggle_profile_overlay()
+                else:
+                    print(f"Profile written to {profiler.dump()}")
+
             elif event.type == pygame.KEYDOWN:
                 # Handle input field typing first
                 if handle_keypress_in_input(event):
                     continue
-                
+
                 # Keyboard support for calculator
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                elif event.key == pygame.K_PAGEDOWN:
+                    turn_recipe_page(1)
+                elif event.key == pygame.K_PAGEUP:
+                    turn_recipe_page(-1)
                 elif event.key == pygame.K_BACKSPACE:
-                    if current_input:
-                        current_input = current_input[:-1]
-                    elif error_message:
-                        error_message = ""
+                    if session.current_input:
+                        session.current_input = session.current_input[:-1]
+                    elif session.error_message:
+                        session.error_message = ""
                 elif event.key == pygame.K_c:
-                    current_input = ""
-                    previous_input = ""
-                    current_operator = ""
-                    result = None
-                    error_message = ""
-                    smart_suggestions.clear()
+                    session.clear_display()
+                    session.smart_suggestions.clear()
+                elif event.unicode in ["(", ")", "^"]:
+                    button = {"label": event.unicode, "type": "expression"}
+                    handle_button_click(button)
+                elif (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and session.expression_mode:
+                    handle_button_click({"label": "=", "type": "equals"})
                 elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                    if previous_input and current_operator and current_input:
-                        calculate_result()
-                        if not error_message:
-                            previous_input = ""
-                            current_operator = ""
+                    if session.previous_input and session.current_operator and session.current_input:
+                        session.calculate_result()
+                        if not session.error_message:
+                            session.previous_input = ""
+                            session.current_operator = ""
                 elif pygame.K_0 <= event.key <= pygame.K_9:
-                    current_input += chr(event.key)
+                    session.current_input += chr(event.key)
                 elif event.key == pygame.K_PERIOD or event.key == pygame.K_KP_PERIOD:
-                    if "." not in current_input:
-                        current_input += "."
+                    handle_button_click({"label": ".", "type": "decimal"})
                 elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
                     button = {"label": "+", "type": "operator"}
                     handle_button_click(button)
@@ -1225,71 +1030,47 @@ def main():
                 elif event.key == pygame.K_SLASH or event.key == pygame.K_KP_DIVIDE:
                     button = {"label": "/", "type": "operator"}
                     handle_button_click(button)
-            
+
+            elif event.type == pygame.WINDOWLEAVE:
+                update_hover(None)
+
+            elif event.type == pygame.MOUSEWHEEL:
+                turn_recipe_page(-event.y)
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
-                    mouse_pos = pygame.mouse.get_pos()
-                    
-                    # First check input fields
-                    if handle_input_field_click(mouse_pos):
-                        continue
-                    
-                    # Check context mode buttons
-                    mode_button_width = min(100, ((SCREEN_WIDTH - INPUT_PANEL_WIDTH) - 20) // len(CONTEXT_MODES) - 10)
-                    mode_button_height = 35
-                    mode_x = ((SCREEN_WIDTH - INPUT_PANEL_WIDTH) - (len(CONTEXT_MODES) * (mode_button_width + 10))) // 2
-                    
-                    context_switched = False
-                    for i, mode_name in enumerate(CONTEXT_MODES.keys()):
-                        btn_rect = pygame.Rect(mode_x, DISPLAY_HEIGHT + 60, mode_button_width, mode_button_height)
-                        if btn_rect.collidepoint(mouse_pos):
-                            print(f"Clicked context mode: {mode_name}")
-                            current_context = mode_name
-                            initialize_input_fields()
-                            smart_suggestions.clear()
-                            calculation_pattern.clear()
-                            
-                            current_input = ""
-                            previous_input = ""
-                            current_operator = ""
-                            result = None
-                            error_message = ""
-                            
-                            if current_context == "Shopping":
-                                smart_suggestions = ["Tip 15%", "Add Tax", "Split Bill", "Total"]
-                            elif current_context == "Homework":
-                                smart_suggestions = ["π", "√", "sin()", "cos()", "tan()"]
-                            elif current_context == "Budgeting":
-                                smart_suggestions = ["% Increase", "% Decrease", "Average", "Save"]
-                            elif current_context == "Cooking":
-                                smart_suggestions = ["½ Recipe", "2× Recipe", "Convert Units", "°C to °F"]
-                            else:
-                                smart_suggestions = []
-                            
-                            context_switched = True
-                            break
-                        mode_x += mode_button_width + 10
-                    
-                    if not context_switched:
-                        buttons = get_buttons_for_context()
-                        for button in buttons:
-                            if button["rect"].collidepoint(mouse_pos):
-                                handle_button_click(button)
-                                break
-        
-        # Draw everything
-        screen.fill(BACKGROUND_COLOR)
-        draw_display()
-        draw_context_panel()
-        draw_input_panel()
-        draw_buttons()
-        
-        # Update display
-        pygame.display.flip()
-        clock.tick(60)
-    
+                    handle_click(event.pos)
+
+            elif event.type == pygame.MOUSEMOTION:
+                update_hover(event.pos)
+
+        # Apply whatever background jobs finished since the last frame
+        worker.drain()
+
+        # Redraw and push only what changed since the last frame
+        present_frame()
+        pacer.frame_presented()
+
+        # Full frame rate while in use; idle frames are paced by event.wait()
+        if not pacer.idle():
+            clock.tick(pacer.fps)
+
+        # Fold the journal into the summary in batches instead of on every click
+        history_journal.maybe_compact()
+        if history_db is not None:
+            history_db.maybe_flush()
+
+    wake = pacer.wake_stats()
+    if wake["count"]:
+        print(f"Idle wake-ups: {wake['count']}, latency mean {wake['mean_ms']:.1f} ms, max {wake['max_ms']:.1f} ms")
+
+    close_persistence()
+    worker.shutdown()
+    tracer.close()
+    if profiler.enabled:
+        print(f"Profile written to {profiler.dump()}")
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,99 @@
+"""Background jobs for the GUI so disk writes and heavy work never block a frame
+
+I/O goes to a small thread pool and CPU-heavy jobs to a process pool started
+on first use. The process pool spawns fresh interpreters rather than forking
+a process that already runs the I/O threads. Finished jobs are put on a
+thread-safe queue that the main loop drains once per frame, so completion
+callbacks always run on the main thread. At most `max_pending` jobs may be
+queued or running; submit() returns None beyond that and the caller decides
+what to do instead.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+IO_WORKERS = 2
+MAX_PENDING_JOBS = 16
+
+
+class BackgroundWorker:
+    """Thread pool for I/O, process pool for computation, one result queue"""
+
+    def __init__(self, io_workers=IO_WORKERS, cpu_workers=None, max_pending=MAX_PENDING_JOBS):
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="calc-io")
+        self.cpu_pool = None
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.done = queue.SimpleQueue()
+        self.pending = {}  # Future -> label, in submission order
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args, label=None, on_done=None, cpu=False):
+        """Run func(*args) in the background, or return None when the queue is full
+
+        on_done(result, error) is called from drain() on the main thread.
+        """
+        if not self.slots.acquire(blocking=False):
+            return None
+        if cpu:
+            if self.cpu_pool is None:
+                # Forking once the io threads are running could copy a held lock into the child
+                self.cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            pool = self.cpu_pool
+        else:
+            pool = self.io_pool
+
+        try:
+            future = pool.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.pending[future] = label
+        future.add_done_callback(lambda finished: self._finished(finished, on_done))
+        return future
+
+    def _finished(self, future, on_done):
+        # Runs on a pool thread, or right away if the job was already done
+        self.slots.release()
+        self.done.put((future, on_done))
+
+    def drain(self, limit=None):
+        """Run the callbacks of finished jobs and return how many were handled"""
+        handled = 0
+        while limit is None or handled < limit:
+            try:
+                future, on_done = self.done.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                label = self.pending.pop(future, None)
+            error = future.exception()
+            result = None if error else future.result()
+            if on_done is not None:
+                on_done(result, error)
+            elif error is not None:
+                print(f"Background job {label or 'job'} failed: {error}")
+            handled += 1
+        return handled
+
+    def pending_labels(self):
+        """Return the labels of jobs still queued or running"""
+        with self.lock:
+            return [label for label in self.pending.values() if label]
+
+    @property
+    def busy(self):
+        return bool(self.pending)
+
+    def shutdown(self):
+        """Wait for every job, run the remaining callbacks and stop the pools"""
+        self.io_pool.shutdown(wait=True)
+        if self.cpu_pool is not None:
+            self.cpu_pool.shutdown(wait=True)
+        self.drain()
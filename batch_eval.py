@@ -0,0 +1,94 @@
+"""Re-evaluate recorded button sequences without opening a window
+
+Each input line is one session: whitespace separated button labels, pressed
+in order. Two extra token forms set up the session:
+
+    @Shopping        switch to a context mode, as if clicked in the mode bar
+    field_0=120.5    type a value into an input field
+
+Example line:  @Shopping field_0=200 field_1=4 Split
+"""
+
+import argparse
+import sys
+import time
+
+import kernels
+from calculator_engine import CONTEXT_MODES, CalculatorSession
+
+
+def read_lines(stream):
+    """Yield stripped lines, skipping blanks and # comments"""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def evaluate_line(line, money_mode=False):
+    """Run one recorded sequence and return (display text, presses)"""
+    session = CalculatorSession(money_mode=money_mode)
+    presses = 0
+    for token in line.split():
+        if token.startswith("@") and token[1:] in CONTEXT_MODES:
+            session.switch_context(token[1:])
+        elif token.startswith("field_") and "=" in token:
+            field_id, value = token.split("=", 1)
+            session.input_field_values[field_id] = value
+        else:
+            session.press(token)
+            presses += 1
+    return session.display_text(), presses
+
+
+def evaluate_lines(lines, stats, money_mode=False):
+    """Yield one result per line, counting lines and presses in stats"""
+    for line in lines:
+        text, presses = evaluate_line(line, money_mode)
+        stats["lines"] += 1
+        stats["presses"] += presses
+        yield text
+
+
+def run(stream, out, report=sys.stderr, money_mode=False):
+    """Stream every line of stream through the engine, writing results to out"""
+    stats = {"lines": 0, "presses": 0}
+    start = time.perf_counter()
+    for text in evaluate_lines(read_lines(stream), stats, money_mode):
+        out.write(text + "\n")
+    elapsed = time.perf_counter() - start
+
+    rate = stats["presses"] / elapsed if elapsed > 0 else 0.0
+    cache = kernels.cache_stats()["total"]
+    if report is not None:
+        print(f"{stats['lines']} sequences, {stats['presses']} presses in {elapsed:.2f}s "
+              f"({rate:,.0f} presses/s)", file=report)
+        print(f"kernel cache: {cache['hits']} hits, {cache['misses']} misses, "
+              f"{cache['evictions']} evictions", file=report)
+    stats["kernel_cache"] = cache
+    stats["seconds"] = elapsed
+    stats["presses_per_second"] = rate
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate recorded calculator sessions, one per line")
+    parser.add_argument("input", help="File of button sequences, or - for stdin")
+    parser.add_argument("-o", "--output", help="Write results here instead of stdout")
+    parser.add_argument("--money", action="store_true", help="Exact Decimal money mode for Shopping and Budgeting")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = sys.stdout if not args.output else open(args.output, "w", encoding="utf-8")
+    try:
+        run(stream, out, money_mode=args.money)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Measure the cost of dispatching a press through the operation registry
+
+Run with:  python benchmarks/bench_dispatch.py [presses]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator_engine import BUTTON_HANDLERS, LABEL_BUTTON_TYPES, CONTEXT_MODES, CalculatorSession, button_type_for
+from operations import OPERATIONS
+
+# Field values that make every context operation succeed
+FIELDS = {
+    "Shopping": {"field_0": "120", "field_1": "4", "field_2": "15", "field_3": "8"},
+    "Homework": {"field_0": "30", "field_1": "16"},
+    "Budgeting": {"field_0": "1000", "field_1": "10", "field_2": "5000", "field_3": "1200",
+                  "field_4": "10", "field_5": "20"},
+    "Cooking": {"field_0": "250", "field_1": "4", "field_2": "180", "field_3": "1"},
+}
+
+
+def resolve(context, label, button_type):
+    """The lookup done for every press: core type first, then the registry"""
+    handler = BUTTON_HANDLERS.get(LABEL_BUTTON_TYPES.get(label, button_type))
+    if handler is None:
+        handler = OPERATIONS.get((context, label))
+    return handler
+
+
+def main(count=100000):
+    results = {}
+    print(f"{count:,} presses per context")
+    print(f"{'Context':<10} {'dispatch (us)':>14} {'full press (us)':>16}")
+    for context, fields in FIELDS.items():
+        presses = [(label, button_type_for(context, label)) for label in CONTEXT_MODES[context]["buttons"]
+                   if label not in LABEL_BUTTON_TYPES]
+        sequence = [presses[i % len(presses)] for i in range(count)]
+
+        start = time.perf_counter()
+        for label, button_type in sequence:
+            resolve(context, label, button_type)
+        dispatch = time.perf_counter() - start
+
+        session = CalculatorSession(context)
+        start = time.perf_counter()
+        for label, button_type in sequence:
+            session.input_field_values.update(fields)
+            session.handle_button_click({"label": label, "type": button_type})
+        full = time.perf_counter() - start
+
+        results[context] = {"dispatch_us": dispatch / count * 1e6, "press_us": full / count * 1e6}
+        print(f"{context:<10} {dispatch / count * 1e6:>14.3f} {full / count * 1e6:>16.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,44 @@
+"""Compare evaluating a formula through the compiled-expression cache with re-parsing it each time
+
+Run with:  python benchmarks/bench_expression.py [evaluations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression import CompiledExpression, compile_expression
+
+FORMULAS = [
+    "field_0 * (1 + field_1 / 100)",
+    "-(field_0 - 3)^2 + √(field_1) * sin(field_0)",
+    "(field_0 + field_1) / 2 * π - e^2",
+]
+
+
+def main(count=20000):
+    envs = [{"field_0": float(i % 97), "field_1": float(i % 13)} for i in range(count)]
+    results = {}
+    print(f"{count:,} evaluations per formula")
+    print(f"{'Formula':<48} {'re-parse (ms)':>13} {'cached (ms)':>12} {'speedup':>8}")
+    for formula in FORMULAS:
+        start = time.perf_counter()
+        for env in envs:
+            CompiledExpression(formula).evaluate(env)
+        naive = time.perf_counter() - start
+
+        compile_expression.cache_clear()
+        start = time.perf_counter()
+        for env in envs:
+            compile_expression(formula).evaluate(env)
+        cached = time.perf_counter() - start
+
+        results[formula] = {"reparse_ms": naive * 1000, "cached_ms": cached * 1000, "speedup": naive / cached}
+        print(f"{formula:<48} {naive * 1000:>13.1f} {cached * 1000:>12.1f} {naive / cached:>7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,66 @@
+"""Time the history analytics queries on a large database
+
+Fills a temporary database with operations spread over several months,
+then compares the rollup-backed queries with scanning every row.
+
+Run with:  python benchmarks/bench_history_db.py [rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_db import HistoryDB
+
+CONTEXTS = ("Standard", "Homework", "Shopping", "Budgeting", "Cooking")
+LABELS = ("1", "2", "5", "+", "-", "=", "C", "Tip", "Tax", "Split", "sin", "√", "½", "2×", "Avg")
+SPAN = 180 * 24 * 3600  # Six months of history
+
+SCAN_HOURLY = ("SELECT strftime('%Y-%m-%d %H:00', ts, 'unixepoch', 'localtime') AS hour, "
+               "context, COUNT(*) FROM operations GROUP BY hour, context ORDER BY hour, context")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(rows=2_000_000):
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        db = HistoryDB(os.path.join(directory, "history.db"), batch_size=10_000)
+        start = time.time() - SPAN
+        _, insert_s = timed(lambda: [db.record(rng.choice(LABELS), rng.choice(CONTEXTS),
+                                               timestamp=start + i * SPAN / rows) for i in range(rows)]
+                            and db.flush())
+        print(f"{rows:,} operations recorded in {insert_s:.2f}s ({insert_s / rows * 1e6:.2f} us each)")
+
+        results = {}
+        for name, rollup, scan in (
+            ("hourly usage", db.usage_per_mode_per_hour, lambda: db.conn.execute(SCAN_HOURLY).fetchall()),
+            ("hourly usage, 1 week", lambda: db.usage_per_mode_per_hour(time.time() - 7 * 86400 + 1234.5),
+             None),
+            ("pairs", lambda: db.frequent_sequences(2), lambda: db._scan_sequences(2, 10, None)),
+            ("4-grams, Cooking", lambda: db.frequent_sequences(4, context="Cooking"),
+             lambda: db._scan_sequences(4, 10, "Cooking")),
+        ):
+            expected, rollup_s = timed(rollup)
+            line = f"{name:<22} rollup {rollup_s * 1000:>9.1f} ms"
+            results[name] = {"rollup_ms": rollup_s * 1000}
+            if scan is not None:
+                actual, scan_s = timed(scan)
+                assert [tuple(row) for row in actual] == expected
+                line += f"   full scan {scan_s * 1000:>9.1f} ms"
+                results[name]["scan_ms"] = scan_s * 1000
+            print(line)
+        db.close()
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
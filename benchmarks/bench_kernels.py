@@ -0,0 +1,58 @@
+"""Compare memoized kernels with calling the undecorated functions
+
+Inputs repeat the way button presses do: a few hundred distinct values,
+so nearly every memoized call is a cache hit.
+
+Run with:  python benchmarks/bench_kernels.py [calls]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kernels
+
+DISTINCT_INPUTS = 200
+
+ARGUMENTS = {
+    "trig": lambda i: ("sin", i % DISTINCT_INPUTS),
+    "square_root": lambda i: (i % DISTINCT_INPUTS,),
+    "square": lambda i: (i % DISTINCT_INPUTS + 0.5,),
+    "convert_temperature": lambda i: (i % DISTINCT_INPUTS,),
+    "tip": lambda i: (i % DISTINCT_INPUTS + 10, 15),
+    "tax": lambda i: (i % DISTINCT_INPUTS + 10, 8),
+    "increase": lambda i: (1000, i % DISTINCT_INPUTS),
+    "decrease": lambda i: (1000, i % DISTINCT_INPUTS),
+}
+
+
+def time_calls(func, calls):
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def main(count=200000):
+    results = {}
+    print(f"{count:,} calls per kernel, {DISTINCT_INPUTS} distinct inputs")
+    print(f"{'Kernel':<20} {'direct (us)':>12} {'memoized (us)':>14} {'speedup':>8}")
+    for name, make_args in ARGUMENTS.items():
+        memoized = kernels.KERNELS[name]
+        direct = memoized.__wrapped__
+        calls = [make_args(i) for i in range(count)]
+        # The undecorated kernels expect floats, as the memo passes them on a miss
+        direct_calls = [tuple(kernels.normalize(arg) for arg in args) for args in calls]
+
+        kernels.cache_clear()
+        direct_us = time_calls(direct, direct_calls)
+        memo_us = time_calls(memoized, calls)
+        results[name] = {"direct_us": direct_us, "memoized_us": memo_us, "speedup": direct_us / memo_us}
+        print(f"{name:<20} {direct_us:>12.3f} {memo_us:>14.3f} {direct_us / memo_us:>7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
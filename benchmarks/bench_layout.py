@@ -0,0 +1,54 @@
+"""Compare rebuilding the button layout every frame with the cached per-context layout
+
+Run with:  python benchmarks/bench_layout.py [frames]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Calculator
+from calculator_engine import CONTEXT_MODES
+
+
+def measure(func, frames):
+    """Return (seconds, allocated bytes) for calling func once per frame"""
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in range(100):
+        func()
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, allocated
+
+
+def main(frames=20000):
+    results = {}
+    print(f"{frames:,} frames per context (one layout lookup per frame)")
+    print(f"{'Context':<10} {'rebuild (us)':>13} {'cached (us)':>12} {'speedup':>8} {'peak KiB rebuild/cached':>24}")
+    for mode in CONTEXT_MODES:
+        Calculator.session.current_context = mode
+        Calculator.clear_layout_cache()
+        rebuild, rebuild_bytes = measure(lambda: Calculator.build_buttons_for_context(mode), frames)
+        cached, cached_bytes = measure(Calculator.get_buttons_for_context, frames)
+
+        rebuild_us = rebuild / frames * 1e6
+        cached_us = cached / frames * 1e6
+        results[mode] = {"rebuild_us": rebuild_us, "cached_us": cached_us, "speedup": rebuild / cached,
+                         "rebuild_peak_bytes": rebuild_bytes, "cached_peak_bytes": cached_bytes}
+        print(f"{mode:<10} {rebuild_us:>13.2f} {cached_us:>12.2f} {rebuild / cached:>7.1f}x "
+              f"{rebuild_bytes / 1024:>13.1f} / {cached_bytes / 1024:<8.1f}")
+    Calculator.session.current_context = "Standard"
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
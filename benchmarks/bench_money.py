@@ -0,0 +1,47 @@
+"""Measure the per-operation cost of exact Decimal money rules against the float rules
+
+Run with:  python benchmarks/bench_money.py [operations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import money
+import shopping_kernels
+
+
+def main(count=100000):
+    floats = [(i % 9973) * 1.37 for i in range(count)]
+    texts = [repr(value) for value in floats]
+    results = {}
+    print(f"{count:,} operations per rule")
+    print(f"{'Rule':<10} {'float (us/op)':>14} {'Decimal (us/op)':>16} {'overhead':>9}")
+    rules = {
+        "Tip": (lambda a: shopping_kernels.tip_one(a, 15), lambda a: money.tip_one(a, 15)),
+        "Tax": (lambda a: shopping_kernels.tax_one(a, 8), lambda a: money.tax_one(a, 8)),
+        "Split": (lambda a: shopping_kernels.split_one(a, 3), lambda a: money.split_one(a, 3)),
+    }
+    amounts = [money.to_decimal(text) for text in texts]
+    for name, (float_rule, money_rule) in rules.items():
+        start = time.perf_counter()
+        for value in floats:
+            float_rule(value)
+        float_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for amount in amounts:
+            money.format_money(money_rule(amount)[0] if name != "Split" else money_rule(amount))
+        money_time = time.perf_counter() - start
+
+        float_us = float_time / count * 1e6
+        money_us = money_time / count * 1e6
+        results[name] = {"float_us": float_us, "decimal_us": money_us, "overhead": money_us / float_us}
+        print(f"{name:<10} {float_us:>14.2f} {money_us:>16.2f} {money_us / float_us:>8.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,59 @@
+"""Compare the vectorized Shopping kernels against a Python loop over the scalar rules
+
+Run with:  python benchmarks/bench_shopping_kernels.py [receipts]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from shopping_kernels import tip, tax, split, save, tip_one, tax_one, split_one, save_one
+
+
+def best_of(func, repeat=3):
+    """Return the fastest wall time of several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(count=100000):
+    rng = random.Random(42)
+    amounts = [round(rng.uniform(100, 250000), 2) for _ in range(count)]
+    people = [rng.randint(1, 12) for _ in range(count)]
+    discounts = [rng.randint(0, 60) for _ in range(count)]
+    amount_array = np.array(amounts)
+    people_array = np.array(people, dtype=np.float64)
+    discount_array = np.array(discounts, dtype=np.float64)
+
+    cases = [
+        ("Tip", lambda: [tip_one(a) for a in amounts], lambda: tip(amount_array)),
+        ("Tax", lambda: [tax_one(a) for a in amounts], lambda: tax(amount_array)),
+        ("Split", lambda: [split_one(a, p) for a, p in zip(amounts, people)],
+         lambda: split(amount_array, people_array)),
+        ("Save", lambda: [save_one(a, d) for a, d in zip(amounts, discounts)],
+         lambda: save(amount_array, discount_array)),
+    ]
+
+    print(f"{count:,} receipts")
+    print(f"{'Operation':<8} {'loop (ms)':>10} {'numpy (ms)':>11} {'speedup':>8}")
+    results = {}
+    for name, loop, vectorized in cases:
+        loop_time = best_of(loop)
+        vector_time = best_of(vectorized)
+        results[name] = {"loop_ms": loop_time * 1000, "numpy_ms": vector_time * 1000,
+                         "speedup": loop_time / vector_time}
+        print(f"{name:<8} {loop_time * 1000:>10.1f} {vector_time * 1000:>11.1f} {loop_time / vector_time:>7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
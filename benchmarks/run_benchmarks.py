@@ -0,0 +1,243 @@
+"""Benchmark suite for the engine and headless rendering
+
+Times per-press latency for each context, the four draw functions, the
+persistence done for every press, and startup to first frame. Everything
+runs with the SDL dummy video driver, so no display is needed.
+
+Run with:
+    python benchmarks/run_benchmarks.py                   print results
+    python benchmarks/run_benchmarks.py --save baseline   store benchmarks/baselines/baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_DIR)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Button sequences per context, with field values that make every operation succeed
+PRESS_SEQUENCES = {
+    "Standard": (["1", "2", "+", "3", "4", "=", "×", "5", "=", "C"], {}),
+    "Homework": (["3", "0", "sin", "cos", "tan", "√", "x²", "π", "C"], {"field_0": "30", "field_1": "16"}),
+    "Shopping": (["1", "2", "0", "Tip", "Tax", "Split", "Save", "C"],
+                 {"field_0": "120", "field_1": "4", "field_2": "15", "field_3": "8"}),
+    "Budgeting": (["5", "0", "%", "Inc", "Dec", "Avg", "Save", "Goal", "C"],
+                  {"field_0": "1000", "field_1": "10", "field_2": "5000", "field_3": "1200",
+                   "field_4": "10", "field_5": "20"}),
+    "Cooking": (["2", "5", "0", "½", "⅓", "¼", "2×", "3×", "°C/°F", "C"],
+                {"field_0": "250", "field_1": "4", "field_2": "180", "field_3": "1"}),
+}
+
+
+def summarize(samples):
+    """Return median, p95 and max of samples in microseconds"""
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {"median_us": statistics.median(samples) * 1e6, "p95_us": p95 * 1e6,
+            "max_us": samples[-1] * 1e6, "samples": len(samples)}
+
+
+def bench_presses(rounds):
+    """Per-press latency through handle_button_click() for each context"""
+    from calculator_engine import CalculatorSession, button_type_for
+
+    results = {}
+    for context, (labels, fields) in PRESS_SEQUENCES.items():
+        session = CalculatorSession(context)
+        buttons = [{"label": label, "type": button_type_for(context, label)} for label in labels]
+        samples = []
+        for _ in range(rounds):
+            session.input_field_values.update(fields)
+            for button in buttons:
+                start = time.perf_counter()
+                session.handle_button_click(button)
+                samples.append(time.perf_counter() - start)
+            # Stay in the context under test if the detector moved away
+            if session.current_context != context:
+                session.switch_context(context)
+        results[context] = summarize(samples)
+    return results
+
+
+def bench_frames(rounds):
+    """Frame time of each draw function, drawn in full for every context"""
+    import pygame
+    import Calculator
+
+    Calculator.init_display()
+    Calculator.warm_layout_cache()
+    draw_functions = {
+        "draw_display": Calculator.draw_display,
+        "draw_context_panel": Calculator.draw_context_panel,
+        "draw_input_panel": Calculator.draw_input_panel,
+        "draw_buttons": Calculator.draw_buttons,
+    }
+
+    samples = {name: [] for name in draw_functions}
+    samples["frame"] = []
+    session = Calculator.session
+    for context, (labels, fields) in PRESS_SEQUENCES.items():
+        session.switch_context(context)
+        session.input_field_values.update(fields)
+        session.current_input = "".join(label for label in labels if label.isdigit())
+        for _ in range(rounds):
+            frame_start = time.perf_counter()
+            for name, draw in draw_functions.items():
+                start = time.perf_counter()
+                draw()
+                samples[name].append(time.perf_counter() - start)
+            samples["frame"].append(time.perf_counter() - frame_start)
+    session.switch_context("Standard")
+    pygame.quit()
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def bench_persistence(rounds):
+    """Cost of update_context_history() with the journal and usage counters attached"""
+    import Calculator
+
+    session = Calculator.session
+    with tempfile.TemporaryDirectory() as directory:
+        saved = (Calculator.CONTEXT_FILE, Calculator.JOURNAL_FILE, list(session.operation_listeners),
+                 list(session.context_listeners))
+        Calculator.CONTEXT_FILE = os.path.join(directory, "context_data.json")
+        Calculator.JOURNAL_FILE = os.path.join(directory, "context_journal.jsonl")
+        try:
+            Calculator.init_persistence()
+            samples = []
+            labels = ["7", "+", "Tip", "sin", "="]
+            for i in range(rounds):
+                start = time.perf_counter()
+                session.update_context_history(labels[i % len(labels)])
+                samples.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            Calculator.history_journal.compact(background=False)
+            compact = time.perf_counter() - start
+        finally:
+            Calculator.close_persistence()
+            Calculator.CONTEXT_FILE, Calculator.JOURNAL_FILE = saved[0], saved[1]
+            session.operation_listeners[:] = saved[2]
+            session.context_listeners[:] = saved[3]
+    result = {"update_context_history": summarize(samples)}
+    result["compact_ms"] = compact * 1000
+    return result
+
+
+def first_frame():
+    """Start the GUI up to its first presented frame, as the child process does"""
+    import pygame
+    import Calculator
+
+    Calculator.init_display()
+    Calculator.warm_layout_cache()
+    Calculator.warm_text_cache(Calculator.session.current_context)
+    pygame.display.update(Calculator.render_frame())
+    pygame.quit()
+
+
+def bench_startup(rounds):
+    """Wall time from launching Python to the first frame on screen"""
+    samples = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--first-frame"],
+                           cwd=directory, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append(time.perf_counter() - start)
+    return {"startup_to_first_frame_ms": statistics.median(samples) * 1000, "samples": rounds}
+
+
+def run_all(rounds=200, startup_rounds=5):
+    """Run every benchmark and return the results with environment details"""
+    import pygame
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "press": bench_presses(rounds),
+        "frame": bench_frames(rounds),
+        "persistence": bench_persistence(rounds * 10),
+        "startup": bench_startup(startup_rounds),
+    }
+
+
+def flatten(results, prefix=""):
+    """Yield (dotted name, number) for every timing in a result tree"""
+    for key, value in results.items():
+        if key in ("meta", "samples"):
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, name + ".")
+        elif isinstance(value, (int, float)):
+            yield name, value
+
+
+def compare(results, baseline):
+    """Return (name, baseline, current, change %) for every shared timing"""
+    old = dict(flatten(baseline))
+    rows = []
+    for name, value in flatten(results):
+        if name in old and old[name]:
+            rows.append((name, old[name], value, (value - old[name]) / old[name] * 100))
+    return rows
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the calculator engine and headless rendering")
+    parser.add_argument("--rounds", type=int, default=200, help="Repetitions per measurement")
+    parser.add_argument("--startup-rounds", type=int, default=5, help="GUI launches for the startup time")
+    parser.add_argument("--save", metavar="NAME", help="Store the results as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Show the change against a stored baseline")
+    parser.add_argument("-o", "--output", help="Also write the results to this JSON file")
+    parser.add_argument("--first-frame", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.first_frame:
+        first_frame()
+        return 0
+
+    results = run_all(args.rounds, args.startup_rounds)
+    for name, value in flatten(results):
+        print(f"{name:<48} {value:>12.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.save), "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline {baseline_path(args.save)}")
+    if args.compare:
+        with open(baseline_path(args.compare), "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nChange against {args.compare}:")
+        for name, old, new, change in compare(results, baseline):
+            print(f"{name:<48} {old:>12.2f} -> {new:>12.2f} {change:>+8.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
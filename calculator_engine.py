@@ -0,0 +1,496 @@
+"""Headless calculator engine: arithmetic, context kernels and pattern detection
+
+Nothing here imports pygame, so the engine can be driven from tests and
+batch jobs without opening a window. Calculator.py wraps a session in the GUI.
+"""
+
+from expression import ExpressionError, evaluate as evaluate_expression_text
+import money
+import shopping_kernels
+from history_ring import HistoryRing
+from operations import OPERATIONS
+from pattern_detector import PatternDetector
+
+# Context modes with specific colors and features
+CONTEXT_MODES = {
+    "Standard": {
+        "color": (70, 70, 90),
+        "buttons": ["C", "Del", "/", "×", "-", "+", "=", "."],
+        "description": "Basic arithmetic operations",
+        "input_fields": []  # No input fields for standard mode
+    },
+    "Homework": {
+        "color": (60, 100, 180),
+        "buttons": ["C", "Del", "√", "x²", "π", "sin", "cos", "tan"],
+        "description": "Math homework and studies",
+        "input_fields": ["Angle (deg):", "Value:"]
+    },
+    "Shopping": {
+        "color": (40, 160, 80),
+        "buttons": ["C", "Del", "%", "Tax", "Tip", "Split", "Save", "Total"],
+        "description": "Shopping and expenses",
+        "input_fields": ["Amount / original amount(fcfa):", "People:", "Tip %:", "Tax %:"]
+    },
+    "Budgeting": {
+        "color": (180, 100, 60),
+        "buttons": ["C", "Del", "%", "Avg", "Inc", "Dec", "Save", "Goal"],
+        "description": "Personal budgeting",
+        "input_fields": ["Base Amount:", "Percentage:", "Target Goal:", "Current:", "num1:", "num2:"]
+    },
+    "Cooking": {
+        "color": (200, 120, 50),
+        "buttons": ["C", "Del", "½", "⅓", "¼", "2×", "3×", "°C/°F"],
+        "description": "Cooking and recipes",
+        "input_fields": ["Amount:", "Servings:", "Temperature (°C):", "Scale Factor:"]
+    }
+}
+
+# Suggestions shown right after switching to a mode
+CONTEXT_SUGGESTIONS = {
+    "Shopping": ["Tip 15%", "Add Tax", "Split Bill", "Total"],
+    "Homework": ["π", "√", "sin()", "cos()", "tan()"],
+    "Budgeting": ["% Increase", "% Decrease", "Average", "Save"],
+    "Cooking": ["½ Recipe", "2× Recipe", "Convert Units", "°C to °F"],
+}
+
+# Suggestions shown when the pattern detector switches to a mode
+PATTERN_SUGGESTIONS = {
+    "Shopping": ["15%", "18%", "20%", "Split Bill"],
+    "Budgeting": ["Increase by %", "Decrease by %", "Average", "Savings"],
+    "Cooking": ["Double", "Half", "Convert Units", "°C to °F"],
+    "Homework": ["π", "e", "Solve", "Graph"],
+}
+
+HISTORY_SIZE = 100_000
+PATTERN_SIZE = 5
+
+NUMBER_LABELS = ["7", "8", "9", "4", "5", "6", "1", "2", "3", "0"]
+EXPRESSION_LABELS = ["(", ")", "^"]
+
+# What Homework buttons type while an expression is being entered
+EXPRESSION_FUNCTION_TEXT = {"sin": "sin(", "cos": "cos(", "tan": "tan(", "√": "√", "π": "π", "x²": "²"}
+
+
+def format_number(value):
+    """Format a result for the display, dropping a trailing .0"""
+    if value.is_integer():
+        return str(int(value))
+    return str(round(value, 10)).rstrip('0').rstrip('.')
+
+
+def button_type_for(context, label):
+    """Return the button type the GUI assigns to a label in a context"""
+    if label in NUMBER_LABELS:
+        return "number"
+    if label == ".":
+        return "decimal"
+    if label == "=":
+        return "equals"
+    if label in EXPRESSION_LABELS:
+        return "expression"
+    if context == "Standard":
+        if label in ["+", "-", "×", "/"]:
+            return "operator"
+        if label in ["C", "Del"]:
+            return label.lower()
+    return f"context_{context.lower()}"
+
+
+class CalculatorSession:
+    """All calculator state plus the operations that change it"""
+
+    def __init__(self, context="Standard", money_mode=False, pattern_window=PATTERN_SIZE):
+        self.current_input = ""
+        self.previous_input = ""
+        self.current_operator = ""
+        self.result = None
+        self.error_message = ""
+        self.current_context = context
+        self.context_history = HistoryRing(HISTORY_SIZE)
+        self.smart_suggestions = []
+        self.pattern = PatternDetector(pattern_window)
+
+        # Shopping and Budgeting use exact Decimal arithmetic in money mode
+        self.money_mode = money_mode
+
+        # The display holds a free-form expression once (, ) or ^ is entered
+        self.expression_mode = False
+
+        # Input panel state
+        self.input_field_values = {}
+        self.active_input_field = None
+
+        # Recipe scaled as a whole in Cooking mode, shown a page at a time
+        self.recipe = None
+        self.recipe_page = 0
+
+        # Imported ledger aggregates shown in Budgeting mode
+        self.ledger = None
+
+        # Callbacks run as operation_listener(session, operation) and context_listener(session, old, new)
+        self.operation_listeners = []
+        self.context_listeners = []
+
+        self.initialize_input_fields()
+
+    def initialize_input_fields(self):
+        """Initialize input fields for current context"""
+        field_labels = CONTEXT_MODES[self.current_context]["input_fields"]
+        self.input_field_values = {f"field_{i}": "" for i in range(len(field_labels))}
+        self.active_input_field = None
+
+    def field_labels(self):
+        """Return (field_id, label) pairs for the current context"""
+        return [(f"field_{i}", label) for i, label in enumerate(CONTEXT_MODES[self.current_context]["input_fields"])]
+
+    def set_context(self, mode):
+        """Change context mode, resetting the input fields"""
+        old_context = self.current_context
+        self.current_context = mode
+        self.initialize_input_fields()
+        if mode != old_context:
+            for listener in self.context_listeners:
+                listener(self, old_context, mode)
+
+    def switch_context(self, mode):
+        """Switch mode from the mode bar, clearing the calculation"""
+        self.set_context(mode)
+        self.pattern.clear()
+        self.clear_display()
+        self.smart_suggestions = list(CONTEXT_SUGGESTIONS.get(mode, []))
+        if mode == "Budgeting" and self.ledger is not None:
+            self.smart_suggestions = self.ledger_suggestions()
+
+    def clear_display(self):
+        """Clear the main display and pending operation"""
+        self.current_input = ""
+        self.previous_input = ""
+        self.current_operator = ""
+        self.result = None
+        self.error_message = ""
+        self.expression_mode = False
+
+    def get_input_value(self, field_id):
+        """Get value from input field or main display"""
+        if self.input_field_values.get(field_id):
+            try:
+                return float(self.input_field_values[field_id])
+            except:
+                return None
+        return None
+
+    def set_input_value(self, field_id, value):
+        """Set value to input field"""
+        if field_id in self.input_field_values:
+            self.input_field_values[field_id] = str(value)
+
+    def recipe_factor(self):
+        """Return the factor the loaded recipe is scaled by"""
+        scale = self.get_input_value("field_3") if self.current_context == "Cooking" else None
+        servings = self.get_input_value("field_1") if self.current_context == "Cooking" else None
+        # The ⅓ button stores a rounded factor, scale by the exact third
+        if scale is not None and abs(scale - 0.333) < 1e-9:
+            scale = 1 / 3
+        return self.recipe.factor_for(scale, servings)
+
+    def recipe_lines(self, page_size):
+        """Return the current page of the scaled recipe and the page count"""
+        lines, pages = self.recipe.page(self.recipe_factor(), self.recipe_page, page_size)
+        self.recipe_page = min(self.recipe_page, pages - 1)
+        return lines, pages
+
+    def ledger_progress(self):
+        """Return the ledger total as a percentage of the Target Goal field, or None"""
+        target = self.get_input_value("field_2") if self.current_context == "Budgeting" else None
+        return self.ledger.progress(target)
+
+    def ledger_lines(self):
+        """Return the ledger aggregates as short lines for the input panel"""
+        ledger = self.ledger
+        if not ledger.count:
+            return [f"{ledger.name}: no amounts"]
+        lines = [
+            f"{ledger.name}: {ledger.count:,} rows",
+            f"Total {ledger.total:,.2f}  Avg {ledger.mean:,.2f}",
+            f"Min {ledger.min:,.2f}  Max {ledger.max:,.2f}",
+            f"Std dev {ledger.stddev:,.2f}",
+        ]
+        progress = self.ledger_progress()
+        if progress is not None:
+            lines.append(f"Goal progress {progress:.1f}%")
+        return lines
+
+    def ledger_suggestions(self):
+        """Return suggestions summing up the loaded ledger"""
+        ledger = self.ledger
+        suggestions = [f"Avg {ledger.mean:.2f}", f"Total {ledger.total:.0f}", f"Rows {ledger.count}"]
+        progress = self.ledger_progress()
+        if progress is not None:
+            suggestions.append(f"Goal {progress:.1f}%")
+        return suggestions
+
+    @property
+    def calculation_pattern(self):
+        """The presses in the detection window, oldest first"""
+        return list(self.pattern)
+
+    def detect_context_pattern(self):
+        """Switch context when the recent presses point to another mode"""
+        mode = self.pattern.observe(self.current_context, self.current_input,
+                                    self.previous_input, self.current_operator)
+        if mode is not None:
+            self.set_context(mode)
+            self.smart_suggestions = list(PATTERN_SUGGESTIONS[mode])
+
+    def update_context_history(self, operation):
+        """Update history of operations for pattern recognition"""
+        self.context_history.append(operation, self.current_context, self.current_input[:10])
+        self.pattern.push(operation)
+
+        for listener in self.operation_listeners:
+            listener(self, operation)
+
+    def press(self, label):
+        """Press a button by label, as if clicked in the current context"""
+        self.handle_button_click({"label": label, "type": button_type_for(self.current_context, label)})
+
+    def handle_button_click(self, button):
+        """Handle button click events for calculator buttons"""
+        button_type = button["type"]
+        button_label = button["label"]
+
+        self.update_context_history(button_label)
+
+        if self.error_message and button_type not in ["clear", "context_switch"]:
+            self.error_message = ""
+
+        if self.active_input_field is None and self.handle_expression_button(button_type, button_label):
+            return
+
+        # C and Del behave the same in every context; everything else goes by type
+        handler = BUTTON_HANDLERS.get(LABEL_BUTTON_TYPES.get(button_label, button_type))
+        if handler is not None:
+            if handler(self, button_label) is False:
+                return
+        else:
+            operation = OPERATIONS.get((self.current_context, button_label))
+            if operation is not None:
+                operation.run(self)
+
+        self.detect_context_pattern()
+
+    def press_clear(self, label):
+        """Clear the active input field, or the display and all fields"""
+        if self.active_input_field is not None:
+            # Clear only the active input field
+            self.input_field_values[self.active_input_field] = ""
+        else:
+            # Clear main display
+            self.clear_display()
+            self.smart_suggestions.clear()
+            # Also clear all input fields
+            for field_id in self.input_field_values:
+                self.input_field_values[field_id] = ""
+
+    def press_delete(self, label):
+        """Delete the last character of the active field or the display"""
+        if self.active_input_field is not None:
+            # Delete from active input field
+            current_value = self.input_field_values.get(self.active_input_field, "")
+            self.input_field_values[self.active_input_field] = current_value[:-1]
+        elif self.current_input:
+            # Delete from main display
+            self.current_input = self.current_input[:-1]
+        elif self.error_message:
+            self.error_message = ""
+
+    def press_number(self, label):
+        """Type a digit into the active field or the display"""
+        if self.active_input_field is not None:
+            # Append to active input field
+            current_value = self.input_field_values.get(self.active_input_field, "")
+            self.input_field_values[self.active_input_field] = current_value + label
+        else:
+            # Append to main display
+            self.current_input += label
+
+    def press_decimal(self, label):
+        """Type a decimal point, once per number"""
+        if self.active_input_field is not None:
+            # Add decimal to active input field
+            current_value = self.input_field_values.get(self.active_input_field, "")
+            if "." not in current_value:
+                if not current_value:
+                    self.input_field_values[self.active_input_field] = "0."
+                else:
+                    self.input_field_values[self.active_input_field] = current_value + "."
+        else:
+            # Add decimal to main display
+            if "." not in self.current_input:
+                if not self.current_input:
+                    self.current_input = "0."
+                else:
+                    self.current_input += "."
+
+    def press_operator(self, label):
+        """Start or chain an operation; returns False when the press is dropped"""
+        if self.active_input_field is not None:
+            # Operators are ignored while an input field is active
+            return False
+        if self.current_input:
+            if self.previous_input and self.current_operator:
+                self.calculate_result()
+                if self.error_message:
+                    return False
+                self.previous_input = str(self.result) if self.result is not None else ""
+            else:
+                self.previous_input = self.current_input
+
+            self.current_operator = label
+            self.current_input = ""
+
+    def press_equals(self, label):
+        """Finish the pending operation, or apply the active input field"""
+        if self.active_input_field is not None:
+            # Pressing equals on input field applies the value
+            self.active_input_field = None
+        else:
+            if self.previous_input and self.current_operator and self.current_input:
+                self.calculate_result()
+                if not self.error_message:
+                    self.previous_input = ""
+                    self.current_operator = ""
+
+    def handle_expression_button(self, button_type, label):
+        """Type into the expression on the display, returning True if the press was used"""
+        if button_type == "expression":
+            self.enter_expression(label)
+            return True
+        if not self.expression_mode:
+            return False
+
+        if button_type == "decimal":
+            # One point per number, not per expression
+            if "." not in self.current_number():
+                self.current_input += label
+        elif button_type in ["number", "operator"] or label in ["+", "-", "×", "/"]:
+            self.current_input += label
+        elif button_type == "equals":
+            self.evaluate_expression()
+        elif label in EXPRESSION_FUNCTION_TEXT and self.current_context == "Homework":
+            self.current_input += EXPRESSION_FUNCTION_TEXT[label]
+        else:
+            return False
+        return True
+
+    def current_number(self):
+        """Return the digits and point of the number being typed at the end of the display"""
+        text = self.current_input
+        start = len(text)
+        while start and (text[start - 1].isdigit() or text[start - 1] == "."):
+            start -= 1
+        return text[start:]
+
+    def enter_expression(self, text):
+        """Append text to the display as part of a free-form expression"""
+        if not self.expression_mode:
+            self.expression_mode = True
+            # Fold a pending operation into the expression text
+            if self.previous_input and self.current_operator:
+                self.current_input = self.previous_input + self.current_operator + self.current_input
+                self.previous_input = ""
+                self.current_operator = ""
+        self.current_input += text
+
+    def expression_variables(self):
+        """Return input field values usable by name in expressions"""
+        variables = {}
+        for field_id in self.input_field_values:
+            value = self.get_input_value(field_id)
+            if value is not None:
+                variables[field_id] = value
+        return variables
+
+    def evaluate_expression(self, text=None):
+        """Evaluate the display (or text) as an expression with precedence and parentheses"""
+        try:
+            value = evaluate_expression_text(self.current_input if text is None else text,
+                                             self.expression_variables())
+        except ExpressionError as e:
+            self.error_message = f"Error: {e}"
+            return None
+
+        self.result = value
+        self.current_input = format_number(value)
+        self.expression_mode = False
+        self.active_input_field = None
+        return value
+
+    def money_rules(self):
+        """Return the Shopping rules for the current number mode"""
+        return money if self.money_mode else shopping_kernels
+
+    def get_amount_value(self, field_id):
+        """Get an input field as float, or as an exact Decimal in money mode"""
+        if self.money_mode:
+            return money.parse_money(self.input_field_values.get(field_id))
+        return self.get_input_value(field_id)
+
+    def parse_amount(self, text):
+        """Parse display text as float, or as an exact Decimal in money mode"""
+        return money.to_decimal(text) if self.money_mode else float(text)
+
+    def format_amount(self, value):
+        """Format a rounded amount for the display"""
+        return money.format_money(value) if self.money_mode else str(value)
+
+    def format_average(self, num1, num2):
+        """Average two amounts and format the result for the display"""
+        if self.money_mode:
+            return money.format_money(money.average(num1, num2))
+        return str(round((num1 + num2) / 2, 2))
+
+    def calculate_result(self):
+        """Perform calculation"""
+        try:
+            num1 = float(self.previous_input)
+            num2 = float(self.current_input)
+
+            if self.current_operator == "+":
+                self.result = num1 + num2
+            elif self.current_operator == "-":
+                self.result = num1 - num2
+            elif self.current_operator == "×":
+                self.result = num1 * num2
+            elif self.current_operator == "/":
+                if num2 == 0:
+                    self.error_message = "Error: Division by 0"
+                    return
+                self.result = num1 / num2
+
+            self.current_input = format_number(self.result)
+
+            # Clear active input field after calculation
+            self.active_input_field = None
+
+        except ValueError:
+            self.error_message = "Error: Invalid input"
+        except Exception as e:
+            self.error_message = f"Error: {str(e)}"
+
+    def display_text(self):
+        """Return what the main display shows"""
+        return self.error_message or self.current_input
+
+
+# Core button types, shared by every context
+BUTTON_HANDLERS = {
+    "clear": CalculatorSession.press_clear,
+    "c": CalculatorSession.press_clear,
+    "del": CalculatorSession.press_delete,
+    "number": CalculatorSession.press_number,
+    "decimal": CalculatorSession.press_decimal,
+    "operator": CalculatorSession.press_operator,
+    "equals": CalculatorSession.press_equals,
+}
+LABEL_BUTTON_TYPES = {"C": "clear", "Del": "del"}
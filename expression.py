@@ -0,0 +1,223 @@
+"""Expression parser for the calculator's expression mode
+
+Expressions are parsed once into a tree of closures and cached by their text,
+so evaluating the same formula again with different variable values skips
+parsing entirely. Supported: + - × * / ÷ ^, parentheses, unary minus, the
+Homework functions sin/cos/tan (in degrees), √ and ², the constants π and e,
+and variables such as input field ids (field_0).
+"""
+
+import math
+import re
+from functools import lru_cache
+
+EXPRESSION_CACHE_SIZE = 256
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_][A-Za-z_0-9]*)|(.))")
+
+OPERATOR_ALIASES = {"×": "*", "÷": "/", "−": "-"}
+
+# Binary operators: (left binding power, right binding power, function)
+BINARY_OPERATORS = {
+    "+": (10, 11, lambda a, b: a + b),
+    "-": (10, 11, lambda a, b: a - b),
+    "*": (20, 21, lambda a, b: a * b),
+    "/": (20, 21, None),  # Division checks for zero
+    "^": (31, 30, lambda a, b: a ** b),  # Right associative
+}
+UNARY_BINDING = 25  # -2^2 is -(2^2), but -2*3 is (-2)*3
+
+
+def _tan_degrees(angle):
+    radians = math.radians(angle)
+    if abs(math.cos(radians)) < 1e-10:
+        raise ExpressionError("Undefined tan")
+    return math.tan(radians)
+
+
+def _sqrt(value):
+    if value < 0:
+        raise ExpressionError("Negative sqrt")
+    return math.sqrt(value)
+
+
+FUNCTIONS = {
+    "sin": lambda angle: math.sin(math.radians(angle)),
+    "cos": lambda angle: math.cos(math.radians(angle)),
+    "tan": _tan_degrees,
+    "sqrt": _sqrt,
+    "√": _sqrt,
+}
+
+CONSTANTS = {"π": math.pi, "pi": math.pi, "e": math.e}
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that cannot be parsed or evaluated"""
+
+
+def tokenize(text):
+    """Split expression text into number, name and symbol tokens"""
+    tokens = []
+    for number, name, symbol in TOKEN_PATTERN.findall(text):
+        if number:
+            tokens.append(("num", float(number)))
+        elif name:
+            tokens.append(("name", name))
+        elif symbol.strip():
+            symbol = OPERATOR_ALIASES.get(symbol, symbol)
+            if symbol == "²":
+                tokens.extend([("op", "^"), ("num", 2.0)])
+            elif symbol in CONSTANTS:
+                tokens.append(("name", symbol))
+            else:
+                tokens.append(("op", symbol))
+    return tokens
+
+
+class Parser:
+    """Pratt parser turning tokens into nested closures"""
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, symbol):
+        kind, value = self.advance()
+        if kind != "op" or value != symbol:
+            raise ExpressionError(f"Expected '{symbol}'")
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        node = self.parse_expression(0)
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected '{self.peek()[1]}'")
+        return node
+
+    def parse_expression(self, min_binding):
+        left = self.parse_prefix()
+        while True:
+            kind, value = self.peek()
+            if kind == "op" and value in BINARY_OPERATORS:
+                left_binding, right_binding, func = BINARY_OPERATORS[value]
+            elif kind == "num":
+                # "1.2.3" or "2 3" is a typo, not a product
+                raise ExpressionError(f"Unexpected number {value:g}")
+            elif kind == "name" or (kind == "op" and value in ("(", "√")):
+                # Implicit multiplication: 2π, 3(4+1), 2√9
+                left_binding, right_binding, func = BINARY_OPERATORS["*"]
+                value = None
+            else:
+                break
+            if left_binding < min_binding:
+                break
+            if value is not None:
+                self.advance()
+            right = self.parse_expression(right_binding)
+            left = self.make_binary(value or "*", func, left, right)
+        return left
+
+    def parse_prefix(self):
+        kind, value = self.advance()
+        if kind == "num":
+            return lambda env, value=value: value
+        if kind == "name":
+            return self.parse_name(value)
+        if kind == "op":
+            if value == "(":
+                node = self.parse_expression(0)
+                self.expect(")")
+                return node
+            if value == "-":
+                operand = self.parse_expression(UNARY_BINDING)
+                return lambda env: -operand(env)
+            if value == "+":
+                return self.parse_expression(UNARY_BINDING)
+            if value == "√":
+                operand = self.parse_expression(UNARY_BINDING)
+                return lambda env: _sqrt(operand(env))
+        if kind is None:
+            raise ExpressionError("Unexpected end of expression")
+        raise ExpressionError(f"Unexpected '{value}'")
+
+    def parse_name(self, name):
+        if name in FUNCTIONS:
+            func = FUNCTIONS[name]
+            if self.peek() == ("op", "("):
+                self.advance()
+                argument = self.parse_expression(0)
+                self.expect(")")
+            else:
+                argument = self.parse_expression(UNARY_BINDING)
+            return lambda env: func(argument(env))
+        if name in CONSTANTS:
+            constant = CONSTANTS[name]
+            return lambda env: constant
+
+        def variable(env):
+            try:
+                return env[name]
+            except (KeyError, TypeError):
+                raise ExpressionError(f"Unknown name '{name}'") from None
+        return variable
+
+    @staticmethod
+    def make_binary(symbol, func, left, right):
+        if symbol == "/":
+            def divide(env):
+                divisor = right(env)
+                if divisor == 0:
+                    raise ExpressionError("Division by 0")
+                return left(env) / divisor
+            return divide
+        return lambda env: func(left(env), right(env))
+
+
+class CompiledExpression:
+    """A parsed expression that can be evaluated many times"""
+
+    __slots__ = ("text", "_root")
+
+    def __init__(self, text):
+        self.text = text
+        try:
+            self._root = Parser(text).parse()
+        except RecursionError:
+            raise ExpressionError("Expression nested too deeply") from None
+
+    def evaluate(self, env=None):
+        """Evaluate with variables taken from env"""
+        try:
+            value = self._root(env or {})
+        except ExpressionError:
+            raise
+        except (OverflowError, ZeroDivisionError, ValueError) as e:
+            raise ExpressionError(str(e)) from None
+        except RecursionError:
+            raise ExpressionError("Expression nested too deeply") from None
+        if isinstance(value, complex):
+            raise ExpressionError("Complex result")
+        value = float(value)
+        if not math.isfinite(value):
+            raise ExpressionError("Result out of range")
+        return value
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    """Parse expression text once, returning a cached CompiledExpression"""
+    return CompiledExpression(text)
+
+
+def evaluate(text, env=None):
+    """Evaluate expression text, reusing the compiled form when cached"""
+    return compile_expression(text).evaluate(env)
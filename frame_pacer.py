@@ -0,0 +1,62 @@
+"""Frame pacing for the GUI loop with an idle mode
+
+While the user is active the loop runs at a fixed frame rate. Once no mouse
+or key input has arrived for idle_after seconds, the loop should block on
+pygame.event.wait() instead of polling, waking at least every wait_ms to do
+periodic work. The first input after that returns to full-rate pacing, and
+the time from waking up to the next presented frame is recorded.
+"""
+
+import time
+from collections import deque
+
+FRAME_RATE = 60
+IDLE_AFTER = 2.0  # Seconds without input before the loop blocks
+IDLE_WAIT_MS = 1000  # Longest a blocked loop sleeps before periodic work
+WAKE_SAMPLES = 256
+
+
+class FramePacer:
+    """Decide between polling at the frame rate and blocking while idle"""
+
+    def __init__(self, idle_after=IDLE_AFTER, wait_ms=IDLE_WAIT_MS, fps=FRAME_RATE, clock=time.perf_counter):
+        self.idle_after = idle_after
+        self.wait_ms = wait_ms
+        self.fps = fps
+        self.clock = clock
+        self.last_input = clock()
+        self.wake_started = None
+        self.wake_latencies = deque(maxlen=WAKE_SAMPLES)
+
+    def idle(self, now=None):
+        """Return True once no input has arrived for idle_after seconds"""
+        if self.idle_after is None:
+            return False
+        now = self.clock() if now is None else now
+        return now - self.last_input >= self.idle_after
+
+    def note_input(self, now=None, woke=False):
+        """Record that input arrived; woke marks it as ending an idle wait"""
+        now = self.clock() if now is None else now
+        self.last_input = now
+        if woke and self.wake_started is None:
+            self.wake_started = now
+
+    def frame_presented(self, now=None):
+        """Record the wake-up latency if this frame answers an idle wake-up"""
+        if self.wake_started is None:
+            return None
+        now = self.clock() if now is None else now
+        latency = now - self.wake_started
+        self.wake_latencies.append(latency)
+        self.wake_started = None
+        return latency
+
+    def wake_stats(self):
+        """Return count, mean and max wake-up latency in milliseconds"""
+        samples = list(self.wake_latencies)
+        if not samples:
+            return {"count": 0, "mean_ms": 0.0, "max_ms": 0.0}
+        return {"count": len(samples),
+                "mean_ms": sum(samples) / len(samples) * 1000,
+                "max_ms": max(samples) * 1000}
@@ -0,0 +1,282 @@
+"""Optional SQLite store for the full operation history, with analytics queries"""
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+SCHEMA_VERSION = 1
+MAX_ROLLUP_SEQUENCE = 4  # Longer sequences fall back to scanning the whole table
+SEPARATOR = "\x1f"  # Joins the operations of a sequence; sorts before any printable label
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    context TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    input TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_operations_context_ts ON operations (context, ts);
+CREATE INDEX IF NOT EXISTS idx_operations_ts ON operations (ts);
+CREATE TABLE IF NOT EXISTS hourly_usage (
+    hour INTEGER NOT NULL,
+    context TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, context)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sequence_counts (
+    context TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    ops TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (context, length, ops)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sequence_tails (
+    context TEXT PRIMARY KEY,
+    ops TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+HOUR_LABEL = "strftime('%Y-%m-%d %H:00', {}, 'unixepoch', 'localtime')"
+
+
+def local_hour(timestamp):
+    """Return the epoch time at which the local hour containing timestamp started"""
+    start = datetime.fromtimestamp(timestamp).replace(minute=0, second=0, microsecond=0)
+    return int(start.timestamp())
+
+
+class HistoryDB:
+    """Operation history in SQLite, written in batched transactions
+
+    Each batch also updates per-hour usage counts and counts of operation
+    sequences (over all contexts, stored as context '', and per context), so
+    the analytics queries read small rollup tables instead of every row.
+    """
+
+    def __init__(self, path, batch_size=200, flush_interval=5.0, submit=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.queued = deque()  # Batches handed to flush() and not written yet
+        self.last_flush = time.monotonic()
+        # Runs batch writes in the background and returns a future, or None when busy
+        self.submit = submit
+        self.lock = threading.Lock()
+
+        # Batches may be written from a worker thread; self.lock serializes access
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.tails = {context: ops.split(SEPARATOR)
+                      for context, ops in self.conn.execute("SELECT context, ops FROM sequence_tails")}
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Databases written before the rollup tables existed
+            self.rebuild_rollups()
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def record(self, operation, context, entry="", timestamp=None):
+        """Queue one operation, writing the batch once it is full"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.pending.append((timestamp, context, operation, entry))
+        if len(self.pending) >= self.batch_size:
+            self.flush(background=True)
+
+    def maybe_flush(self, now=None):
+        """Flush queued operations in the background once the flush interval has passed"""
+        if not self.pending:
+            return False
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_flush < self.flush_interval:
+            return False
+        self.flush(now, background=True)
+        return True
+
+    def flush(self, now=None, background=False):
+        """Write all queued operations, on the worker when background and one is set"""
+        self.last_flush = time.monotonic() if now is None else now
+        if self.pending:
+            self.queued.append(self.pending)
+            self.pending = []
+        if not self.queued:
+            return
+        if background and self.submit is not None and self.submit(self.write_queued) is not None:
+            return
+        self.write_queued()
+
+    def write_queued(self):
+        """Write the queued batches in order, one transaction per batch"""
+        with self.lock:
+            while self.queued:
+                batch = self.queued[0]
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT INTO operations (ts, context, operation, input) VALUES (?, ?, ?, ?)",
+                        batch)
+                    tails = self._update_rollups(batch)
+                self.tails = tails
+                self.queued.popleft()
+
+    def _update_rollups(self, rows):
+        """Add (ts, context, operation, ...) rows to the rollup tables, returning the new tails"""
+        hours = {}
+        sequences = {}
+        tails = {context: list(ops) for context, ops in self.tails.items()}
+        for row in rows:
+            timestamp, context, operation = row[0], row[1], row[2]
+            key = (local_hour(timestamp), context)
+            hours[key] = hours.get(key, 0) + 1
+            for scope in ("", context):
+                tail = tails.setdefault(scope, [])
+                tail.append(operation)
+                del tail[:-MAX_ROLLUP_SEQUENCE]
+                for length in range(1, len(tail) + 1):
+                    key = (scope, length, SEPARATOR.join(tail[-length:]))
+                    sequences[key] = sequences.get(key, 0) + 1
+
+        self.conn.executemany(
+            "INSERT INTO hourly_usage (hour, context, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (hour, context) DO UPDATE SET count = count + excluded.count",
+            [(hour, context, count) for (hour, context), count in hours.items()])
+        self.conn.executemany(
+            "INSERT INTO sequence_counts (context, length, ops, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (context, length, ops) DO UPDATE SET count = count + excluded.count",
+            [key + (count,) for key, count in sequences.items()])
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sequence_tails (context, ops) VALUES (?, ?)",
+            [(context, SEPARATOR.join(tail)) for context, tail in tails.items()])
+        return tails
+
+    def rebuild_rollups(self):
+        """Recompute the rollup tables from every stored operation"""
+        with self.lock, self.conn:
+            for table in ("hourly_usage", "sequence_counts", "sequence_tails"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.tails = {}
+            rows = self.conn.execute("SELECT ts, context, operation FROM operations ORDER BY id")
+            while True:
+                chunk = rows.fetchmany(10_000)
+                if not chunk:
+                    break
+                self.tails = self._update_rollups(chunk)
+
+    def count(self):
+        """Return the number of stored operations"""
+        self.flush()
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+    def usage_per_mode_per_hour(self, since=None, until=None):
+        """Return (hour, context, count) rows, hours formatted as 'YYYY-MM-DD HH:00'
+
+        Whole hours come from the hourly rollup; only the partial hours at
+        either end of a range are counted from the operations themselves.
+        """
+        self.flush()
+        low, high = since, until
+        partial = []
+        if since is not None:
+            start = local_hour(since)
+            if start < since:
+                low = start + 3600
+                partial.append((since, low if until is None else min(low, until)))
+        if until is not None:
+            start = local_hour(until)
+            if start < until and (low is None or start >= low):
+                partial.append((start, until))
+            high = start
+
+        conditions, params = [], []
+        if low is not None:
+            conditions.append("hour >= ?")
+            params.append(low)
+        if high is not None:
+            conditions.append("hour < ?")
+            params.append(high)
+        query = f"SELECT {HOUR_LABEL.format('hour')}, context, count FROM hourly_usage"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+            for first, last in partial:
+                rows += self.conn.execute(
+                    f"SELECT {HOUR_LABEL.format('ts')} AS hour, context, COUNT(*) FROM operations "
+                    "WHERE ts >= ? AND ts < ? GROUP BY hour, context", (first, last))
+        counts = {}
+        for hour, context, count in rows:
+            counts[hour, context] = counts.get((hour, context), 0) + count
+        return [key + (count,) for key, count in sorted(counts.items())]
+
+    def frequent_sequences(self, length=2, limit=10, context=None):
+        """Return the most frequent runs of consecutive operations as (ops, count)"""
+        if length < 1:
+            raise ValueError("Sequence length must be at least 1")
+        self.flush()
+        with self.lock:
+            if length > MAX_ROLLUP_SEQUENCE:
+                return self._scan_sequences(length, limit, context)
+            rows = self.conn.execute(
+                "SELECT ops, count FROM sequence_counts WHERE context = ? AND length = ? "
+                "ORDER BY count DESC, ops LIMIT ?", ("" if context is None else context, length, limit))
+        return [(tuple(ops.split(SEPARATOR)), count) for ops, count in rows]
+
+    def _scan_sequences(self, length, limit, context):
+        # Each row carries the operations that came before it
+        columns = ["operation AS op0"] + [
+            f"LAG(operation, {i}) OVER (ORDER BY id) AS op{i}" for i in range(1, length)
+        ]
+        inner = f"SELECT {', '.join(columns)} FROM operations"
+        params = []
+        if context is not None:
+            inner += " WHERE context = ?"
+            params.append(context)
+
+        ordered = ", ".join(f"op{i}" for i in reversed(range(length)))
+        query = (f"SELECT {ordered}, COUNT(*) AS n FROM ({inner}) "
+                 f"WHERE op{length - 1} IS NOT NULL "
+                 f"GROUP BY {ordered} ORDER BY n DESC, {ordered} LIMIT ?")
+        params.append(limit)
+        return [(tuple(row[:-1]), row[-1]) for row in self.conn.execute(query, params)]
+
+    def close(self):
+        """Flush and close the database"""
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the calculator operation history")
+    parser.add_argument("database", help="SQLite history file")
+    parser.add_argument("--hourly", action="store_true", help="Usage per mode per hour")
+    parser.add_argument("--sequences", type=int, metavar="N", help="Most frequent runs of N operations")
+    parser.add_argument("--context", help="Restrict sequences to one context mode")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    db = HistoryDB(args.database)
+    try:
+        if args.hourly:
+            for hour, context, count in db.usage_per_mode_per_hour():
+                print(f"{hour}  {context:<10} {count}")
+        if args.sequences:
+            for ops, count in db.frequent_sequences(args.sequences, args.limit, args.context):
+                print(f"{count:>8}  {' → '.join(ops)}")
+        if not args.hourly and not args.sequences:
+            print(f"{db.count()} operations recorded")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Append-only journal of calculator operations with background compaction"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from usage_store import atomic_write_json
+
+
+def encode_event(seq, timestamp, context, operation, entry):
+    """Encode one event as a compact JSON line"""
+    return json.dumps([seq, timestamp, context, operation, entry],
+                      ensure_ascii=False, separators=(',', ':')) + "\n"
+
+
+def iter_journal(path):
+    """Yield decoded events from a journal file one line at a time"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                seq, timestamp, context, operation, entry = json.loads(line)
+            except (ValueError, TypeError):
+                # A crash mid-append can leave a partial last line
+                continue
+            yield seq, timestamp, context, operation, entry
+
+
+class HistoryJournal:
+    """Records every operation to a line-delimited journal folded into a UsageStore"""
+
+    def __init__(self, path, store, compact_every=5000, recent_size=20, submit=None):
+        self.path = path
+        self.old_path = path + ".old"
+        self.store = store
+        self.compact_every = compact_every
+        self.recent = deque(maxlen=recent_size)
+        self.pending = 0
+        self.compactor = None
+        # Runs summary writes in the background and returns a future, or None when busy
+        self.submit = submit
+        self.seq = store.journal_seq
+
+        self.replay()
+
+        if os.path.exists(self.old_path):
+            # A previous compaction did not finish, fold the segment in now
+            atomic_write_json(self.store.path, self.store.take_snapshot())
+            os.remove(self.old_path)
+
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if self.file.tell() and not self._ends_with_newline():
+            # Terminate a torn line so the next event starts cleanly
+            self.file.write("\n")
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def replay(self):
+        """Apply journaled events newer than the summary to the store"""
+        folded_seq = self.store.journal_seq
+        for path in (self.old_path, self.path):
+            for seq, timestamp, context, operation, entry in iter_journal(path):
+                if seq <= folded_seq:
+                    continue
+                self.store.apply_event(seq, context, operation)
+                self.recent.append({
+                    "operation": operation,
+                    "time": datetime.fromtimestamp(timestamp).isoformat(),
+                    "context": context,
+                    "input": entry
+                })
+                folded_seq = seq
+                self.pending += 1
+        self.seq = folded_seq
+
+    def record(self, operation, context, entry=""):
+        """Append one operation to the journal and fold it into the counters"""
+        self.seq += 1
+        timestamp = round(time.time(), 3)
+        self.file.write(encode_event(self.seq, timestamp, context, operation, entry))
+        self.file.flush()
+        self.store.apply_event(self.seq, context, operation)
+        self.pending += 1
+
+        if self.pending >= self.compact_every:
+            self.compact()
+
+    def maybe_compact(self, now=None):
+        """Compact once the store's flush interval has passed"""
+        if not self.store.dirty:
+            return False
+        if now is None:
+            now = time.monotonic()
+        if now - self.store.last_flush < self.store.flush_interval:
+            return False
+        self.compact(now=now)
+        return True
+
+    def compact(self, background=True, now=None):
+        """Fold the journal into the summary file and start a fresh segment"""
+        if not self.store.dirty and not self.pending:
+            return
+        self.wait()
+
+        self.file.close()
+        if os.path.exists(self.old_path):
+            # The last summary write failed, keep its segment and extend it
+            with open(self.path, 'r', encoding='utf-8') as src, \
+                    open(self.old_path, 'a', encoding='utf-8') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.old_path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.pending = 0
+
+        snapshot = self.store.take_snapshot(now)
+        if background and self.submit is not None:
+            self.compactor = self.submit(self._write_summary, snapshot)
+            if self.compactor is None:
+                # The background queue is full, write the summary here instead
+                self._write_summary(snapshot)
+        elif background:
+            self.compactor = threading.Thread(target=self._write_summary, args=(snapshot,), daemon=True)
+            self.compactor.start()
+        else:
+            self._write_summary(snapshot)
+
+    def _write_summary(self, snapshot):
+        try:
+            atomic_write_json(self.store.path, snapshot)
+            os.remove(self.old_path)
+        except OSError:
+            # The old segment is replayed on next start, retry on the next compaction
+            self.store.dirty = True
+
+    def wait(self):
+        """Wait for a running compaction to finish"""
+        if isinstance(self.compactor, threading.Thread):
+            self.compactor.join()
+        elif self.compactor is not None:
+            self.compactor.result()
+        self.compactor = None
+
+    def close(self):
+        """Compact everything and close the journal"""
+        self.compact(background=False)
+        self.wait()
+        self.file.close()
@@ -0,0 +1,137 @@
+"""Fixed-capacity ring buffer for the session's operation history
+
+Records are kept in parallel array columns: a monotonic timestamp in
+nanoseconds, interned operation and context ids, and the short input text
+as fixed-width UTF-8 bytes.
+Appending overwrites the oldest record once the ring is full, so memory
+stays flat however long the calculator runs. Dicts with ISO time strings
+are only built when a record is read for display or persistence.
+"""
+
+import time
+from array import array
+from datetime import datetime
+
+
+class Interner:
+    """Map repeated strings to small integer ids and back"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        """Return the id of name, assigning the next id on first sight"""
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def name(self, index):
+        """Return the string behind an id"""
+        return self.names[index]
+
+
+# Labels and modes are shared by every session
+OPERATIONS = Interner()
+CONTEXTS = Interner()
+
+# Bytes kept per input: the 10 characters the session records, or fewer
+# when they include symbols such as √ that take several bytes
+INPUT_WIDTH = 12
+
+
+def encode_input(entry):
+    """Return entry as exactly INPUT_WIDTH bytes, cut at a character boundary"""
+    data = entry.encode("utf-8")[:INPUT_WIDTH]
+    data = data.decode("utf-8", "ignore").encode("utf-8")
+    return data.ljust(INPUT_WIDTH, b"\0")
+
+
+class HistoryRing:
+    """Last `capacity` operations as compact columns, oldest overwritten first"""
+
+    __slots__ = ("capacity", "times", "operations", "contexts", "inputs", "start", "wall_offset_ns")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # Columns grow up to capacity, then wrap around
+        self.times = array('q')
+        self.operations = array('I')
+        self.contexts = array('I')
+        self.inputs = bytearray()
+        self.start = 0
+        # Added to a monotonic timestamp to get wall-clock time for display
+        self.wall_offset_ns = time.time_ns() - time.monotonic_ns()
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, operation, context, entry="", timestamp_ns=None):
+        """Record one operation, overwriting the oldest record when full"""
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        operation_id = OPERATIONS.intern(operation)
+        context_id = CONTEXTS.intern(context)
+
+        if len(self.times) < self.capacity:
+            self.times.append(timestamp_ns)
+            self.operations.append(operation_id)
+            self.contexts.append(context_id)
+            self.inputs += encode_input(entry)
+            return
+
+        i = self.start
+        self.times[i] = timestamp_ns
+        self.operations[i] = operation_id
+        self.contexts[i] = context_id
+        self.inputs[i * INPUT_WIDTH:(i + 1) * INPUT_WIDTH] = encode_input(entry)
+        self.start = (i + 1) % self.capacity
+
+    def extend(self, records):
+        """Append history dicts such as the journal's recent events"""
+        for record in records:
+            wall = datetime.fromisoformat(record["time"]).timestamp()
+            self.append(record["operation"], record["context"], record.get("input", ""),
+                        int(wall * 1e9) - self.wall_offset_ns)
+
+    def clear(self):
+        """Drop every record"""
+        self.times = array('q')
+        self.operations = array('I')
+        self.contexts = array('I')
+        self.inputs = bytearray()
+        self.start = 0
+
+    def _slot(self, index):
+        """Translate an index from the oldest record into a column position"""
+        size = len(self.times)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return (self.start + index) % size
+
+    def operation_at(self, index):
+        """Return just the operation label of a record"""
+        return OPERATIONS.name(self.operations[self._slot(index)])
+
+    def __getitem__(self, index):
+        """Materialize one record as a dict with an ISO time string"""
+        i = self._slot(index)
+        return {
+            "operation": OPERATIONS.name(self.operations[i]),
+            "time": datetime.fromtimestamp((self.times[i] + self.wall_offset_ns) / 1e9).isoformat(),
+            "context": CONTEXTS.name(self.contexts[i]),
+            "input": self.inputs[i * INPUT_WIDTH:(i + 1) * INPUT_WIDTH].rstrip(b"\0").decode("utf-8"),
+        }
+
+    def __iter__(self):
+        for index in range(len(self.times)):
+            yield self[index]
+
+    def last(self, n):
+        """Return the newest n records as dicts, oldest first"""
+        size = len(self.times)
+        return [self[index] for index in range(max(0, size - n), size)]
@@ -0,0 +1,42 @@
+"""Grid index resolving a mouse position to the widget under it
+
+The window is split into square cells. Each cell lists the few widgets whose
+rectangle overlaps it, so a lookup is one cell access plus at most a couple
+of rectangle tests, however many widgets there are.
+"""
+
+HIT_CELL_SIZE = 20
+
+
+class HitIndex:
+    """Uniform grid of cells mapping to (rect, widget) pairs"""
+
+    def __init__(self, width, height, cell_size=HIT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cols = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        self.cells = [() for _ in range(self.cols * self.rows)]
+
+    def add(self, rect, widget):
+        """Register a widget under every cell its rect overlaps"""
+        size = self.cell_size
+        first_col = max(rect.left // size, 0)
+        last_col = min((rect.right - 1) // size, self.cols - 1)
+        first_row = max(rect.top // size, 0)
+        last_row = min((rect.bottom - 1) // size, self.rows - 1)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                index = row * self.cols + col
+                self.cells[index] = self.cells[index] + ((rect, widget),)
+
+    def lookup(self, pos):
+        """Return the widget at pos, or None"""
+        x, y = pos
+        col = x // self.cell_size
+        row = y // self.cell_size
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        for rect, widget in self.cells[row * self.cols + col]:
+            if rect.collidepoint(x, y):
+                return widget
+        return None
@@ -0,0 +1,164 @@
+"""Pure numeric kernels behind the context buttons, memoized per input
+
+Each kernel only depends on its arguments, so results are kept in a bounded
+LRU keyed on the inputs. Batch replays and repeated presses with the same
+values skip both the math and the display formatting. Errors are never
+cached, they are raised again on the next call.
+"""
+
+import math
+from functools import lru_cache, wraps
+
+import shopping_kernels
+
+KERNEL_CACHE_SIZE = 512
+
+# Every memoized kernel by name, for stats and clearing
+KERNELS = {}
+
+
+class KernelMemo:
+    """Bounded LRU of kernel results with hit/miss/eviction counters
+
+    Lookups go straight to functools.lru_cache. Equal numbers hash alike, so
+    5, 5.0 and -0.0/0.0 already share an entry; inputs are normalized to
+    floats only on a miss, before the kernel runs.
+    """
+
+    def __init__(self, func, maxsize=KERNEL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.failures = 0  # Misses that raised and stored nothing
+
+        def compute(*args):
+            try:
+                return func(*[normalize(arg) for arg in args])
+            except Exception:
+                self.failures += 1
+                raise
+
+        self.cached = lru_cache(maxsize=maxsize)(compute)
+
+    def __call__(self, *args):
+        return self.cached(*args)
+
+    def stats(self):
+        """Return the counters as a dict"""
+        info = self.cached.cache_info()
+        # Every successful miss stores one entry; the ones no longer there were evicted
+        evictions = info.misses - self.failures - info.currsize
+        return {"hits": info.hits, "misses": info.misses, "evictions": evictions,
+                "size": info.currsize, "maxsize": self.maxsize}
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        self.cached.cache_clear()
+        self.failures = 0
+
+
+def memoized(func):
+    """Register func as a kernel and cache its results by argument values"""
+    memo = KernelMemo(func)
+    if func.__code__.co_argcount == 1:
+        # lru_cache keys a lone int by itself but a lone float as a tuple,
+        # so one-argument kernels are always looked up as floats
+        cached = memo.cached
+
+        def wrapper(value):
+            return cached(float(value))
+        wrapper = wraps(func)(wrapper)
+    else:
+        wrapper = wraps(func)(memo.cached)
+    wrapper.memo = memo
+    KERNELS[func.__name__] = wrapper
+    return wrapper
+
+
+def normalize(value):
+    """Normalize a kernel input so 5, 5.0 and -0.0 share one cache entry"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) + 0.0
+    return value
+
+
+def cache_stats():
+    """Return per-kernel counters plus a "total" entry"""
+    stats = {name: kernel.memo.stats() for name, kernel in KERNELS.items()}
+    stats["total"] = {key: sum(entry[key] for entry in stats.values())
+                      for key in ("hits", "misses", "evictions", "size")}
+    return stats
+
+
+def cache_clear():
+    """Empty every kernel cache"""
+    for kernel in KERNELS.values():
+        kernel.memo.clear()
+
+
+def format_result(value):
+    """Format a Homework result to 10 decimals without trailing zeros"""
+    return str(round(value, 10)).rstrip('0').rstrip('.')
+
+
+@memoized
+def square_root(value):
+    """Return (result, display text), raising ValueError for negatives"""
+    if value < 0:
+        raise ValueError("Negative sqrt")
+    result = math.sqrt(value)
+    return result, format_result(result)
+
+
+@memoized
+def square(value):
+    """Return (result, display text) for value²"""
+    result = value ** 2
+    return result, format_result(result)
+
+
+@memoized
+def trig(name, angle):
+    """Return (result, display text) for sin/cos/tan of an angle in degrees"""
+    radians = math.radians(angle)
+    if name == "sin":
+        result = math.sin(radians)
+    elif name == "cos":
+        result = math.cos(radians)
+    else:
+        if abs(math.cos(radians)) < 1e-10:
+            raise ValueError("Undefined tan")
+        result = math.tan(radians)
+    return result, format_result(result)
+
+
+@memoized
+def convert_temperature(temp):
+    """Return the °C/°F display text; values above 100 are taken as °F"""
+    if temp > 100:
+        return f"{(temp - 32) * 5/9:.1f}°C", "Converted °F to °C"
+    return f"{(temp * 9/5) + 32:.1f}°F", "Converted °C to °F"
+
+
+@memoized
+def tip(amount, tip_percent):
+    """Return (tip, total) rounded to 2 decimals"""
+    return shopping_kernels.tip_one(amount, tip_percent)
+
+
+@memoized
+def tax(amount, tax_percent):
+    """Return (tax, total) rounded to 2 decimals"""
+    return shopping_kernels.tax_one(amount, tax_percent)
+
+
+@memoized
+def increase(base, percentage):
+    """Return (increased, display text) for base raised by percentage %"""
+    increased = base * (1 + percentage/100)
+    return increased, str(round(increased, 2))
+
+
+@memoized
+def decrease(base, percentage):
+    """Return (decreased, display text) for base lowered by percentage %"""
+    decreased = base * (1 - percentage/100)
+    return decreased, str(round(decreased, 2))
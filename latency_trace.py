@@ -0,0 +1,165 @@
+"""Input-to-photon latency traces for mouse clicks and key presses
+
+Each traced event is stamped when the main loop takes it off the queue,
+around the button dispatch it triggers, when its handling is done, and when
+the next frame is rendered and pushed with display.update(). Finished traces
+are appended to a JSON lines file in batches, one record per event with the
+time spent in every stage, so files from many sessions can be aggregated:
+
+    python latency_trace.py trace.jsonl [more.jsonl ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from profiling import Histogram
+
+TRACE_FLUSH_EVENTS = 64  # Records buffered before they are appended to the file
+STAGES = ("handle", "dispatch", "wait", "render", "present", "total")
+
+
+def stage_times(stamps):
+    """Turn named nanosecond stamps into stage durations in milliseconds"""
+    def span(start, end):
+        return round((stamps[end] - stamps[start]) / 1e6, 3)
+
+    stages = {
+        "handle": span("received", "handled"),
+        "wait": span("handled", "render_start"),
+        "render": span("render_start", "rendered"),
+        "present": span("rendered", "presented"),
+        "total": span("received", "presented"),
+    }
+    if "dispatched" in stamps:
+        stages["dispatch"] = span("dispatch_start", "dispatched")
+    return stages
+
+
+class LatencyTracer:
+    """Follows input events from the queue to the frame that shows them"""
+
+    def __init__(self, path=None, flush_every=TRACE_FLUSH_EVENTS, clock=time.perf_counter_ns):
+        self.path = path
+        self.enabled = path is not None
+        self.flush_every = flush_every
+        self.clock = clock
+        self.session = f"{os.getpid()}-{time.time_ns()}"
+        self.current = None  # Trace of the event being handled
+        self.pending = []  # Handled events waiting for the next frame
+        self.buffer = []  # Finished records not written yet
+        self.render_start = self.rendered = 0
+
+    def begin(self, event_name):
+        """Start the trace of an event just taken off the queue"""
+        if not self.enabled:
+            return
+        self.end_event()
+        self.current = {"event": event_name, "label": None, "time": time.time(),
+                        "stamps": {"received": self.clock()}}
+
+    def dispatch_started(self, label):
+        """Note the button the current event pressed"""
+        if self.current is not None:
+            self.current["label"] = label
+            self.current["stamps"]["dispatch_start"] = self.clock()
+
+    def dispatched(self):
+        """Note that the button dispatch returned"""
+        if self.current is not None:
+            self.current["stamps"]["dispatched"] = self.clock()
+
+    def end_event(self):
+        """Finish handling the current event; it waits for the next frame"""
+        if self.current is not None:
+            self.current["stamps"]["handled"] = self.clock()
+            self.pending.append(self.current)
+            self.current = None
+
+    def frame_started(self):
+        """Stamp the start of the frame that will show the pending events"""
+        if not self.enabled:
+            return
+        self.end_event()
+        self.render_start = self.clock()
+
+    def frame_rendered(self):
+        """Stamp the end of drawing, before the screen is updated"""
+        if self.pending:
+            self.rendered = self.clock()
+
+    def frame_presented(self, changed):
+        """Close every pending trace at the frame that was just pushed"""
+        if not self.pending:
+            return
+        presented = self.clock()
+        for trace in self.pending:
+            stamps = trace["stamps"]
+            stamps.update(render_start=self.render_start, rendered=self.rendered, presented=presented)
+            self.buffer.append({"session": self.session, "time": trace["time"], "event": trace["event"],
+                                "label": trace["label"], "changed": changed, "stages_ms": stage_times(stamps)})
+        self.pending.clear()
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Append the finished records to the trace file"""
+        if not self.buffer:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        """Write whatever is still buffered"""
+        if self.enabled:
+            self.flush()
+
+
+def read_traces(paths):
+    """Yield every record of one or more trace files"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def aggregate(records):
+    """Return the histogram summary of every stage, plus event and session counts"""
+    histograms = {stage: Histogram() for stage in STAGES}
+    sessions = set()
+    events = 0
+    for record in records:
+        events += 1
+        sessions.add(record["session"])
+        for stage, ms in record["stages_ms"].items():
+            if stage in histograms:
+                histograms[stage].record(ms / 1000)
+    return {"events": events, "sessions": len(sessions),
+            "stages": {stage: histogram.summary() for stage, histogram in histograms.items()}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate input-to-photon latency traces")
+    parser.add_argument("traces", nargs="+", help="Trace files written with --trace")
+    parser.add_argument("-o", "--output", help="Also write the aggregate as JSON")
+    args = parser.parse_args(argv)
+
+    result = aggregate(read_traces(args.traces))
+    print(f"{result['events']} events from {result['sessions']} sessions")
+    print(f"{'stage':<10} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, summary in result["stages"].items():
+        print(f"{stage:<10} {summary['count']:>8} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} "
+              f"{summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
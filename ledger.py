@@ -0,0 +1,251 @@
+"""Single-pass aggregates over a transaction ledger for Budgeting mode
+
+A ledger is a CSV file (the amount column is the one named amount, value or
+total, otherwise the last one), JSON lines (.jsonl, .ndjson) or a JSON
+array (.json), whose records are objects with an "amount" key or bare
+numbers. The file is read in chunks; each chunk is reduced to count, mean,
+sum of squared deviations, total, min and max and merged into the running
+result with the parallel form of Welford's update. CSV and JSON lines are
+streamed, so memory stays constant however many rows the ledger has; a JSON
+array has to be parsed whole.
+
+    python ledger.py transactions.csv
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from itertools import islice
+
+import shopping_kernels
+
+LEDGER_CHUNK_ROWS = 100_000
+AMOUNT_COLUMNS = ("amount", "value", "total")
+
+
+class LedgerStats:
+    """Count, total, min/max, mean and variance of a stream of amounts"""
+
+    __slots__ = ("name", "count", "mean", "m2", "total", "min", "max", "skipped")
+
+    def __init__(self, name="Ledger"):
+        self.name = name
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.skipped = 0
+
+    def add(self, amount):
+        """Fold one amount in with Welford's update"""
+        self.count += 1
+        delta = amount - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount - self.mean)
+        self.total += amount
+        if amount < self.min:
+            self.min = amount
+        if amount > self.max:
+            self.max = amount
+
+    def add_many(self, amounts):
+        """Fold a chunk of amounts in, reducing it as a whole when NumPy is available"""
+        if not amounts:
+            return
+        if not shopping_kernels.have_numpy():
+            for amount in amounts:
+                self.add(amount)
+            return
+        np = shopping_kernels.np
+        values = np.asarray(amounts, dtype=np.float64)
+        chunk = LedgerStats()
+        chunk.count = len(values)
+        chunk.total = float(values.sum())
+        chunk.mean = chunk.total / chunk.count
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Combine with the aggregates of another part of the ledger"""
+        if not other.count:
+            self.skipped += other.skipped
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.skipped += other.skipped
+
+    @property
+    def variance(self):
+        """Sample variance, 0 with fewer than two amounts"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def progress(self, target):
+        """Return the ledger total as a percentage of a goal"""
+        if not target or target <= 0:
+            return None
+        return self.total / target * 100
+
+    def summary(self):
+        """Return the aggregates as a plain dict"""
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "variance": self.variance,
+            "stddev": self.stddev,
+            "skipped": self.skipped,
+        }
+
+
+def parse_amount(text):
+    """Return text as a finite float, or None"""
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def csv_amount_column(first_row):
+    """Return (column index, whether first_row is a header)"""
+    names = [name.strip().lower() for name in first_row]
+    for name in AMOUNT_COLUMNS:
+        if name in names:
+            return names.index(name), True
+    is_header = parse_amount(first_row[-1]) is None if first_row else False
+    return len(first_row) - 1, is_header
+
+
+def record_amount(record):
+    """Return the amount of a JSON record (an object or a bare number), or None"""
+    if isinstance(record, dict):
+        record = record.get("amount")
+    if isinstance(record, bool):
+        return None
+    return parse_amount(record)
+
+
+def record_chunks(records, chunk_rows):
+    """Yield (amounts, skipped records) per chunk of decoded JSON records"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_rows))
+        if not chunk:
+            return
+        amounts, skipped = [], 0
+        for record in chunk:
+            value = record_amount(record)
+            if value is None:
+                skipped += 1
+            else:
+                amounts.append(value)
+        yield amounts, skipped
+
+
+def _json_lines(f):
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def read_amount_chunks(path, chunk_rows=LEDGER_CHUNK_ROWS):
+    """Yield (amounts, skipped rows) per chunk of the ledger"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            yield from record_chunks(_json_lines(f), chunk_rows)
+            return
+        if path.lower().endswith(".json"):
+            records = json.load(f)
+            if not isinstance(records, list):
+                raise ValueError("a JSON ledger must be an array of amounts or objects")
+            yield from record_chunks(records, chunk_rows)
+            return
+
+        rows = csv.reader(f)
+        first = next(rows, None)
+        if first is None:
+            return
+        column, has_header = csv_amount_column(first)
+        if not has_header:
+            rows = _prepend(first, rows)
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                return
+            amounts, skipped = [], 0
+            for row in chunk:
+                if not row:
+                    continue
+                value = parse_amount(row[column]) if len(row) > column else None
+                if value is None:
+                    skipped += 1
+                else:
+                    amounts.append(value)
+            yield amounts, skipped
+
+
+def _prepend(row, rows):
+    yield row
+    yield from rows
+
+
+def load_ledger(path, chunk_rows=LEDGER_CHUNK_ROWS):
+    """Stream a ledger file once and return its LedgerStats"""
+    stats = LedgerStats(os.path.basename(path).rsplit(".", 1)[0])
+    for amounts, skipped in read_amount_chunks(path, chunk_rows):
+        stats.add_many(amounts)
+        stats.skipped += skipped
+    return stats
+
+
+def unreadable_message(stats):
+    """Return why a ledger with rows but no readable amount cannot be shown, or None"""
+    if stats.count or not stats.skipped:
+        return None
+    return f"no readable amounts in {stats.skipped} rows"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a transaction ledger in one pass")
+    parser.add_argument("ledger", help="CSV, JSON lines or JSON array file of transactions")
+    parser.add_argument("--goal", type=float, help="Show the total as progress towards this goal")
+    args = parser.parse_args(argv)
+
+    stats = load_ledger(args.ledger)
+    problem = unreadable_message(stats)
+    if problem:
+        print(f"{args.ledger}: {problem}", file=sys.stderr)
+        return 1
+    summary = stats.summary()
+    if args.goal:
+        summary["goal_progress"] = stats.progress(args.goal)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
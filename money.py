@@ -0,0 +1,124 @@
+"""Exact fcfa money arithmetic for Shopping and Budgeting in money mode
+
+All operations run on decimal.Decimal through one shared, preconfigured
+context and reuse cached quantize exponents, so sums and percentage chains
+stay exact to the centime and each operation stays cheap. Results are
+rounded half-up to 2 decimals, the usual rule for currency.
+"""
+
+from decimal import (Context, Decimal, DivisionByZero, InvalidOperation,
+                     Overflow, ROUND_HALF_UP)
+
+MONEY_CONTEXT = Context(prec=28, rounding=ROUND_HALF_UP,
+                        traps=[InvalidOperation, DivisionByZero, Overflow])
+
+HUNDRED = Decimal(100)
+TWO = Decimal(2)
+
+# Quantize exponents by number of decimals, built once
+_EXPONENTS = {places: Decimal(1).scaleb(-places) for places in range(0, 7)}
+CENTS = _EXPONENTS[2]
+
+
+def exponent(places):
+    """Return the cached quantize exponent for a number of decimals"""
+    exp = _EXPONENTS.get(places)
+    if exp is None:
+        exp = _EXPONENTS[places] = Decimal(1).scaleb(-places)
+    return exp
+
+
+def quantize(value, places=2):
+    """Round half-up to a number of decimals"""
+    return value.quantize(exponent(places), context=MONEY_CONTEXT)
+
+
+def to_decimal(value):
+    """Convert a field string, int or float to Decimal without binary noise
+
+    Raises ValueError for text that is not a number, like float() does.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        value = repr(value)
+    try:
+        number = Decimal(value.strip() if isinstance(value, str) else value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Invalid amount: {value!r}") from None
+    if not number.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return number
+
+
+def parse_money(text):
+    """Return the Decimal for field text, or None if it is empty or invalid"""
+    if not text:
+        return None
+    try:
+        return to_decimal(text)
+    except ValueError:
+        return None
+
+
+def format_money(value):
+    """Format an amount with exactly 2 decimals"""
+    return str(quantize(value))
+
+
+def percent_of(amount, percent):
+    """Return percent % of amount, unrounded"""
+    return MONEY_CONTEXT.divide(MONEY_CONTEXT.multiply(amount, to_decimal(percent)), HUNDRED)
+
+
+def tip_one(amount, tip_percent=15):
+    """Return (tip, total) rounded to the centime"""
+    tip_amount = quantize(percent_of(amount, tip_percent))
+    return tip_amount, MONEY_CONTEXT.add(quantize(amount), tip_amount)
+
+
+def tax_one(amount, tax_percent=8):
+    """Return (tax, total) rounded to the centime"""
+    tax = quantize(percent_of(amount, tax_percent))
+    return tax, MONEY_CONTEXT.add(quantize(amount), tax)
+
+
+def split_one(total, people):
+    """Return the share per person rounded to the centime"""
+    if people == 0:
+        raise ZeroDivisionError("Cannot split by 0 people")
+    return quantize(MONEY_CONTEXT.divide(total, to_decimal(people)))
+
+
+def save_one(original, discount_pct):
+    """Return (saved, final price) rounded to the centime"""
+    discount_pct = to_decimal(discount_pct)
+    if discount_pct < 0 or discount_pct > 100:
+        raise ValueError("Discount must be 0-100%")
+    saved = quantize(percent_of(original, discount_pct))
+    return saved, MONEY_CONTEXT.subtract(quantize(original), saved)
+
+
+def multiply(price, quantity):
+    """Return price × quantity rounded to the centime"""
+    return quantize(MONEY_CONTEXT.multiply(price, to_decimal(quantity)))
+
+
+def increase(base, percentage):
+    """Return base increased by percentage %, rounded to the centime"""
+    return quantize(MONEY_CONTEXT.add(base, percent_of(base, percentage)))
+
+
+def decrease(base, percentage):
+    """Return base decreased by percentage %, rounded to the centime"""
+    return quantize(MONEY_CONTEXT.subtract(base, percent_of(base, percentage)))
+
+
+def average(first, second):
+    """Return the mean of two amounts, rounded to the centime"""
+    return quantize(MONEY_CONTEXT.divide(MONEY_CONTEXT.add(first, second), TWO))
+
+
+def progress(current, target):
+    """Return current as a percentage of target"""
+    return MONEY_CONTEXT.divide(MONEY_CONTEXT.multiply(current, HUNDRED), target)
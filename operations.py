@@ -0,0 +1,417 @@
+"""Registry of the context buttons: (context, label) -> operation
+
+Each operation declares the input fields it reads and how its result is
+shown. The session parses the declared fields, calls the handler and
+formats what it returns, so pressing a context button is one dict lookup.
+A new mode adds its buttons to CONTEXT_MODES and registers one operation
+per label with @register_operation, without touching the dispatch code.
+
+Handlers take the session followed by the parsed field values, in the
+order declared, and return the value to show or None when they failed
+(after setting session.error_message) or left the display alone.
+"""
+
+import math
+
+import kernels
+import money
+from shopping_kernels import DEFAULT_TAX_PERCENT, DEFAULT_TIP_PERCENT
+
+# Contexts whose fields are read as exact Decimals in money mode
+MONEY_CONTEXTS = ("Shopping", "Budgeting")
+
+OPERATIONS = {}
+
+
+class Operation:
+    """One context button: its handler, declared fields and result formatter"""
+
+    __slots__ = ("context", "label", "handler", "fields", "formatter")
+
+    def __init__(self, context, label, handler, fields=(), formatter=None):
+        self.context = context
+        self.label = label
+        self.handler = handler
+        self.fields = tuple(fields)
+        self.formatter = formatter
+
+    def read_fields(self, session):
+        """Parse the declared input fields, None for empty or invalid ones"""
+        if self.context in MONEY_CONTEXTS:
+            return [session.get_amount_value(field_id) for field_id in self.fields]
+        return [session.get_input_value(field_id) for field_id in self.fields]
+
+    def run(self, session):
+        """Run the operation and show its formatted result on the display"""
+        try:
+            value = self.handler(session, *self.read_fields(session))
+            if value is not None:
+                session.current_input = self.formatter(session, value) if self.formatter else value
+        except ValueError:
+            session.error_message = "Invalid number format"
+        except ZeroDivisionError:
+            session.error_message = "Cannot divide by zero"
+        except Exception as e:
+            session.error_message = f"Error: {str(e)[:30]}"
+        # Clear active input field after operation
+        session.active_input_field = None
+
+
+def register_operation(context, label, fields=(), formatter=None):
+    """Decorator registering handler(session, *field values) for a context button"""
+    def decorator(handler):
+        OPERATIONS[(context, label)] = Operation(context, label, handler, fields, formatter)
+        return handler
+    return decorator
+
+
+def lookup_operation(context, label):
+    """Return the Operation for a button, or None"""
+    return OPERATIONS.get((context, label))
+
+
+def as_amount(session, value):
+    """Show a rounded amount, with exactly 2 decimals in money mode"""
+    return session.format_amount(value)
+
+
+def display_amount(session, message):
+    """Parse the main display as an amount, or set message and return None"""
+    if session.current_input:
+        return session.parse_amount(session.current_input)
+    session.error_message = message
+    return None
+
+
+def display_number(session, message):
+    """Parse the main display as a float, or set message and return None"""
+    if session.current_input:
+        return float(session.current_input)
+    session.error_message = message
+    return None
+
+
+# Shopping
+
+@register_operation("Shopping", "Tip", fields=("field_0", "field_2"), formatter=as_amount)
+def shopping_tip(session, amount, tip_percent):
+    if amount is None:
+        amount = display_amount(session, "Enter amount in Amount field or display")
+        if amount is None:
+            return None
+    if tip_percent is None:
+        tip_percent = DEFAULT_TIP_PERCENT
+
+    if session.money_mode:
+        tip_amount, total = money.tip_one(amount, tip_percent)
+    else:
+        tip_amount, total = kernels.tip(amount, tip_percent)
+
+    session.smart_suggestions = [f"Tip: {tip_amount:.2f} fcfa", f"Total: {total:.2f} fcfa"]
+    session.set_input_value("field_0", str(amount))
+    if tip_percent != DEFAULT_TIP_PERCENT:
+        session.set_input_value("field_2", str(tip_percent))
+    return total
+
+
+@register_operation("Shopping", "Tax", fields=("field_0", "field_3"), formatter=as_amount)
+def shopping_tax(session, amount, tax_percent):
+    if amount is None:
+        amount = display_amount(session, "Enter amount in Amount field or display")
+        if amount is None:
+            return None
+    if tax_percent is None:
+        tax_percent = DEFAULT_TAX_PERCENT
+
+    if session.money_mode:
+        tax, total = money.tax_one(amount, tax_percent)
+    else:
+        tax, total = kernels.tax(amount, tax_percent)
+
+    session.smart_suggestions = [f"Tax: fcfa{tax:.2f}", f"Total: fcfa{total:.2f}"]
+    session.set_input_value("field_0", str(amount))
+    return total
+
+
+@register_operation("Shopping", "Split", fields=("field_0", "field_1"), formatter=as_amount)
+def shopping_split(session, total, people):
+    if total is None or people is None:
+        session.error_message = "Enter Total and People in input fields"
+        return None
+    if people == 0:
+        session.error_message = "Cannot split by 0 people"
+        return None
+
+    per_person = session.money_rules().split_one(total, people)
+    session.smart_suggestions = [f"Each pays: {per_person:.2f} fcfa"]
+    session.set_input_value("field_0", str(total))
+    session.set_input_value("field_1", str(int(people)))
+    return per_person
+
+
+@register_operation("Shopping", "Total", formatter=as_amount)
+def shopping_total(session):
+    # Price times quantity, from the pending operand and the display
+    if not (session.previous_input and session.current_input):
+        session.error_message = "Enter price and quantity"
+        return None
+    try:
+        price = session.parse_amount(session.previous_input)
+        quantity = float(session.current_input)
+        if session.money_mode:
+            total = money.multiply(price, session.current_input)
+        else:
+            total = round(price * quantity, 2)
+    except:
+        session.error_message = "Invalid values"
+        return None
+    session.smart_suggestions = [f"Total: {total:.2f} fcfa"]
+    return total
+
+
+@register_operation("Shopping", "Save", fields=("field_0",), formatter=as_amount)
+def shopping_save(session, original):
+    discount = session.current_input
+    if original is None:
+        session.error_message = "Enter original price in Amount field"
+        return None
+    if not discount:
+        session.error_message = "Enter discount percentage"
+        return None
+
+    try:
+        discount_pct = float(discount)
+        if discount_pct < 0 or discount_pct > 100:
+            session.error_message = "Discount must be 0-100%"
+            return None
+        saved, final_price = session.money_rules().save_one(original, discount_pct)
+    except:
+        session.error_message = "Invalid discount"
+        return None
+    session.smart_suggestions = [f"Saved: {saved:.2f} fcfa", f"Final: {final_price:.2f} fcfa"]
+    session.set_input_value("field_0", str(original))
+    return final_price
+
+
+# Homework
+
+@register_operation("Homework", "π")
+def homework_pi(session):
+    session.smart_suggestions = ["e", "√", "x²", "sin()"]
+    session.set_input_value("field_1", str(math.pi))
+    return str(math.pi)
+
+
+@register_operation("Homework", "e")
+def homework_e(session):
+    session.smart_suggestions = ["π", "ln", "log", "√"]
+    session.set_input_value("field_1", str(math.e))
+    return str(math.e)
+
+
+@register_operation("Homework", "√", fields=("field_1",))
+def homework_sqrt(session, value):
+    if value is None:
+        value = display_number(session, "Enter value in Value field or display")
+        if value is None:
+            return None
+    if value < 0:
+        session.error_message = "Error: Negative sqrt"
+        return None
+    result, text = kernels.square_root(value)
+    session.set_input_value("field_1", str(result))
+    return text
+
+
+@register_operation("Homework", "x²", fields=("field_1",))
+def homework_square(session, value):
+    if value is None:
+        value = display_number(session, "Enter value in Value field or display")
+        if value is None:
+            return None
+    result, text = kernels.square(value)
+    session.set_input_value("field_1", str(result))
+    return text
+
+
+def trig_operation(name):
+    """Build the handler for one of the sin/cos/tan buttons"""
+    def homework_trig(session, angle):
+        if angle is None:
+            angle = display_number(session, "Enter angle in Angle field or display")
+            if angle is None:
+                return None
+        try:
+            result, text = kernels.trig(name, angle)
+        except ValueError:
+            session.error_message = "Error: Undefined tan"
+            return None
+        session.smart_suggestions = ["sin", "cos", "tan", "π", "√"]
+        session.set_input_value("field_0", str(angle))
+        session.set_input_value("field_1", str(result))
+        return text
+    return homework_trig
+
+
+for _name in ("sin", "cos", "tan"):
+    register_operation("Homework", _name, fields=("field_0",))(trig_operation(_name))
+
+
+# Budgeting
+
+@register_operation("Budgeting", "%", fields=("field_1",))
+def budgeting_percent(session, value):
+    if value is None:
+        value = display_amount(session, "Enter value in Percentage field or display")
+        if value is None:
+            return None
+    session.smart_suggestions = ["Converted to decimal"]
+    session.set_input_value("field_1", str(value))
+    return str(value / 100)
+
+
+@register_operation("Budgeting", "Inc", fields=("field_0", "field_1"))
+def budgeting_increase(session, base, percentage):
+    if base is None or percentage is None:
+        session.error_message = "Enter Base Amount and Percentage in input fields"
+        return None
+    if session.money_mode:
+        increased = money.increase(base, percentage)
+        text = money.format_money(increased)
+    else:
+        increased, text = kernels.increase(base, percentage)
+    session.smart_suggestions = [f"Increased by {percentage}% to {increased:.2f}"]
+    session.set_input_value("field_0", str(base))
+    session.set_input_value("field_1", str(percentage))
+    return text
+
+
+@register_operation("Budgeting", "Dec", fields=("field_0", "field_1"))
+def budgeting_decrease(session, base, percentage):
+    if base is None or percentage is None:
+        session.error_message = "Enter Base Amount and Percentage in input fields"
+        return None
+    if session.money_mode:
+        decreased = money.decrease(base, percentage)
+        text = money.format_money(decreased)
+    else:
+        decreased, text = kernels.decrease(base, percentage)
+    session.smart_suggestions = [f"Decreased by {percentage}% to {decreased:.2f}"]
+    session.set_input_value("field_0", str(base))
+    session.set_input_value("field_1", str(percentage))
+    return text
+
+
+@register_operation("Budgeting", "Avg", fields=("field_4", "field_5"))
+def budgeting_average(session, num1, num2):
+    if num1 is None or num2 is None:
+        # Fall back to using previous and current inputs
+        if not (session.previous_input and session.current_input):
+            session.error_message = "Enter num1 and num2 for average"
+            return None
+        try:
+            num1 = session.parse_amount(session.previous_input)
+            num2 = session.parse_amount(session.current_input)
+        except:
+            session.error_message = "Enter num1 and num2 for average"
+            return None
+    session.smart_suggestions = ["Average calculated"]
+    return session.format_average(num1, num2)
+
+
+@register_operation("Budgeting", "Save", fields=("field_0",))
+def budgeting_save(session, income):
+    if income is None:
+        income = display_amount(session, "Enter income in Base Amount field or display")
+        if income is None:
+            return None
+
+    if session.money_mode:
+        save_10, save_20, save_30 = (money.quantize(money.percent_of(income, p)) for p in (10, 20, 30))
+    else:
+        save_10 = income * 0.10
+        save_20 = income * 0.20
+        save_30 = income * 0.30
+
+    session.smart_suggestions = [
+        f"Save 10%: {save_10:.2f} fcfa",
+        f"Save 20%: {save_20:.2f} fcfa",
+        f"Save 30%: {save_30:.2f} fcfa"
+    ]
+    session.set_input_value("field_0", str(income))
+    return None
+
+
+@register_operation("Budgeting", "Goal", fields=("field_2", "field_3"))
+def budgeting_goal(session, target, current_saved):
+    if target is None or current_saved is None:
+        session.error_message = "Enter Target Goal and Current in input fields"
+        return None
+    if target <= 0:
+        session.error_message = "Goal must be positive"
+        return None
+
+    if session.money_mode:
+        progress = money.progress(current_saved, target)
+    else:
+        progress = (current_saved / target) * 100
+    session.smart_suggestions = [f"Progress: {progress:.1f}% of {target:.2f} fcfa"]
+    session.set_input_value("field_2", str(target))
+    session.set_input_value("field_3", str(current_saved))
+    return f"{progress:.1f}%"
+
+
+# Cooking
+
+def scale_operation(scale, factor, suggestions):
+    """Build the handler for a Cooking scaling button
+
+    factor is the text stored in the Scale Factor field.
+    """
+    def cooking_scale(session, amount):
+        if amount is None:
+            if session.current_input:
+                amount = float(session.current_input)
+            elif session.recipe is not None:
+                # No single amount given, scale the whole loaded recipe
+                session.set_input_value("field_3", factor)
+                session.recipe_page = 0
+                session.smart_suggestions = [f"Recipe × {factor}", *suggestions]
+                return None
+            else:
+                session.error_message = "Enter amount in Amount field or display"
+                return None
+
+        text = str(round(scale(amount), 3)).rstrip('0').rstrip('.')
+        # A fresh list: press_clear() empties smart_suggestions in place
+        session.smart_suggestions = list(suggestions)
+        session.set_input_value("field_0", text)
+        session.set_input_value("field_3", factor)
+        return text
+    return cooking_scale
+
+
+# Label -> (divisor or multiplier, stored scale factor, suggestions)
+COOKING_SCALING = {
+    "½": (lambda x: x / 2, "0.5", ("2×", "⅓", "¼")),
+    "⅓": (lambda x: x / 3, "0.333", ("½", "¼", "2×")),
+    "¼": (lambda x: x / 4, "0.25", ("½", "⅓", "2×")),
+    "2×": (lambda x: x * 2, "2", ("½", "⅓", "3×")),
+    "3×": (lambda x: x * 3, "3", ("½", "⅓", "2×")),
+}
+
+for _label, (_scale, _factor, _suggestions) in COOKING_SCALING.items():
+    register_operation("Cooking", _label, fields=("field_0",))(scale_operation(_scale, _factor, _suggestions))
+
+
+@register_operation("Cooking", "°C/°F", fields=("field_2",))
+def cooking_temperature(session, temperature):
+    if temperature is None:
+        temperature = display_number(session, "Enter temperature in Temperature field or display")
+        if temperature is None:
+            return None
+    # Values above 100 are taken as °F, the rest as °C
+    text, note = kernels.convert_temperature(temperature)
+    session.smart_suggestions = [note]
+    session.set_input_value("field_2", text)
+    return text
@@ -0,0 +1,112 @@
+"""Incremental detection of the context a calculation belongs to
+
+The last presses are kept in a fixed-size window together with a count of
+every label in it. Pushing a press and evicting the oldest one are O(1)
+counter updates, so the window can hold hundreds of presses while each
+press still costs the same. The decision reads those counts plus the current
+display, and only switches modes after the same candidate wins several
+presses in a row and a cooldown since the last switch has passed, so the
+mode does not flap between two contexts.
+"""
+
+from collections import deque
+
+PATTERN_WINDOW = 5
+PATTERN_HOLD = 2  # Consecutive presses a new context must win before switching
+PATTERN_COOLDOWN = 5  # Presses after a switch before the next one is allowed
+
+TRIG_LABELS = ("sin", "cos", "tan", "√", "^")
+FRACTION_TEXT = ("0.25", "0.33", "0.5", "0.75")
+
+
+class PatternDetector:
+    """Rolling label counts over the last presses with a hysteresis switch rule"""
+
+    def __init__(self, window=PATTERN_WINDOW, hold=PATTERN_HOLD, cooldown=PATTERN_COOLDOWN):
+        self.window = deque()
+        self.size = window
+        self.counts = {}
+        self.hold = hold
+        self.cooldown = cooldown
+        self.candidate = None
+        self.streak = 0
+        self.since_switch = cooldown
+
+    def __len__(self):
+        return len(self.window)
+
+    def __iter__(self):
+        return iter(self.window)
+
+    def push(self, label):
+        """Add a press to the window, evicting the oldest when full"""
+        counts = self.counts
+        if len(self.window) >= self.size:
+            old = self.window.popleft()
+            remaining = counts[old] - 1
+            if remaining:
+                counts[old] = remaining
+            else:
+                del counts[old]
+        self.window.append(label)
+        counts[label] = counts.get(label, 0) + 1
+        self.since_switch += 1
+
+    def count(self, label):
+        """Return how often label occurs in the window"""
+        return self.counts.get(label, 0)
+
+    def recent(self, n):
+        """Return the last n presses, oldest first"""
+        window = self.window
+        n = min(n, len(window))
+        return [window[i] for i in range(-n, 0)]
+
+    def clear(self):
+        """Forget the window after the user picked a mode, holding off auto switches"""
+        self.window.clear()
+        self.counts.clear()
+        self.candidate = None
+        self.streak = 0
+        self.since_switch = 0
+
+    def classify(self, current_input, previous_input, current_operator):
+        """Return the context the window and display point to, or None"""
+        if not (current_input and previous_input):
+            return None
+        count = self.counts.get
+
+        # Shopping/Tipping pattern
+        if count("Tip") or (count("+") and current_input.replace('.', '').isdigit() and float(current_input) < 100):
+            return "Shopping"
+        # Percentage calculations
+        if "%" in current_operator or (count("/") and count("100")):
+            return "Budgeting"
+        # Fraction/decimal patterns (cooking)
+        if "." in current_input or any(x in current_input for x in FRACTION_TEXT):
+            return "Cooking"
+        # Complex math patterns (homework)
+        if any(count(label) for label in TRIG_LABELS):
+            return "Homework"
+        return None
+
+    def observe(self, current_context, current_input, previous_input, current_operator):
+        """Return the context to switch to after this press, or None to stay"""
+        candidate = self.classify(current_input, previous_input, current_operator)
+        if candidate is None or candidate == current_context:
+            self.candidate = None
+            self.streak = 0
+            return None
+
+        if candidate == self.candidate:
+            self.streak += 1
+        else:
+            self.candidate = candidate
+            self.streak = 1
+
+        if self.streak < self.hold or self.since_switch < self.cooldown:
+            return None
+        self.candidate = None
+        self.streak = 0
+        self.since_switch = 0
+        return candidate
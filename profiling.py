@@ -0,0 +1,138 @@
+"""Opt-in latency histograms for frames, handlers and persistence calls
+
+Functions are wrapped only when profiling is switched on, so a normal run
+pays nothing. Each wrapped call adds its duration to a fixed-bucket
+histogram: a bisect into constant bucket edges and one counter increment.
+Percentiles are read from the buckets and dumped to JSON.
+"""
+
+import json
+import time
+from array import array
+from bisect import bisect_left
+from functools import wraps
+
+from frame_pacer import FRAME_RATE
+from usage_store import atomic_write_json
+
+# Bucket upper edges in seconds: 1µs to ~10s, about 10 buckets per decade
+BUCKET_EDGES = tuple(10 ** (exponent / 10) * 1e-6 for exponent in range(0, 71))
+
+FRAME_BUDGET = 1 / FRAME_RATE  # Seconds one frame may take at full frame rate
+
+
+class Histogram:
+    """Counts of durations per fixed bucket, plus count, total and max"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * (len(BUCKET_EDGES) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Add one duration"""
+        self.counts[bisect_left(BUCKET_EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Return the bucket edge below which fraction of the durations fall"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                # A bucket edge can lie above every recorded duration
+                return min(BUCKET_EDGES[index], self.max) if index < len(BUCKET_EDGES) else self.max
+        return self.max
+
+    def summary(self):
+        """Return count, mean, p50/p95/p99 and max in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Profiler:
+    """Named histograms and the wrappers that feed them"""
+
+    def __init__(self, enabled=False, path=None):
+        self.enabled = enabled
+        self.path = path
+        self.histograms = {}
+        self.last = {}
+
+    def histogram(self, name):
+        """Return the histogram of name, creating it on first use"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def wrap(self, name, func):
+        """Return func timed into histogram name, or func itself when disabled"""
+        if not self.enabled:
+            return func
+        histogram = self.histogram(name)
+        last = self.last
+        clock = time.perf_counter
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                histogram.record(elapsed)
+                last[name] = elapsed
+        return timed
+
+    def instrument(self, owner, names, prefix=""):
+        """Replace attributes of a module or object with timed versions"""
+        if not self.enabled:
+            return
+        for name in names:
+            setattr(owner, name, self.wrap(prefix + name, getattr(owner, name)))
+
+    def summary(self):
+        """Return the summary of every histogram by name"""
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path=None):
+        """Write the percentiles to a JSON file and return its path"""
+        path = path or self.path
+        if path:
+            atomic_write_json(path, self.summary())
+        return path
+
+    def overlay_lines(self, frame_name):
+        """Return short text lines on the frame budget for the overlay"""
+        last_ms = self.last.get(frame_name, 0.0) * 1000
+        frame = self.histograms.get(frame_name)
+        p95_ms = frame.percentile(0.95) * 1000 if frame else 0.0
+        budget_ms = FRAME_BUDGET * 1000
+        lines = [f"frame {last_ms:.2f} ms / {budget_ms:.1f} ms ({last_ms / budget_ms:.0%})",
+                 f"p95 {p95_ms:.2f} ms"]
+        slowest = sorted((name for name in self.last if name != frame_name),
+                         key=lambda name: self.last[name], reverse=True)[:2]
+        lines += [f"{name} {self.last[name] * 1000:.2f} ms" for name in slowest]
+        return lines
+
+
+def load_summary(path):
+    """Read a dumped summary back"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,176 @@
+"""Tip, tax, split and discount results for whole CSV files of receipts
+
+Each input row is one receipt:
+
+    amount,people,tip_percent,tax_percent,discount_percent
+
+Only amount is required; a missing or empty tip or tax percentage uses the
+Shopping defaults, a missing people count means 1 and a missing discount 0.
+A header row is skipped. Rows are parsed in chunks that worker processes turn
+into output CSV text with the same array rules as Shopping mode, and the
+chunks are written back in input order. Only a few chunks are in flight at a
+time, so memory depends on the chunk size, not on the size of the file.
+
+    python receipt_batch.py receipts.csv -o results.csv --workers 8
+"""
+
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import shopping_kernels
+from shopping_kernels import DEFAULT_TAX_PERCENT, DEFAULT_TIP_PERCENT
+
+CHUNK_ROWS = 50_000
+CHUNKS_PER_WORKER = 2  # Chunks queued per worker process before the reader waits
+
+OUTPUT_HEADER = ("amount", "tip", "total_with_tip", "tax", "total_with_tax",
+                 "per_person", "saved", "final_price")
+DEFAULTS = (None, 1.0, DEFAULT_TIP_PERCENT, DEFAULT_TAX_PERCENT, 0.0)
+
+
+def parse_number(text, default):
+    """Return text as a float, default when empty, NaN when unreadable"""
+    text = text.strip()
+    if not text:
+        return default
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+def parse_rows(rows):
+    """Return the five input columns of a chunk of parsed CSV rows"""
+    columns = [[] for _ in DEFAULTS]
+    for row in rows:
+        if not row or row[0].startswith("#"):
+            continue
+        row = row + [""] * (len(DEFAULTS) - len(row))
+        for column, text, default in zip(columns, row, DEFAULTS):
+            column.append(parse_number(text, math.nan if default is None else default))
+    return columns
+
+
+ROW_FORMAT = ",".join(["%.2f"] * len(OUTPUT_HEADER)) + "\n"
+
+
+def as_list(values):
+    """Native floats from an array or list, which format much faster"""
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def evaluate_chunk(rows):
+    """Apply the Shopping rules to a chunk of parsed CSV rows and return output CSV text"""
+    amounts, people, tip_percent, tax_percent, discount = parse_rows(rows)
+    if not amounts:
+        return "", 0
+
+    tips, tip_totals = shopping_kernels.tip(amounts, tip_percent)
+    taxes, tax_totals = shopping_kernels.tax(amounts, tax_percent)
+    shares = shopping_kernels.split(amounts, people)
+    saved, final_prices = shopping_kernels.save(amounts, discount)
+
+    columns = [as_list(column) for column in
+               (amounts, tips, tip_totals, taxes, tax_totals, shares, saved, final_prices)]
+    text = "".join([ROW_FORMAT % row for row in zip(*columns)])
+    # Cells a rule could not fill (NaN) are left empty
+    return text.replace("nan", ""), len(amounts)
+
+
+def is_header(row):
+    """Return True for a first row whose amount column is not a number"""
+    first = row[0].strip() if row else ""
+    return bool(first) and not first.startswith("#") and math.isnan(parse_number(first, 0.0))
+
+
+def read_chunks(stream, chunk_rows=CHUNK_ROWS):
+    """Yield lists of up to chunk_rows parsed CSV rows, skipping a header row
+
+    Rows are parsed here so that a quoted field spanning lines stays in one chunk.
+    """
+    rows = csv.reader(stream)
+    first = next(rows, None)
+    if first is None:
+        return
+    if not is_header(first):
+        rows = _prepend(first, rows)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _prepend(row, rows):
+    yield row
+    yield from rows
+
+
+def evaluate_chunks(chunks, workers=None):
+    """Yield (csv text, rows) per chunk in input order, fanned out to processes"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield evaluate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(evaluate_chunk, chunk))
+            # Wait on the oldest chunk instead of reading further ahead
+            if len(in_flight) >= workers * CHUNKS_PER_WORKER:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def run(stream, out, workers=None, chunk_rows=CHUNK_ROWS, report=sys.stderr):
+    """Evaluate every receipt in stream and write the results to out"""
+    stats = {"rows": 0, "chunks": 0}
+    start = time.perf_counter()
+    out.write(",".join(OUTPUT_HEADER) + "\n")
+    for text, rows in evaluate_chunks(read_chunks(stream, chunk_rows), workers):
+        out.write(text)
+        stats["rows"] += rows
+        stats["chunks"] += 1
+    elapsed = time.perf_counter() - start
+
+    rate = stats["rows"] / elapsed if elapsed > 0 else 0.0
+    if report is not None:
+        print(f"{stats['rows']} receipts in {stats['chunks']} chunks in {elapsed:.2f}s "
+              f"({rate:,.0f} receipts/s)", file=report)
+    stats["seconds"] = elapsed
+    stats["rows_per_second"] = rate
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute Shopping results for a CSV file of receipts")
+    parser.add_argument("input", help="CSV of amount,people,tip_percent,tax_percent,discount_percent, or - for stdin")
+    parser.add_argument("-o", "--output", help="Write results here instead of stdout")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Receipts per chunk sent to a worker")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    out = sys.stdout if not args.output else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        run(stream, out, args.workers, args.chunk_rows)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Whole-recipe scaling for Cooking mode
+
+A Recipe keeps its quantities in one array, so scaling every ingredient is a
+single vectorized multiply. Scaled views are cached per factor, which keeps
+toggling between ½ and 2× on large recipes instant.
+"""
+
+import csv
+import json
+import os
+from collections import OrderedDict
+
+import shopping_kernels
+from shopping_kernels import have_numpy, round_array
+
+SCALED_CACHE_SIZE = 16
+
+
+def format_quantity(quantity):
+    """Format a quantity the way the Cooking buttons show amounts"""
+    return str(round(quantity, 3)).rstrip('0').rstrip('.')
+
+
+class Recipe:
+    """A list of ingredients with quantities and units"""
+
+    def __init__(self, name, ingredients, servings=None):
+        self.name = name
+        self.names = [item[0] for item in ingredients]
+        self.units = [item[2] if len(item) > 2 else "" for item in ingredients]
+        self.servings = servings
+        quantities = [float(item[1]) for item in ingredients]
+        self.quantities = shopping_kernels.np.array(quantities) if have_numpy() else quantities
+        self._scaled = OrderedDict()
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def load(cls, path):
+        """Load a recipe from JSON or from CSV rows of name,quantity,unit"""
+        if path.lower().endswith(".json"):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            ingredients = [(item["name"], item["quantity"], item.get("unit", ""))
+                           for item in data["ingredients"]]
+            return cls(data.get("name", "Recipe"), ingredients, data.get("servings"))
+
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith("#")]
+        if rows and rows[0][0].strip().lower() == "name":
+            rows = rows[1:]
+        ingredients = [(row[0].strip(), row[1], row[2].strip() if len(row) > 2 else "") for row in rows]
+        return cls(os.path.basename(path).rsplit(".", 1)[0], ingredients)
+
+    def factor_for(self, scale=None, servings=None):
+        """Combine the Scale Factor and Servings fields into one factor"""
+        factor = scale if scale else 1.0
+        if servings and self.servings:
+            factor *= servings / self.servings
+        return factor
+
+    def scaled_quantities(self, factor):
+        """Return all quantities times factor, rounded to 3 decimals"""
+        return self.scaled(factor)[0]
+
+    def scaled(self, factor):
+        """Return (quantities, display lines) for a factor, cached per factor"""
+        cached = self._scaled.get(factor)
+        if cached is not None:
+            self._scaled.move_to_end(factor)
+            return cached
+
+        if have_numpy():
+            quantities = round_array(self.quantities * factor, 3).tolist()
+        else:
+            quantities = [round(q * factor, 3) for q in self.quantities]
+        lines = [f"{format_quantity(q)} {unit} {name}".replace("  ", " ")
+                 for q, unit, name in zip(quantities, self.units, self.names)]
+
+        cached = (quantities, lines)
+        self._scaled[factor] = cached
+        if len(self._scaled) > SCALED_CACHE_SIZE:
+            self._scaled.popitem(last=False)
+        return cached
+
+    def page(self, factor, page, page_size):
+        """Return the display lines of one page and the page count"""
+        lines = self.scaled(factor)[1]
+        pages = max(1, -(-len(lines) // page_size))
+        page = min(max(page, 0), pages - 1)
+        return lines[page * page_size:(page + 1) * page_size], pages
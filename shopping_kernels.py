@@ -0,0 +1,147 @@
+"""Shopping Tip/Tax/Split/Save rules for one receipt or whole arrays of them
+
+The *_one functions are the scalar rules used by the calculator. The array
+versions apply the same arithmetic to NumPy arrays in one pass and round to
+2 decimals exactly like Python's round(), so every element matches what the
+GUI shows for that amount. Without NumPy they fall back to the scalar rules.
+"""
+
+# NumPy is optional and only imported by the array versions, so the
+# calculator engine does not pay for it at startup
+np = None
+
+
+def have_numpy():
+    """Import NumPy on first use, returning False when it is not installed"""
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np is not False
+
+DEFAULT_TIP_PERCENT = 15
+DEFAULT_TAX_PERCENT = 8
+
+
+def tip_one(amount, tip_percent=DEFAULT_TIP_PERCENT):
+    """Return (tip, total) for one amount, rounded to 2 decimals"""
+    tip_amount = amount * (tip_percent / 100)
+    total = amount + tip_amount
+    return round(tip_amount, 2), round(total, 2)
+
+
+def tax_one(amount, tax_percent=DEFAULT_TAX_PERCENT):
+    """Return (tax, total) for one amount, rounded to 2 decimals"""
+    tax = amount * (tax_percent / 100)
+    total = amount + tax
+    return round(tax, 2), round(total, 2)
+
+
+def split_one(total, people):
+    """Return the share per person, rounded to 2 decimals"""
+    if people == 0:
+        raise ZeroDivisionError("Cannot split by 0 people")
+    return round(total / people, 2)
+
+
+def save_one(original, discount_pct):
+    """Return (saved, final price) for a discount percentage, rounded to 2 decimals"""
+    if discount_pct < 0 or discount_pct > 100:
+        raise ValueError("Discount must be 0-100%")
+    saved = original * (discount_pct / 100)
+    final_price = original - saved
+    return round(saved, 2), round(final_price, 2)
+
+
+def round_array(values, digits=2):
+    """Round an array to some decimals with the same result as Python's round()"""
+    have_numpy()
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.round(scaled) / scale
+
+    # np.round can only disagree when the scaled value sits on a .5 boundary
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+        near_tie = distance <= 4 * np.spacing(np.abs(scaled))
+    if near_tie.any():
+        flat_values = values.reshape(-1)
+        flat_rounded = rounded.reshape(-1)
+        for i in np.flatnonzero(near_tie):
+            flat_rounded[i] = round(float(flat_values[i]), digits)
+    return rounded
+
+
+def round2(values):
+    """Round an array to 2 decimals with the same result as Python's round()"""
+    return round_array(values, 2)
+
+
+NAN = float("nan")
+
+
+def _scalar_fallback(rule, failed, *columns):
+    """Apply a scalar rule element-wise when NumPy is missing"""
+    lists = [list(c) if hasattr(c, "__len__") else None for c in columns]
+    length = max((len(c) for c in lists if c is not None), default=1)
+    rows = zip(*[c if c is not None else [o] * length for c, o in zip(lists, columns)])
+    results = []
+    for row in rows:
+        try:
+            results.append(rule(*row))
+        except (ValueError, ZeroDivisionError):
+            results.append(failed)
+    return results
+
+
+def _unzip(pairs):
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+
+
+def tip(amounts, tip_percent=DEFAULT_TIP_PERCENT):
+    """Return (tips, totals) for an array of amounts"""
+    if not have_numpy():
+        return _unzip(_scalar_fallback(tip_one, (NAN, NAN), amounts, tip_percent))
+    amounts = np.asarray(amounts, dtype=np.float64)
+    tip_amounts = amounts * (np.asarray(tip_percent, dtype=np.float64) / 100)
+    totals = amounts + tip_amounts
+    return round2(tip_amounts), round2(totals)
+
+
+def tax(amounts, tax_percent=DEFAULT_TAX_PERCENT):
+    """Return (taxes, totals) for an array of amounts"""
+    if not have_numpy():
+        return _unzip(_scalar_fallback(tax_one, (NAN, NAN), amounts, tax_percent))
+    amounts = np.asarray(amounts, dtype=np.float64)
+    taxes = amounts * (np.asarray(tax_percent, dtype=np.float64) / 100)
+    totals = amounts + taxes
+    return round2(taxes), round2(totals)
+
+
+def split(totals, people):
+    """Return shares per person, NaN where people is 0"""
+    if not have_numpy():
+        return _scalar_fallback(split_one, NAN, totals, people)
+    totals = np.asarray(totals, dtype=np.float64)
+    people = np.asarray(people, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(people == 0, np.nan, totals / people)
+    return round2(shares)
+
+
+def save(originals, discount_pct):
+    """Return (saved, final prices), NaN where the discount is outside 0-100%"""
+    if not have_numpy():
+        return _unzip(_scalar_fallback(save_one, (NAN, NAN), originals, discount_pct))
+    originals = np.asarray(originals, dtype=np.float64)
+    discount_pct = np.asarray(discount_pct, dtype=np.float64)
+    saved = originals * (discount_pct / 100)
+    final_prices = originals - saved
+    invalid = (discount_pct < 0) | (discount_pct > 100)
+    saved = np.where(invalid, np.nan, saved)
+    final_prices = np.where(invalid, np.nan, final_prices)
+    return round2(saved), round2(final_prices)
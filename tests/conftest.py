@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+def _drain_until_idle(worker, timeout=5.0):
+    """Drain finished jobs until none are pending, failing after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while worker.busy:
+        assert time.monotonic() < deadline, f"jobs still pending: {worker.pending_labels()}"
+        worker.drain()
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def drain_until_idle():
+    """Wait for a BackgroundWorker's jobs and run their callbacks"""
+    return _drain_until_idle
+
+
+@pytest.fixture
+def gui():
+    """The GUI module with a headless display, an empty text cache and the mouse in a corner"""
+    import pygame
+    import Calculator
+    Calculator.init_display()
+    Calculator.text_cache.clear()
+    Calculator.session.switch_context("Standard")
+    Calculator.session.clear_display()
+    Calculator.invalidate_frame()
+    Calculator.update_hover((1, 1))
+    yield Calculator
+    Calculator.session.switch_context("Standard")
+    Calculator.session.clear_display()
+    pygame.quit()
+
+
+@pytest.fixture
+def standard_session():
+    """Standard mode with a clear display and fresh layouts"""
+    import Calculator
+    Calculator.clear_layout_cache()
+    Calculator.session.switch_context("Standard")
+    Calculator.session.clear_display()
+    yield Calculator.session
+    Calculator.session.switch_context("Standard")
+    Calculator.session.clear_display()
+    Calculator.update_hover(None)
+    Calculator.clear_layout_cache()
@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from background_worker import BackgroundWorker
+
+
+def test_callbacks_run_on_the_draining_thread():
+    """Results are handed back by drain(), not on the pool thread"""
+    worker = BackgroundWorker()
+    results = []
+    future = worker.submit(sum, [1, 2, 3], label="Adding",
+                           on_done=lambda result, error: results.append((result, error, threading.current_thread())))
+    future.result()
+    assert results == []
+    assert worker.drain() == 1
+    assert results == [(6, None, threading.current_thread())]
+    assert not worker.busy
+    worker.shutdown()
+
+
+def test_errors_are_passed_to_the_callback():
+    """A failing job reports its exception instead of raising in the loop"""
+    worker = BackgroundWorker()
+    errors = []
+    worker.submit(int, "x", on_done=lambda result, error: errors.append(error)).exception()
+    worker.drain()
+    assert isinstance(errors[0], ValueError)
+    worker.shutdown()
+
+
+def test_queue_is_bounded():
+    """Jobs beyond max_pending are refused until a slot frees up"""
+    worker = BackgroundWorker(io_workers=1, max_pending=2)
+    gate = threading.Event()
+    first = worker.submit(gate.wait, label="Saving")
+    second = worker.submit(gate.wait, label="Loading")
+    assert worker.submit(gate.wait) is None
+    assert worker.pending_labels() == ["Saving", "Loading"]
+
+    gate.set()
+    first.result()
+    second.result()
+    assert worker.submit(gate.wait) is not None
+    worker.shutdown()
+    assert worker.pending_labels() == []
+
+
+def test_cpu_jobs_run_in_a_process_pool():
+    """CPU-heavy jobs use separate processes, started on first use"""
+    worker = BackgroundWorker(cpu_workers=1)
+    assert worker.cpu_pool is None
+    results = []
+    worker.submit(pow, 2, 100, cpu=True, on_done=lambda result, error: results.append(result)).result(timeout=30)
+    assert worker.cpu_pool._mp_context.get_start_method() == "spawn"
+    worker.shutdown()
+    assert results == [2 ** 100]
+
+
+def test_gui_loads_recipe_in_the_background(tmp_path, drain_until_idle):
+    """The recipe appears once its job is drained, with a pending label meanwhile"""
+    import pygame
+    import Calculator
+
+    path = tmp_path / "pancakes.csv"
+    path.write_text("flour,200,g\nmilk,300,ml\n", encoding="utf-8")
+    saved = Calculator.session.recipe
+    try:
+        Calculator.init_display()
+        Calculator.load_recipe(str(path))
+        drain_until_idle(Calculator.worker)
+        assert Calculator.session.recipe.names == ["flour", "milk"]
+
+        Calculator.load_recipe(str(tmp_path / "missing.csv"))
+        drain_until_idle(Calculator.worker)
+        assert Calculator.session.error_message.startswith("Recipe error")
+    finally:
+        Calculator.session.recipe = saved
+        Calculator.session.clear_display()
+        pygame.quit()
+
+
+def test_gui_loads_in_place_when_the_queue_is_full(tmp_path, monkeypatch):
+    """A refused job is not dropped: the recipe is read on the spot"""
+    import Calculator
+
+    path = tmp_path / "pancakes.csv"
+    path.write_text("flour,200,g\n", encoding="utf-8")
+    full = BackgroundWorker(max_pending=0)
+    monkeypatch.setattr(Calculator, "worker", full)
+    saved = Calculator.session.recipe
+    try:
+        Calculator.load_recipe(str(path))
+        assert Calculator.session.recipe.names == ["flour"]
+        assert not full.busy
+
+        Calculator.load_recipe(str(tmp_path / "missing.csv"))
+        assert Calculator.session.error_message.startswith("Recipe error")
+    finally:
+        Calculator.session.recipe = saved
+        Calculator.session.clear_display()
+        full.shutdown()
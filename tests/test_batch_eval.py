@@ -0,0 +1,30 @@
+import io
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_eval import evaluate_line, run
+
+
+def test_each_line_is_a_fresh_session():
+    """Lines are evaluated independently, one result each"""
+    source = io.StringIO(
+        "5 + 3 =\n"
+        "\n"
+        "# comment\n"
+        "@Shopping field_0=200 field_1=4 Split\n"
+        "1 / 0 =\n"
+    )
+    out = io.StringIO()
+    stats = run(source, out, report=None)
+
+    assert out.getvalue().splitlines() == ["8", "50.0", "Error: Division by 0"]
+    assert stats["lines"] == 3
+    assert stats["presses"] == 9
+
+
+def test_context_and_fields():
+    """Mode switches and field values set up the session"""
+    assert evaluate_line("@Cooking 2 4 ½") == ("12", 3)
+    assert evaluate_line("@Budgeting field_2=1000 field_3=250 Goal") == ("25.0%", 1)
@@ -0,0 +1,92 @@
+import os
+import sys
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator_engine import CalculatorSession, button_type_for
+
+
+def press_all(session, labels):
+    for label in labels:
+        session.press(label)
+
+
+def test_engine_does_not_import_pygame():
+    """The engine can be used without pygame"""
+    code = "import sys, calculator_engine; sys.exit('pygame' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+
+def test_arithmetic_sequence():
+    """Buttons drive the same state machine as the GUI"""
+    session = CalculatorSession()
+    press_all(session, ["1", "2", "×", "3", "="])
+    assert session.current_input == "36"
+
+    session.press("C")
+    press_all(session, ["1", "0", "/", "0", "="])
+    assert session.error_message == "Error: Division by 0"
+
+
+def test_operator_chaining():
+    """A second operator evaluates the pending operation first"""
+    session = CalculatorSession()
+    press_all(session, ["9", "0", "-", "4", "0", "-"])
+    assert session.previous_input == "50.0"
+    assert session.current_operator == "-"
+
+
+def test_shopping_tip_and_split():
+    """Shopping kernels read the input fields"""
+    session = CalculatorSession("Shopping")
+    session.input_field_values["field_0"] = "200"
+    session.press("Tip")
+    assert session.current_input == "230.0"
+
+    session.input_field_values["field_0"] = "230"
+    session.input_field_values["field_1"] = "4"
+    session.press("Split")
+    assert session.current_input == "57.5"
+
+
+def test_homework_and_cooking_kernels():
+    """Homework and cooking kernels fall back to the display value"""
+    session = CalculatorSession("Homework")
+    press_all(session, ["3", "0", "sin"])
+    assert session.current_input == "0.5"
+
+    session = CalculatorSession("Cooking")
+    press_all(session, ["3", "½"])
+    assert session.current_input == "1.5"
+    assert session.input_field_values["field_3"] == "0.5"
+
+
+def test_budgeting_goal():
+    """Goal progress is shown as a percentage"""
+    session = CalculatorSession("Budgeting")
+    session.input_field_values["field_2"] = "1000"
+    session.input_field_values["field_3"] = "250"
+    session.press("Goal")
+    assert session.current_input == "25.0%"
+
+
+def test_pattern_detector_switches_context():
+    """Small additions are detected as shopping once the pattern holds"""
+    session = CalculatorSession()
+    changes = []
+    session.context_listeners.append(lambda calc, old, new: changes.append((old, new)))
+    press_all(session, ["5", "+", "3"])
+    assert session.current_context == "Standard"
+    press_all(session, ["2"])
+    assert session.current_context == "Shopping"
+    assert changes == [("Standard", "Shopping")]
+
+
+def test_button_types():
+    """Labels map to the same types as the GUI layout"""
+    assert button_type_for("Standard", "+") == "operator"
+    assert button_type_for("Standard", "C") == "c"
+    assert button_type_for("Shopping", "Tip") == "context_shopping"
+    assert button_type_for("Shopping", "7") == "number"
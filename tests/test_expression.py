@@ -0,0 +1,119 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression import ExpressionError, compile_expression, evaluate
+from calculator_engine import CalculatorSession
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 + 2 × 3", 7),
+    ("(1 + 2) * 3", 9),
+    ("-2^2", -4),
+    ("2^3^2", 512),
+    ("2 * -3", -6),
+    ("10 ÷ 4", 2.5),
+    ("√9 + 1", 4),
+    ("√(16) * 2", 8),
+    ("5²", 25),
+    ("2π / π", 2),
+    ("3(4 + 1)", 15),
+    ("sin(30) + cos(60)", 1),
+])
+def test_precedence_and_functions(text, expected):
+    """Operators follow normal precedence; trig functions use degrees"""
+    assert evaluate(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["1 / 0", "tan 90", "√(-1)", "4 -", "(1 + 2", "2 $ 3", "", "amount",
+                                  "1.2.3", "2 3", "(1..2)", "10^308*10", "(" * 2000 + "1" + ")" * 2000])
+def test_invalid_expressions(text):
+    """Errors surface as ExpressionError"""
+    with pytest.raises(ExpressionError):
+        evaluate(text)
+
+
+def test_compiled_expressions_are_cached_and_reusable():
+    """The same text compiles once and evaluates with new variable values"""
+    compiled = compile_expression("field_0 * (1 + field_1 / 100)")
+    assert compile_expression("field_0 * (1 + field_1 / 100)") is compiled
+    assert compiled.evaluate({"field_0": 200, "field_1": 15}) == pytest.approx(230)
+    assert compiled.evaluate({"field_0": 100, "field_1": 8}) == pytest.approx(108)
+
+
+def test_session_expression_mode():
+    """A parenthesis switches the display to expression entry"""
+    session = CalculatorSession()
+    for label in ["2", "+", "(", "3", "×", "4", ")", "^", "2", "="]:
+        session.press(label)
+    assert session.current_input == "146"
+    assert not session.expression_mode
+
+    session = CalculatorSession("Homework")
+    session.input_field_values["field_1"] = "9"
+    for label in ["(", "√", "9", ")", "x²", "="]:
+        session.press(label)
+    assert session.current_input == "9"
+
+
+def test_decimal_point_once_per_number_in_expressions():
+    """A second point in the same number is ignored, a new number may have its own"""
+    session = CalculatorSession()
+    for label in ["(", "1", ".", ".", "2", ")", "="]:
+        session.press(label)
+    assert session.current_input == "1.2"
+
+    session = CalculatorSession()
+    for label in ["(", "1", ".", "5", "+", "2", ".", "5", ")", "="]:
+        session.press(label)
+    assert session.current_input == "4"
+
+
+def test_overflow_and_deep_nesting_show_errors():
+    """Results that are not finite or too deeply nested become error messages"""
+    session = CalculatorSession()
+    assert session.evaluate_expression("10^308*10") is None
+    assert session.error_message == "Error: Result out of range"
+    assert session.evaluate_expression("(" * 2000 + "1" + ")" * 2000) is None
+    assert session.error_message.startswith("Error:")
+
+
+def test_keyboard_decimal_points_per_number(tmp_path, monkeypatch):
+    """Typing 1.5+2.5 in expression mode on the keyboard keeps both points"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import Calculator
+    from background_worker import BackgroundWorker
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Calculator, "worker", BackgroundWorker())
+    session = Calculator.session
+    listeners = (list(session.operation_listeners), list(session.context_listeners))
+    keys = [(pygame.K_9, "("), (pygame.K_1, "1"), (pygame.K_PERIOD, "."), (pygame.K_5, "5"),
+            (pygame.K_PLUS, "+"), (pygame.K_2, "2"), (pygame.K_PERIOD, "."), (pygame.K_PERIOD, "."),
+            (pygame.K_5, "5"), (pygame.K_0, ")")]
+    typed = []
+
+    def post_keys():
+        original_init()
+        for key, text in keys:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=text, mod=0))
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    def capture_close():
+        typed.append(session.current_input)
+        original_close()
+
+    original_init, original_close = Calculator.init_persistence, Calculator.close_persistence
+    monkeypatch.setattr(Calculator, "init_persistence", post_keys)
+    monkeypatch.setattr(Calculator, "close_persistence", capture_close)
+    try:
+        with pytest.raises(SystemExit):
+            Calculator.main(["--idle-after", "0"])
+    finally:
+        session.operation_listeners[:], session.context_listeners[:] = listeners
+        session.clear_display()
+    assert typed == ["(1.5+2.5)"]
@@ -0,0 +1,77 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from frame_pacer import FramePacer
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_goes_idle_after_quiet_interval():
+    """Idle starts idle_after seconds after the last input and ends on input"""
+    clock = FakeClock()
+    pacer = FramePacer(idle_after=2.0, clock=clock)
+    clock.now += 1.9
+    assert not pacer.idle()
+    clock.now += 0.2
+    assert pacer.idle()
+    pacer.note_input(woke=True)
+    assert not pacer.idle()
+
+
+def test_idle_can_be_disabled():
+    """With idle_after None the loop always polls"""
+    clock = FakeClock()
+    pacer = FramePacer(idle_after=None, clock=clock)
+    clock.now += 3600
+    assert not pacer.idle()
+
+
+def test_wake_latency_is_measured_once_per_wake():
+    """Only the first frame after an idle wake-up is recorded"""
+    clock = FakeClock()
+    pacer = FramePacer(idle_after=2.0, clock=clock)
+    assert pacer.frame_presented() is None
+
+    clock.now += 5
+    pacer.note_input(woke=True)
+    pacer.note_input(woke=True)  # more events from the same wake-up
+    clock.now += 0.004
+    assert abs(pacer.frame_presented() - 0.004) < 1e-9
+    assert pacer.frame_presented() is None
+
+    stats = pacer.wake_stats()
+    assert stats["count"] == 1
+    assert abs(stats["max_ms"] - 4.0) < 1e-6
+
+
+def test_idle_loop_blocks_until_the_next_event():
+    """next_events() waits while idle and returns queued input"""
+    import Calculator
+    pygame.display.init()
+    pygame.display.set_mode((10, 10))
+    try:
+        clock = FakeClock()
+        pacer = FramePacer(idle_after=1.0, wait_ms=50, clock=clock)
+        clock.now += 2
+        pygame.event.clear()
+        assert Calculator.next_events(pacer) == ([], True)
+
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_5, unicode="5"))
+        events, was_idle = Calculator.next_events(pacer)
+        assert was_idle
+        assert [event.type for event in events] == [pygame.KEYDOWN]
+    finally:
+        pygame.quit()
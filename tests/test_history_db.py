@@ -0,0 +1,135 @@
+import os
+import random
+import sqlite3
+import sys
+from collections import Counter
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_db import MAX_ROLLUP_SEQUENCE, HistoryDB
+
+
+def test_operations_are_batched(tmp_path):
+    """Operations are written once the batch is full"""
+    db = HistoryDB(str(tmp_path / "history.db"), batch_size=3)
+    db.record("Tip", "Shopping", "100")
+    db.record("Tax", "Shopping", "115")
+    assert db.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0] == 0
+
+    db.record("Split", "Shopping", "124.2")
+    assert db.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0] == 3
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close()
+
+
+def test_usage_per_mode_per_hour(tmp_path):
+    """Usage is grouped by local hour and context"""
+    db = HistoryDB(str(tmp_path / "history.db"))
+    nine = datetime(2025, 12, 28, 9, 15).timestamp()
+    ten = datetime(2025, 12, 28, 10, 5).timestamp()
+    db.record("sin", "Homework", timestamp=nine)
+    db.record("cos", "Homework", timestamp=nine + 60)
+    db.record("Tip", "Shopping", timestamp=nine + 120)
+    db.record("Tip", "Shopping", timestamp=ten)
+
+    assert db.usage_per_mode_per_hour() == [
+        ("2025-12-28 09:00", "Homework", 2),
+        ("2025-12-28 09:00", "Shopping", 1),
+        ("2025-12-28 10:00", "Shopping", 1),
+    ]
+    assert db.usage_per_mode_per_hour(since=ten) == [("2025-12-28 10:00", "Shopping", 1)]
+    db.close()
+
+
+def test_frequent_sequences(tmp_path):
+    """Consecutive operations are counted as sequences"""
+    db = HistoryDB(str(tmp_path / "history.db"))
+    for label in ["5", "+", "3", "=", "5", "+", "2", "=", "Tip"]:
+        db.record(label, "Standard")
+
+    top = db.frequent_sequences(length=2, limit=1)
+    assert top == [(("5", "+"), 2)]
+    assert db.frequent_sequences(length=3, limit=1) == [(("+", "2", "="), 1)]
+    assert db.frequent_sequences(length=2, context="Shopping") == []
+    db.close()
+
+
+def random_history(db, rows=3000, seed=3):
+    """Record operations spread over a few days and return them as (ts, context, operation)"""
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 1, 8, 30).timestamp()
+    history = []
+    for i in range(rows):
+        record = (start + i * 97.3, rng.choice(["Standard", "Shopping", "Cooking"]),
+                  rng.choice(["5", "+", "=", "Tip", "½"]))
+        db.record(record[2], record[1], timestamp=record[0])
+        history.append(record)
+    return history
+
+
+def test_rollups_match_a_full_scan(tmp_path):
+    """Hourly counts and sequences from the rollup tables equal counting every row"""
+    db = HistoryDB(str(tmp_path / "history.db"), batch_size=128)
+    history = random_history(db)
+
+    ranges = [(None, None), (history[100][0], None), (None, history[2000][0] + 5),
+              (history[500][0] + 1, history[510][0]), (history[700][0], history[1400][0])]
+    for since, until in ranges:
+        expected = Counter(
+            (datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:00"), context)
+            for ts, context, _ in history
+            if (since is None or ts >= since) and (until is None or ts < until))
+        assert db.usage_per_mode_per_hour(since, until) == [key + (n,) for key, n in sorted(expected.items())]
+
+    for length in range(1, MAX_ROLLUP_SEQUENCE + 1):
+        for context in (None, "Cooking"):
+            assert db.frequent_sequences(length, 15, context) == db._scan_sequences(length, 15, context)
+    db.close()
+
+
+def test_rollups_are_rebuilt_for_older_databases(tmp_path):
+    """A database without rollup tables gets them on open, and the sequence tails survive a reopen"""
+    path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE operations (id INTEGER PRIMARY KEY, ts REAL NOT NULL, "
+                 "context TEXT NOT NULL, operation TEXT NOT NULL, input TEXT NOT NULL DEFAULT '')")
+    conn.executemany("INSERT INTO operations (ts, context, operation) VALUES (?, ?, ?)",
+                     [(1000.0 + i, "Standard", label) for i, label in enumerate(["5", "+", "5", "+"])])
+    conn.commit()
+    conn.close()
+
+    db = HistoryDB(path)
+    assert db.frequent_sequences(length=2, limit=1) == [(("5", "+"), 2)]
+    db.close()
+
+    db = HistoryDB(path)
+    db.record("5", "Standard")
+    assert db.frequent_sequences(length=3) == [(("5", "+", "5"), 2), (("+", "5", "+"), 1)]
+    assert db.frequent_sequences(length=2) == db._scan_sequences(2, 10, None)
+    db.close()
+
+
+def test_batches_are_written_by_the_worker(tmp_path):
+    """maybe_flush hands the batch to submit; queries still see every operation"""
+    jobs = []
+    db = HistoryDB(str(tmp_path / "history.db"), submit=lambda job: jobs.append(job) or job)
+    db.record("Tip", "Shopping")
+    assert db.maybe_flush(now=db.last_flush + 10)
+    assert len(jobs) == 1 and len(db.queued) == 1
+    assert db.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0] == 0
+
+    jobs.pop()()
+    assert not db.queued
+    db.record("Tax", "Shopping")
+    assert db.count() == 2
+    db.close()
+
+
+def test_full_worker_queue_writes_in_place(tmp_path):
+    """When submit refuses the job the batch is written right away"""
+    db = HistoryDB(str(tmp_path / "history.db"), submit=lambda job: None)
+    db.record("Tip", "Shopping")
+    db.flush(background=True)
+    assert db.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0] == 1
+    db.close()
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from usage_store import UsageStore
+from history_journal import HistoryJournal, iter_journal
+
+
+def open_journal(tmp_path, **kwargs):
+    store = UsageStore(str(tmp_path / "context_data.json"))
+    return HistoryJournal(str(tmp_path / "journal.jsonl"), store, **kwargs)
+
+
+def test_events_are_appended_one_per_line(tmp_path):
+    """Each recorded operation becomes one journal line"""
+    journal = open_journal(tmp_path)
+    journal.record("Tip", "Shopping", "100")
+    journal.record("Split", "Shopping", "115")
+
+    events = list(iter_journal(journal.path))
+    assert [event[3] for event in events] == ["Tip", "Split"]
+    assert [event[0] for event in events] == [1, 2]
+
+
+def test_restart_replays_uncompacted_events(tmp_path):
+    """Events not yet folded into the summary are replayed on startup"""
+    journal = open_journal(tmp_path)
+    journal.record("sin", "Homework")
+    journal.record("cos", "Homework")
+    journal.file.close()  # Simulate a crash before any compaction
+
+    reopened = open_journal(tmp_path)
+    assert reopened.store.mode_usage == {"Homework": 2}
+    assert reopened.store.data["operation_usage"]["Homework"] == {"sin": 1, "cos": 1}
+    assert [event["operation"] for event in reopened.recent] == ["sin", "cos"]
+
+
+def test_compaction_folds_journal_into_summary(tmp_path):
+    """Compaction writes the summary and empties the journal"""
+    journal = open_journal(tmp_path, compact_every=3)
+    for _ in range(3):
+        journal.record("½", "Cooking")
+    journal.wait()
+
+    assert list(iter_journal(journal.path)) == []
+    assert not os.path.exists(journal.old_path)
+    with open(journal.store.path) as f:
+        summary = json.load(f)
+    assert summary["mode_usage"] == {"Cooking": 3}
+    assert summary["journal_seq"] == 3
+
+    journal.record("2×", "Cooking")
+    journal.close()
+    reopened = open_journal(tmp_path)
+    assert reopened.store.mode_usage == {"Cooking": 4}
+    assert reopened.seq == 4
+
+
+def test_partial_last_line_is_skipped(tmp_path):
+    """A torn write at the end of the journal does not break replay"""
+    journal = open_journal(tmp_path)
+    journal.record("Avg", "Budgeting")
+    journal.file.write('[2,1.0,"Budg')
+    journal.file.close()
+
+    reopened = open_journal(tmp_path)
+    assert reopened.store.mode_usage == {"Budgeting": 1}
+
+    reopened.record("Goal", "Budgeting")
+    assert [event[3] for event in iter_journal(reopened.path)] == ["Avg", "Goal"]
+
+
+def test_compaction_runs_on_a_background_worker(tmp_path):
+    """Summary writes go to the worker, and inline when its queue is full"""
+    from background_worker import BackgroundWorker
+
+    worker = BackgroundWorker(max_pending=1)
+    journal = open_journal(tmp_path, compact_every=2, submit=worker.submit)
+    journal.record("7", "Standard")
+    journal.record("+", "Standard")
+    journal.wait()
+    with open(journal.store.path) as f:
+        assert json.load(f)["journal_seq"] == 2
+
+    refused = open_journal(tmp_path, compact_every=1, submit=lambda func, *args: None)
+    refused.record("=", "Standard")
+    assert refused.compactor is None
+    with open(refused.store.path) as f:
+        assert json.load(f)["journal_seq"] == 3
+    journal.close()
+    refused.close()
+    worker.shutdown()
@@ -0,0 +1,67 @@
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from calculator_engine import CalculatorSession
+from history_ring import HistoryRing
+
+
+def test_ring_keeps_the_newest_records_in_order():
+    """Old records are overwritten once the ring is full"""
+    ring = HistoryRing(3)
+    for i in range(5):
+        ring.append(str(i), "Standard", f"in{i}")
+    assert len(ring) == 3
+    assert [record["operation"] for record in ring] == ["2", "3", "4"]
+    assert ring[-1]["input"] == "in4"
+    assert ring.operation_at(0) == "2"
+    assert [record["operation"] for record in ring.last(2)] == ["3", "4"]
+    with pytest.raises(IndexError):
+        ring[3]
+
+
+def test_times_materialize_as_iso_strings():
+    """Monotonic timestamps read back as wall-clock ISO times"""
+    ring = HistoryRing(10)
+    stamp = "2026-01-02T03:04:05.250000"
+    ring.extend([{"operation": "Tip", "time": stamp, "context": "Shopping", "input": "12"}])
+    ring.append("Tax", "Shopping")
+    assert ring[0] == {"operation": "Tip", "time": stamp, "context": "Shopping", "input": "12"}
+    assert abs(datetime.fromisoformat(ring[1]["time"]) - datetime.now()).total_seconds() < 5
+
+
+def test_session_records_presses():
+    """Each press lands in the session history"""
+    session = CalculatorSession("Homework")
+    session.press("7")
+    session.press("√")
+    assert [record["operation"] for record in session.context_history] == ["7", "√"]
+    assert session.context_history[1]["context"] == "Homework"
+    assert session.context_history[1]["input"] == "7"
+
+
+def test_full_ring_memory_stays_small():
+    """100k records with distinct inputs take under 3 MB"""
+    tracemalloc.start()
+    ring = HistoryRing(100_000)
+    for i in range(150_000):
+        ring.append("+-×/"[i % 4], "Standard", str(i * 7919)[:10])
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(ring) == 100_000
+    assert ring[-1]["input"] == str(149_999 * 7919)[:10]
+    assert size < 3 * 1024 * 1024
+
+
+def test_inputs_are_cut_at_a_character_boundary():
+    """Multi-byte symbols never leave half a character behind"""
+    ring = HistoryRing(2)
+    ring.append("√", "Homework", "√123456789")
+    ring.append("½", "Cooking", "½½½½½½½")
+    assert ring[0]["input"] == "√123456789"
+    assert ring[1]["input"] == "½½½½½½"
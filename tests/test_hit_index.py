@@ -0,0 +1,61 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+import Calculator
+from calculator_engine import CONTEXT_MODES
+from hit_index import HitIndex
+
+
+pytestmark = pytest.mark.usefixtures("standard_session")
+
+
+def test_lookup_matches_rect_tests():
+    """Every pixel resolves to the same widget as a linear scan"""
+    index = HitIndex(200, 100, cell_size=16)
+    rects = [pygame.Rect(5, 5, 40, 30), pygame.Rect(45, 5, 40, 30), pygame.Rect(150, 60, 50, 40)]
+    for i, rect in enumerate(rects):
+        index.add(rect, i)
+    for x in range(-5, 205, 3):
+        for y in range(-5, 105, 3):
+            expected = next((i for i, rect in enumerate(rects) if rect.collidepoint(x, y)), None)
+            assert index.lookup((x, y)) == expected
+
+
+def test_clicks_use_the_drawn_mode_buttons():
+    """Clicking the middle of any drawn mode button switches to that mode"""
+    for mode_name, rect in Calculator.get_mode_buttons():
+        Calculator.handle_click(rect.center)
+        assert Calculator.session.current_context == mode_name
+
+
+def test_clicks_reach_buttons_and_fields():
+    """Buttons and input fields are found through the index"""
+    buttons = Calculator.get_buttons_for_context()
+    seven = next(button for button in buttons if button["label"] == "7")
+    Calculator.handle_click(seven["rect"].center)
+    assert Calculator.session.current_input == "7"
+
+    Calculator.session.switch_context("Shopping")
+    field = Calculator.get_input_fields()["field_1"]
+    Calculator.handle_click(field["rect"].center)
+    assert Calculator.session.active_input_field == "field_1"
+    Calculator.handle_click((1, 1))
+    assert Calculator.session.active_input_field is None
+
+
+def test_hover_follows_context_switch():
+    """The hovered widget is looked up again when the layout changes"""
+    rect = dict(Calculator.get_mode_buttons())["Homework"]
+    Calculator.update_hover(rect.center)
+    assert Calculator.hovered_mode() == "Homework"
+
+    Calculator.session.switch_context("Cooking")
+    assert Calculator.hovered_mode() == "Homework"
+    assert Calculator.hovered_button() is None
+    assert set(CONTEXT_MODES) == {name for name, _ in Calculator.get_mode_buttons()}
@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import kernels
+from calculator_engine import CalculatorSession
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Start every test with empty kernel caches"""
+    kernels.cache_clear()
+    yield
+    kernels.cache_clear()
+
+
+def test_repeated_inputs_hit_the_cache():
+    """Equal inputs share one entry, whatever their numeric type"""
+    assert kernels.square(3) == (9.0, "9")
+    assert kernels.square(3.0) == (9.0, "9")
+    stats = kernels.square.memo.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_evicts_oldest_entry():
+    """The memo stays bounded and counts evictions"""
+    memo = kernels.KernelMemo(lambda key: key * 10, maxsize=2)
+    assert [memo(key) for key in (1, 2, 1, 3)] == [10.0, 20.0, 10.0, 30.0]
+    assert memo.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2}
+    # 2 was least recently used, so it is the one recomputed
+    memo(2)
+    assert memo.stats()["misses"] == 4
+
+
+def test_errors_are_not_cached():
+    """A failing kernel raises every time and stores nothing"""
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            kernels.square_root(-4)
+    stats = kernels.square_root.memo.stats()
+    assert stats["size"] == 0 and stats["evictions"] == 0
+    with pytest.raises(ValueError):
+        kernels.trig("tan", 90)
+
+
+def test_session_uses_kernels():
+    """Homework and Cooking presses go through the memoized kernels"""
+    session = CalculatorSession("Homework")
+    for _ in range(3):
+        session.input_field_values["field_0"] = "30"
+        session.press("sin")
+    assert session.current_input == "0.5"
+    assert kernels.trig.memo.stats()["hits"] == 2
+
+    session = CalculatorSession("Cooking")
+    session.input_field_values["field_2"] = "212"
+    session.press("°C/°F")
+    assert session.current_input == "100.0°C"
+    assert kernels.cache_stats()["total"]["misses"] == 2
@@ -0,0 +1,111 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency_trace import LatencyTracer, aggregate, main, read_traces
+
+
+def fake_clock(step_ns=1_000_000):
+    """A clock that advances 1 ms on every reading"""
+    now = [0]
+
+    def clock():
+        now[0] += step_ns
+        return now[0]
+    return clock
+
+
+def test_disabled_tracer_records_nothing():
+    """Without a path every hook is a no-op"""
+    tracer = LatencyTracer()
+    tracer.begin("KEYDOWN")
+    tracer.frame_started()
+    tracer.frame_rendered()
+    tracer.frame_presented(True)
+    assert tracer.pending == [] and tracer.buffer == []
+
+
+def test_trace_follows_event_to_frame(tmp_path):
+    """Stages run from dequeue through dispatch to the presented frame"""
+    path = tmp_path / "trace.jsonl"
+    tracer = LatencyTracer(str(path), clock=fake_clock())
+    tracer.begin("MOUSEBUTTONDOWN")      # 1 ms
+    tracer.dispatch_started("7")         # 2 ms
+    tracer.dispatched()                  # 3 ms
+    tracer.frame_started()               # handled 4 ms, render start 5 ms
+    tracer.frame_rendered()              # 6 ms
+    tracer.frame_presented(True)         # 7 ms
+    tracer.close()
+
+    [record] = list(read_traces([str(path)]))
+    assert record["label"] == "7" and record["changed"] is True
+    assert record["stages_ms"] == {"handle": 3.0, "dispatch": 1.0, "wait": 1.0,
+                                   "render": 1.0, "present": 1.0, "total": 6.0}
+
+
+def test_events_in_one_batch_share_the_frame(tmp_path):
+    """Two events handled before a frame both end at that frame"""
+    path = tmp_path / "trace.jsonl"
+    tracer = LatencyTracer(str(path), flush_every=2, clock=fake_clock())
+    tracer.begin("KEYDOWN")
+    tracer.begin("KEYDOWN")
+    tracer.frame_started()
+    tracer.frame_rendered()
+    tracer.frame_presented(False)
+    # Flushed by the batch size, before close()
+    records = list(read_traces([str(path)]))
+    assert [r["stages_ms"]["total"] for r in records] == [6.0, 4.0]
+    assert all(r["label"] is None and r["changed"] is False for r in records)
+
+
+def test_aggregate_across_sessions(tmp_path, capsys):
+    """Files from several sessions fold into per-stage percentiles"""
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"trace{i}.jsonl"
+        tracer = LatencyTracer(str(path), clock=fake_clock())
+        tracer.session = f"s{i}"
+        tracer.begin("KEYDOWN")
+        tracer.frame_started()
+        tracer.frame_rendered()
+        tracer.frame_presented(True)
+        tracer.close()
+        paths.append(str(path))
+
+    result = aggregate(read_traces(paths))
+    assert result["events"] == 2 and result["sessions"] == 2
+    assert result["stages"]["total"]["count"] == 2
+    assert result["stages"]["dispatch"]["count"] == 0
+
+    assert main(paths) == 0
+    assert "2 events from 2 sessions" in capsys.readouterr().out
+
+
+def test_gui_traces_a_button_click(tmp_path):
+    """A click through the GUI is traced up to display.update()"""
+    import pygame
+    import Calculator
+
+    saved = Calculator.tracer
+    path = tmp_path / "trace.jsonl"
+    try:
+        Calculator.tracer = LatencyTracer(str(path))
+        Calculator.init_display()
+        Calculator.session.switch_context("Standard")
+        Calculator.present_frame()
+        button = Calculator.get_buttons_for_context()[0]
+        Calculator.tracer.begin("MOUSEBUTTONDOWN")
+        Calculator.handle_click(button["rect"].center)
+        Calculator.present_frame()
+        Calculator.tracer.close()
+    finally:
+        Calculator.tracer = saved
+        Calculator.session.clear_display()
+        pygame.quit()
+
+    [record] = list(read_traces([str(path)]))
+    assert record["label"] == button["label"]
+    assert record["changed"] is True
+    assert record["stages_ms"]["total"] >= record["stages_ms"]["render"]
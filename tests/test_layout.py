@@ -0,0 +1,46 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import Calculator
+from calculator_engine import CONTEXT_MODES
+
+
+pytestmark = pytest.mark.usefixtures("standard_session")
+
+
+def test_layout_is_built_once_per_context():
+    """Repeated lookups return the very same button list"""
+    first = Calculator.get_buttons_for_context()
+    assert Calculator.get_buttons_for_context() is first
+
+    Calculator.session.current_context = "Shopping"
+    shopping = Calculator.get_buttons_for_context()
+    assert shopping is not first
+    assert "Tip" in [button["label"] for button in shopping]
+
+
+def test_warm_cache_matches_fresh_layouts():
+    """Prebuilt layouts equal a fresh build for every mode"""
+    Calculator.warm_layout_cache()
+    assert Calculator.session.current_context == "Standard"
+    for mode in CONTEXT_MODES:
+        Calculator.session.current_context = mode
+        cached = Calculator.get_buttons_for_context()
+        fresh = Calculator.build_buttons_for_context(mode)
+        assert [(b["label"], tuple(b["rect"]), b["type"]) for b in cached] == \
+               [(b["label"], tuple(b["rect"]), b["type"]) for b in fresh]
+        assert list(Calculator.get_input_fields()) == [field_id for field_id, _ in Calculator.session.field_labels()]
+
+
+def test_screen_size_change_gives_new_layout(monkeypatch):
+    """The screen size is part of the cache key"""
+    narrow = Calculator.get_buttons_for_context()
+    monkeypatch.setattr(Calculator, "SCREEN_WIDTH", Calculator.SCREEN_WIDTH + 100)
+    wide = Calculator.get_buttons_for_context()
+    assert wide is not narrow
+    assert wide[0]["rect"].width > narrow[0]["rect"].width
@@ -0,0 +1,152 @@
+import json
+import os
+import random
+import statistics
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from calculator_engine import CalculatorSession
+from ledger import LedgerStats, load_ledger, main
+
+
+def test_welford_matches_two_pass_statistics():
+    """Streaming updates and chunk merges agree with the textbook formulas"""
+    random.seed(7)
+    amounts = [random.uniform(-500, 5000) for _ in range(2000)]
+
+    single = LedgerStats()
+    for amount in amounts:
+        single.add(amount)
+    chunked = LedgerStats()
+    for start in range(0, len(amounts), 300):
+        chunked.add_many(amounts[start:start + 300])
+
+    for stats in (single, chunked):
+        assert stats.count == 2000
+        assert stats.mean == pytest.approx(statistics.fmean(amounts))
+        assert stats.variance == pytest.approx(statistics.variance(amounts))
+        assert stats.total == pytest.approx(sum(amounts))
+        assert (stats.min, stats.max) == (min(amounts), max(amounts))
+
+
+def test_csv_ledger_with_header_and_bad_rows(tmp_path):
+    """The amount column is found by name and unreadable rows are counted"""
+    path = tmp_path / "march.csv"
+    path.write_text('date,description,amount\n'
+                    '2024-03-01,"Rent, March",-300\n'
+                    '2024-03-02,Salary,1000\n'
+                    '\n'
+                    '2024-03-03,Typo,abc\n'
+                    '2024-03-04,Market,-50.5\n', encoding="utf-8")
+    stats = load_ledger(str(path), chunk_rows=2)
+    assert stats.name == "march"
+    assert stats.count == 3 and stats.skipped == 1
+    assert stats.total == pytest.approx(649.5)
+    assert stats.progress(1299) == pytest.approx(50.0)
+
+
+def test_headerless_csv_and_json_lines(tmp_path):
+    """Without a header the last column is used; JSON lines hold objects or numbers"""
+    csv_path = tmp_path / "plain.csv"
+    csv_path.write_text("a,10\nb,20\n", encoding="utf-8")
+    assert load_ledger(str(csv_path)).total == 30
+
+    jsonl_path = tmp_path / "ledger.jsonl"
+    jsonl_path.write_text('{"amount": 5}\n7.5\n{"note": "none"}\nnot json\n', encoding="utf-8")
+    stats = load_ledger(str(jsonl_path))
+    assert (stats.count, stats.total, stats.skipped) == (2, 12.5, 2)
+
+
+def test_json_array_ledger(tmp_path):
+    """A .json file is one array of objects or numbers, not JSON lines"""
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps([{"amount": 12.5}, {"amount": -2.5}, 40, {"note": "none"}, True], indent=2),
+                    encoding="utf-8")
+    stats = load_ledger(str(path), chunk_rows=2)
+    assert (stats.count, stats.total, stats.skipped) == (3, 50.0, 2)
+
+    path.write_text('{"amount": 5}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_ledger(str(path))
+
+
+def test_command_line_summary(tmp_path, capsys):
+    """The CLI prints the aggregates and goal progress as JSON"""
+    path = tmp_path / "ledger.csv"
+    path.write_text("amount\n100\n300\n", encoding="utf-8")
+    assert main([str(path), "--goal", "800"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["mean"] == 200 and summary["goal_progress"] == 50
+
+
+def test_command_line_rejects_ledger_without_amounts(tmp_path, capsys):
+    """Rows that were all skipped are an error, not an empty summary"""
+    path = tmp_path / "notes.csv"
+    path.write_text("amount\nn/a\nunknown\n", encoding="utf-8")
+    assert main([str(path)]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "no readable amounts in 2 rows" in captured.err
+
+
+def test_budgeting_shows_ledger_lines_and_suggestions():
+    """Budgeting lists the aggregates and goal progress against Target Goal"""
+    session = CalculatorSession()
+    session.ledger = LedgerStats("june")
+    session.ledger.add_many([100.0, 200.0, 300.0])
+    session.switch_context("Budgeting")
+    assert session.smart_suggestions[:2] == ["Avg 200.00", "Total 600"]
+
+    session.input_field_values["field_2"] = "1200"
+    lines = session.ledger_lines()
+    assert lines[0] == "june: 3 rows"
+    assert lines[-1] == "Goal progress 50.0%"
+    assert "Goal 50.0%" in session.ledger_suggestions()
+
+
+def test_gui_imports_ledger_in_a_worker_process(tmp_path, drain_until_idle):
+    """The import runs off the main loop and fills the Budgeting panel when drained"""
+    import pygame
+    import Calculator
+
+    path = tmp_path / "ledger.csv"
+    path.write_text("amount\n10\n20\n", encoding="utf-8")
+    session = Calculator.session
+    try:
+        Calculator.init_display()
+        session.switch_context("Budgeting")
+        Calculator.import_ledger(str(path))
+        drain_until_idle(Calculator.worker)
+        assert session.ledger.total == 30
+        assert session.smart_suggestions[0] == "Avg 15.00"
+        assert Calculator.panel_details() is Calculator.draw_ledger
+        Calculator.invalidate_frame()
+        assert Calculator.get_regions()["inputs"] in Calculator.render_frame()
+    finally:
+        session.ledger = None
+        session.switch_context("Standard")
+        pygame.quit()
+
+
+def test_gui_reports_ledger_without_amounts(tmp_path, drain_until_idle):
+    """An import whose rows were all skipped shows an error and keeps the old ledger"""
+    import pygame
+    import Calculator
+
+    path = tmp_path / "notes.jsonl"
+    path.write_text('{"note": "rent"}\n{"note": "food"}\n', encoding="utf-8")
+    session = Calculator.session
+    try:
+        Calculator.init_display()
+        Calculator.import_ledger(str(path))
+        drain_until_idle(Calculator.worker)
+        assert session.ledger is None
+        assert session.error_message == "Ledger error: no readable amounts in 2 rows"
+    finally:
+        session.ledger = None
+        session.clear_display()
+        pygame.quit()
@@ -0,0 +1,52 @@
+import os
+import sys
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import money
+from calculator_engine import CalculatorSession
+
+
+def test_tip_and_tax_are_exact_to_the_centime():
+    """Halves of a centime round up and totals add up exactly"""
+    assert money.tip_one(Decimal("2.30"), 15) == (Decimal("0.35"), Decimal("2.65"))
+    tax, total = money.tax_one(Decimal("1234567.89"), 8)
+    assert tax == Decimal("98765.43")
+    assert total == Decimal("1234567.89") + tax
+
+
+def test_repeated_increase_decrease_does_not_drift():
+    """Inc/Dec chains stay on whole centimes"""
+    value = Decimal("1000.00")
+    for _ in range(200):
+        value = money.decrease(money.increase(value, 10), 10)
+    assert value == value.quantize(money.CENTS)
+    assert value.as_tuple().exponent == -2
+
+
+def test_to_decimal_avoids_binary_noise():
+    """Floats convert through their shortest repr"""
+    assert money.to_decimal(0.1) == Decimal("0.1")
+    assert money.parse_money("abc") is None
+    assert money.parse_money("") is None
+
+
+def test_money_mode_in_session():
+    """Shopping and Budgeting show exact 2-decimal amounts in money mode"""
+    session = CalculatorSession("Shopping", money_mode=True)
+    session.input_field_values["field_0"] = "0.10"
+    session.input_field_values["field_2"] = "5"
+    session.press("Tip")
+    assert session.current_input == "0.11"
+
+    session = CalculatorSession("Budgeting", money_mode=True)
+    session.input_field_values["field_4"] = "0.01"
+    session.input_field_values["field_5"] = "0.02"
+    session.press("Avg")
+    assert session.current_input == "0.02"
+
+    session.input_field_values["field_0"] = "19.99"
+    session.input_field_values["field_1"] = "15"
+    session.press("Inc")
+    assert session.current_input == "22.99"
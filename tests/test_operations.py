@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import operations
+from calculator_engine import CONTEXT_MODES, LABEL_BUTTON_TYPES, CalculatorSession
+from operations import OPERATIONS, register_operation
+
+
+def test_every_context_button_has_an_operation():
+    """Each mode's buttons, besides C and Del, resolve to a registered operation"""
+    missing = [(context, label) for context, mode in CONTEXT_MODES.items() if context != "Standard"
+               for label in mode["buttons"]
+               if label not in LABEL_BUTTON_TYPES and (context, label) not in OPERATIONS]
+    # Shopping's % button has never done anything
+    assert missing == [("Shopping", "%")]
+
+
+def test_declared_fields_are_parsed_and_result_formatted():
+    """Handlers get parsed field values and return what the display shows"""
+    operation = OPERATIONS[("Shopping", "Split")]
+    assert operation.fields == ("field_0", "field_1")
+
+    session = CalculatorSession("Shopping")
+    session.input_field_values.update({"field_0": "100", "field_1": "3"})
+    session.active_input_field = "field_1"
+    session.press("Split")
+    assert session.current_input == "33.33"
+    assert session.active_input_field is None
+
+
+@pytest.fixture
+def scratch_operation():
+    """Register a throwaway Cooking operation and remove it afterwards"""
+    yield
+    OPERATIONS.pop(("Cooking", "Pinch"), None)
+
+
+def test_new_operations_register_without_touching_dispatch(scratch_operation):
+    """A decorated handler is reachable through press()"""
+    @register_operation("Cooking", "Pinch", fields=("field_0",), formatter=lambda session, grams: f"{grams:g} g")
+    def pinch(session, amount):
+        return (amount or 0) / 16
+
+    session = CalculatorSession("Cooking")
+    session.input_field_values["field_0"] = "8"
+    session.handle_button_click({"label": "Pinch", "type": "context_cooking"})
+    assert session.current_input == "0.5 g"
+
+
+def test_errors_are_reported_on_the_display():
+    """Exceptions from handlers become error messages"""
+    session = CalculatorSession("Homework")
+    session.current_input = "abc"
+    session.press("√")
+    assert session.error_message == "Invalid number format"
+    assert operations.lookup_operation("Homework", "√") is OPERATIONS[("Homework", "√")]
+
+
+def test_clearing_scaled_suggestions_leaves_later_sessions_alone():
+    """C empties this session's suggestions, not the shared Cooking table"""
+    session = CalculatorSession("Cooking")
+    for label in ("8", "½", "C"):
+        session.press(label)
+    assert session.smart_suggestions == []
+    assert operations.COOKING_SCALING["½"][2] == ("2×", "⅓", "¼")
+
+    fresh = CalculatorSession("Cooking")
+    fresh.press("8")
+    fresh.press("½")
+    assert fresh.smart_suggestions == ["2×", "⅓", "¼"]
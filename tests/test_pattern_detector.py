@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator_engine import CalculatorSession
+from pattern_detector import PatternDetector
+
+
+def test_counts_follow_the_window():
+    """Evicted presses are subtracted from the counts"""
+    detector = PatternDetector(window=3)
+    for label in ["sin", "1", "2", "3"]:
+        detector.push(label)
+    assert detector.count("sin") == 0
+    assert "sin" not in detector.counts
+    assert detector.recent(2) == ["2", "3"]
+    assert len(detector) == 3
+
+
+def test_large_window_matches_a_rescan():
+    """Counts over a long window equal counting the window from scratch"""
+    detector = PatternDetector(window=500)
+    labels = ["1", "+", "sin", "Tip", "/", "."]
+    for i in range(5000):
+        detector.push(labels[(i * 7) % len(labels)])
+    window = list(detector)
+    assert len(window) == 500
+    assert detector.counts == {label: window.count(label) for label in set(window)}
+
+
+def test_switch_needs_a_streak_and_a_cooldown():
+    """A candidate must win twice in a row, and not right after a switch"""
+    detector = PatternDetector(window=2, hold=2, cooldown=3)
+    detector.push("Tip")
+    assert detector.observe("Standard", "12", "5", "") is None
+    assert detector.observe("Standard", "12", "5", "") == "Shopping"
+
+    detector.push("sin")
+    detector.push("7")
+    # Still cooling down after the switch, so Cooking does not take over
+    assert detector.observe("Shopping", "1.5", "2", "") is None
+    assert detector.observe("Shopping", "1.5", "2", "") is None
+    detector.push("8")
+    assert detector.observe("Shopping", "1.5", "2", "") == "Cooking"
+
+
+def test_manual_switch_holds_off_detection():
+    """Choosing a mode clears the window and blocks an immediate auto switch"""
+    session = CalculatorSession(pattern_window=200)
+    session.switch_context("Homework")
+    for label in ["5", "+", "3", "2"]:
+        session.press(label)
+    assert session.current_context == "Homework"
+    assert session.calculation_pattern == ["5", "+", "3", "2"]
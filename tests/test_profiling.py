@@ -0,0 +1,86 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiling import BUCKET_EDGES, Histogram, Profiler, load_summary
+
+
+def test_histogram_percentiles_from_buckets():
+    """Percentiles land on the bucket edge covering that share of samples"""
+    histogram = Histogram()
+    for _ in range(90):
+        histogram.record(0.001)
+    for _ in range(10):
+        histogram.record(0.050)
+    assert histogram.count == 100
+    assert 1.0 <= histogram.percentile(0.50) * 1000 < 1.3
+    assert 50.0 <= histogram.percentile(0.95) * 1000 < 64.0
+    assert histogram.summary()["max_ms"] == 50.0
+    assert len(histogram.counts) == len(BUCKET_EDGES) + 1
+
+
+def test_disabled_profiler_leaves_functions_alone():
+    """Without profiling nothing is wrapped"""
+    def work():
+        return 42
+    profiler = Profiler()
+    assert profiler.wrap("work", work) is work
+    assert profiler.summary() == {}
+
+
+def test_wrapped_calls_are_recorded_and_dumped(tmp_path):
+    """Each call lands in the histogram, including ones that raise"""
+    class Target:
+        def ok(self):
+            return "done"
+
+        def fail(self):
+            raise ValueError("boom")
+
+    target = Target()
+    profiler = Profiler(enabled=True, path=str(tmp_path / "profile.json"))
+    profiler.instrument(target, ("ok", "fail"), prefix="target.")
+    assert target.ok() == "done"
+    try:
+        target.fail()
+    except ValueError:
+        pass
+
+    summary = load_summary(profiler.dump())
+    assert summary["target.ok"]["count"] == 1
+    assert summary["target.fail"]["count"] == 1
+    assert set(summary["target.ok"]) == {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+
+
+def test_gui_profiling_covers_draw_dispatch_and_overlay(tmp_path):
+    """The GUI times its draw functions and button presses, and draws the overlay"""
+    import pygame
+    import Calculator
+
+    saved = {name: getattr(Calculator, name) for name in Calculator.PROFILED_FUNCTIONS}
+    saved_profiler = Calculator.profiler
+    session = Calculator.session
+    try:
+        Calculator.init_profiling(str(tmp_path / "profile.json"))
+        Calculator.init_display()
+        Calculator.present_frame()
+        session.press("7")
+        Calculator.toggle_profile_overlay()
+        dirty = Calculator.present_frame()
+        assert dirty[-1] == Calculator.draw_profile_overlay()
+        Calculator.toggle_profile_overlay()
+
+        summary = load_summary(Calculator.profiler.dump())
+        for name in ("present_frame", "render_frame", "draw_display", "draw_buttons",
+                     "session.handle_button_click"):
+            assert summary[name]["count"] >= 1
+    finally:
+        for name, func in saved.items():
+            setattr(Calculator, name, func)
+        Calculator.profiler = saved_profiler
+        for name in ("handle_button_click", "update_context_history"):
+            vars(session).pop(name, None)
+        session.clear_display()
+        pygame.quit()
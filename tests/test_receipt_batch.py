@@ -0,0 +1,73 @@
+import io
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from receipt_batch import OUTPUT_HEADER, evaluate_chunk, main, run
+from shopping_kernels import save_one, split_one, tax_one, tip_one
+
+
+def receipts(count):
+    return "".join(f"{10 + i * 1.37:.2f},{i % 5 + 1},{i % 20},{i % 10},{i % 50}\n" for i in range(count))
+
+
+def evaluate(text, **kwargs):
+    out = io.StringIO()
+    stats = run(io.StringIO(text), out, report=None, **kwargs)
+    return out.getvalue().splitlines(), stats
+
+
+def test_rows_match_the_shopping_rules():
+    """Each output row agrees with the scalar rules used in Shopping mode"""
+    text, rows = evaluate_chunk([["123.45", "4", "18", "7.5", "25"]])
+    assert rows == 1
+    tip, with_tip = tip_one(123.45, 18)
+    tax, with_tax = tax_one(123.45, 7.5)
+    saved, final_price = save_one(123.45, 25)
+    expected = [123.45, tip, with_tip, tax, with_tax, split_one(123.45, 4), saved, final_price]
+    assert text == ",".join(f"{value:.2f}" for value in expected) + "\n"
+
+
+def test_defaults_header_and_invalid_rows():
+    """Missing columns use the defaults; unusable values leave empty cells"""
+    lines, stats = evaluate("amount,people,tip,tax,discount\n100\n50,0,,,150\nabc,2\n")
+    assert lines[0] == ",".join(OUTPUT_HEADER)
+    assert lines[1] == "100.00,15.00,115.00,8.00,108.00,100.00,0.00,100.00"
+    assert lines[2] == "50.00,7.50,57.50,4.00,54.00,,,"
+    assert lines[3] == ",,,,,,,"
+    assert stats["rows"] == 3
+
+
+def test_quoted_first_row_is_data_not_header():
+    """The first record is parsed as CSV before deciding whether it is a header"""
+    lines, stats = evaluate('"100.00","2","10","5","0"\n"50",1\n')
+    assert stats["rows"] == 2
+    assert lines[1].startswith("100.00,10.00,110.00,5.00,105.00,50.00,")
+
+
+def test_quoted_newline_stays_in_one_chunk():
+    """Chunks are cut between parsed rows, never inside a quoted field"""
+    text = '100,1\n"200\n",1\n300,1\n400,1\n'
+    for chunk_rows in (1, 2, 3):
+        lines, stats = evaluate(text, workers=1, chunk_rows=chunk_rows)
+        assert stats["rows"] == 4
+        assert [line.split(",")[0] for line in lines[1:]] == ["100.00", "200.00", "300.00", "400.00"]
+
+
+def test_parallel_output_matches_serial_in_order():
+    """Chunks fanned out to processes are merged back in input order"""
+    text = receipts(1000)
+    serial, _ = evaluate(text, workers=1, chunk_rows=1000)
+    parallel, stats = evaluate(text, workers=2, chunk_rows=64)
+    assert parallel == serial
+    assert stats["rows"] == 1000 and stats["chunks"] == 16
+
+
+def test_command_line(tmp_path):
+    """The CLI reads a file and writes the results file"""
+    source = tmp_path / "receipts.csv"
+    source.write_text(receipts(10), encoding="utf-8")
+    target = tmp_path / "results.csv"
+    assert main([str(source), "-o", str(target), "--workers", "1"]) == 0
+    assert len(target.read_text(encoding="utf-8").splitlines()) == 11
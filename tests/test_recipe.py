@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe import Recipe
+from calculator_engine import CalculatorSession
+
+
+def make_recipe(count=200):
+    ingredients = [(f"item {i}", 0.1 * i + 0.005, "g") for i in range(count)]
+    return Recipe("Catering", ingredients, servings=4)
+
+
+def test_scaling_matches_single_amount_rounding():
+    """Every ingredient is scaled and rounded like the Cooking buttons"""
+    recipe = make_recipe()
+    halves = recipe.scaled_quantities(0.5)
+    assert len(halves) == 200
+    for original, half in zip(recipe.quantities, halves):
+        assert half == round(float(original) * 0.5, 3)
+
+
+def test_scaled_views_are_cached_per_factor():
+    """Toggling between factors reuses the cached views"""
+    recipe = make_recipe()
+    first = recipe.scaled(0.5)
+    recipe.scaled(2.0)
+    assert recipe.scaled(0.5) is first
+
+
+def test_factor_combines_scale_and_servings():
+    """Servings are relative to the recipe's own servings"""
+    recipe = make_recipe()
+    assert recipe.factor_for() == 1.0
+    assert recipe.factor_for(2.0, 2) == 1.0
+    assert recipe.factor_for(None, 8) == 2.0
+
+
+def test_paging():
+    """Pages are clamped to the available range"""
+    recipe = make_recipe(20)
+    lines, pages = recipe.page(1.0, 2, 9)
+    assert pages == 3
+    assert len(lines) == 2
+    assert recipe.page(1.0, 10, 9)[0] == lines
+
+
+def test_load_csv_and_json(tmp_path):
+    """Recipes load from CSV rows or a JSON document"""
+    csv_path = tmp_path / "pancakes.csv"
+    csv_path.write_text("name,quantity,unit\nflour,250,g\nmilk,0.5,l\neggs,2,\n")
+    recipe = Recipe.load(str(csv_path))
+    assert recipe.name == "pancakes"
+    assert recipe.scaled(2.0)[1] == ["500 g flour", "1 l milk", "4 eggs"]
+
+    json_path = tmp_path / "soup.json"
+    json_path.write_text(json.dumps({"name": "Soup", "servings": 2,
+                                     "ingredients": [{"name": "water", "quantity": 1, "unit": "l"}]}))
+    assert Recipe.load(str(json_path)).scaled(1.0)[1] == ["1 l water"]
+
+
+def test_cooking_buttons_scale_loaded_recipe():
+    """Without an amount, the scale buttons set the recipe factor"""
+    session = CalculatorSession("Cooking")
+    session.recipe = Recipe("Cake", [("sugar", 300, "g"), ("butter", 90, "g")])
+    session.press("⅓")
+    assert session.error_message == ""
+    assert session.recipe_lines(9)[0] == ["100 g sugar", "30 g butter"]
@@ -0,0 +1,80 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+
+def test_first_frame_covers_the_whole_window(gui):
+    """Every region is drawn once and nothing when unchanged"""
+    dirty = gui.render_frame()
+    assert sorted(map(tuple, dirty)) == sorted(map(tuple, gui.get_regions().values()))
+    covered = sum(rect.width * rect.height for rect in dirty)
+    assert covered == gui.SCREEN_WIDTH * gui.SCREEN_HEIGHT
+    assert gui.render_frame() == []
+
+
+def test_typing_only_redraws_the_display(gui):
+    """A typed digit dirties the display region alone"""
+    gui.render_frame()
+    gui.session.current_input += "7"
+    assert gui.render_frame() == [gui.get_regions()["display"]]
+
+
+def test_hover_redraws_two_buttons(gui):
+    """Moving between buttons redraws the one left and the one entered"""
+    buttons = gui.get_buttons_for_context()
+    gui.update_hover(buttons[0]["rect"].center)
+    gui.render_frame()
+    gui.update_hover(buttons[1]["rect"].center)
+    assert gui.render_frame() == [buttons[0]["rect"], buttons[1]["rect"]]
+
+
+def test_partial_redraw_matches_full_redraw(gui):
+    """The retained frame looks exactly like a frame drawn from scratch"""
+    gui.render_frame()
+    gui.session.switch_context("Shopping")
+    gui.session.input_field_values["field_0"] = "100"
+    gui.session.press("Tip")
+    buttons = gui.get_buttons_for_context()
+    gui.update_hover(buttons[2]["rect"].center)
+    gui.render_frame()
+    partial = pygame.image.tostring(gui.screen, "RGB")
+
+    gui.invalidate_frame()
+    gui.render_frame()
+    assert pygame.image.tostring(gui.screen, "RGB") == partial
+
+
+def test_chrome_is_composed_once_per_context(gui, monkeypatch):
+    """Frames reuse the chrome until the context or window size changes"""
+    chrome = gui.get_chrome()
+    gui.session.current_input += "12"
+    gui.render_frame()
+    assert gui.get_chrome() is chrome
+
+    gui.session.switch_context("Budgeting")
+    budgeting = gui.get_chrome()
+    assert budgeting is not chrome
+
+    monkeypatch.setattr(gui, "SCREEN_HEIGHT", gui.SCREEN_HEIGHT + 10)
+    assert gui.get_chrome() is not budgeting
+
+
+def test_hovered_mode_button_and_active_field_are_overlaid(gui):
+    """Dynamic overlays on the chrome change the pixels they should"""
+    gui.render_frame()
+    mode_rect = dict(gui.get_mode_buttons())["Cooking"]
+    before = gui.screen.get_at(mode_rect.move(3, 3).topleft)
+
+    gui.update_hover(mode_rect.center)
+    assert gui.render_frame() == [gui.get_regions()["context"]]
+    assert gui.screen.get_at(mode_rect.move(3, 3).topleft) != before
+
+    gui.session.switch_context("Cooking")
+    field_rect = gui.get_input_fields()["field_0"]["rect"]
+    gui.session.active_input_field = "field_0"
+    gui.render_frame()
+    assert gui.screen.get_at(field_rect.move(5, 5).topleft)[:3] == gui.INPUT_BOX_ACTIVE_COLOR
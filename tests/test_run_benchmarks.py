@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import run_benchmarks
+
+
+def test_press_benchmark_covers_every_context():
+    """One round yields timings for each context"""
+    results = run_benchmarks.bench_presses(1)
+    assert set(results) == set(run_benchmarks.PRESS_SEQUENCES)
+    assert all(entry["median_us"] > 0 for entry in results.values())
+
+
+def test_compare_reports_relative_change():
+    """Shared timings are compared and metadata is skipped"""
+    baseline = {"meta": {"python": "3"}, "press": {"Standard": {"median_us": 10.0, "samples": 5}}}
+    current = {"meta": {"python": "3"}, "press": {"Standard": {"median_us": 12.0, "samples": 5}},
+               "startup": {"startup_to_first_frame_ms": 300.0}}
+    assert run_benchmarks.compare(current, baseline) == [("press.Standard.median_us", 10.0, 12.0, 20.0)]
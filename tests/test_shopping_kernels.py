@@ -0,0 +1,61 @@
+import os
+import sys
+import math
+import random
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shopping_kernels
+from shopping_kernels import tip, tax, split, save, tip_one, tax_one, split_one, save_one
+
+np = pytest.importorskip("numpy")
+
+# Amounts whose scaled value lands on or next to a .5 rounding boundary
+TIE_AMOUNTS = [0.125, 0.375, 1.005, 2.675, 1.115, 10.125, 1234567.895, 0.0, 99.99]
+
+
+def random_amounts(count=5000, seed=7):
+    rng = random.Random(seed)
+    amounts = [round(rng.uniform(0, 500000), rng.choice([0, 1, 2, 3])) for _ in range(count)]
+    return amounts + TIE_AMOUNTS
+
+
+def test_tip_and_tax_match_scalar_rules():
+    """Every element equals the scalar GUI result bit for bit"""
+    amounts = random_amounts()
+    for vector_rule, scalar_rule, percent in [(tip, tip_one, 15), (tip, tip_one, 17.5),
+                                              (tax, tax_one, 8), (tax, tax_one, 19.25)]:
+        parts, totals = vector_rule(np.array(amounts), percent)
+        for amount, part, total in zip(amounts, parts.tolist(), totals.tolist()):
+            assert (part, total) == scalar_rule(amount, percent)
+
+
+def test_split_and_save_match_scalar_rules():
+    """Invalid rows become NaN instead of raising"""
+    totals = random_amounts(500)
+    people = [i % 7 for i in range(len(totals))]
+    shares = split(totals, people).tolist()
+    for total, count, share in zip(totals, people, shares):
+        if count == 0:
+            assert math.isnan(share)
+        else:
+            assert share == split_one(total, count)
+
+    discounts = [(i % 130) - 10 for i in range(len(totals))]
+    saved, finals = save(totals, discounts)
+    for original, discount, s, f in zip(totals, discounts, saved.tolist(), finals.tolist()):
+        if 0 <= discount <= 100:
+            assert (s, f) == save_one(original, discount)
+        else:
+            assert math.isnan(s) and math.isnan(f)
+
+
+def test_scalar_fallback_without_numpy(monkeypatch):
+    """Without NumPy the array functions return lists from the scalar rules"""
+    monkeypatch.setattr(shopping_kernels, "np", False)
+    tips, totals = tip([100, 2.675], 15)
+    assert tips == [15.0, tip_one(2.675)[0]]
+    assert split([100, 100], [4, 0])[0] == 25.0
+    assert math.isnan(split([100], [0])[0])
@@ -0,0 +1,59 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_cache import TextCache
+
+
+class CountingFont:
+    """Stand-in font that counts how often text is rasterized"""
+
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, text, antialias, color):
+        self.renders += 1
+        return (text, color)
+
+
+def test_same_text_is_rendered_once():
+    """Repeated requests reuse the surface"""
+    font = CountingFont()
+    cache = TextCache()
+    first = cache.render(font, "Tip", (255, 255, 255))
+    assert cache.render(font, "Tip", (255, 255, 255)) is first
+    cache.render(font, "Tip", (255, 215, 0))
+    assert font.renders == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_is_bounded():
+    """Least recently used surfaces are evicted"""
+    font = CountingFont()
+    cache = TextCache(maxsize=2)
+    for text in ("a", "b", "a", "c"):
+        cache.render(font, text, (0, 0, 0))
+    assert [key[1] for key in cache.surfaces] == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_steady_state_frames_render_no_text(gui):
+    """After warming, drawing a context does not rasterize anything new"""
+    session = gui.session
+    session.context_listeners.append(gui.on_context_switch)
+    try:
+        session.switch_context("Shopping")
+        warmed = gui.text_cache.stats()["misses"]
+        for _ in range(3):
+            gui.draw_display()
+            gui.draw_context_panel()
+            gui.draw_input_panel()
+            gui.draw_buttons()
+        stats = gui.text_cache.stats()
+        assert stats["misses"] == warmed
+        assert stats["hits"] > 0
+    finally:
+        session.context_listeners.remove(gui.on_context_switch)
+        session.switch_context("Standard")
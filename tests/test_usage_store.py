@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from usage_store import UsageStore, load_context_file, atomic_write_json
+
+
+def test_counters_stay_in_memory_until_snapshot(tmp_path):
+    """Increments only mark the store dirty; a snapshot copies them and marks it clean"""
+    path = str(tmp_path / "context_data.json")
+    store = UsageStore(path)
+
+    store.increment("Shopping")
+    store.increment("Shopping")
+    assert store.dirty
+    assert not os.path.exists(path)
+
+    snapshot = store.take_snapshot()
+    assert snapshot["mode_usage"] == {"Shopping": 2}
+    assert not store.dirty
+    store.increment("Shopping")
+    assert snapshot["mode_usage"] == {"Shopping": 2}
+
+
+def test_store_resumes_from_saved_counts(tmp_path):
+    """A new store continues counting from the saved file"""
+    path = str(tmp_path / "context_data.json")
+    store = UsageStore(path)
+    store.increment("Cooking")
+    atomic_write_json(path, store.take_snapshot())
+
+    reloaded = UsageStore(path)
+    reloaded.increment("Cooking")
+    assert reloaded.mode_usage["Cooking"] == 2
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    """Temp files are renamed over the target"""
+    path = str(tmp_path / "context_data.json")
+    atomic_write_json(path, {"mode_usage": {"Standard": 1}})
+    assert os.listdir(tmp_path) == ["context_data.json"]
+
+
+def test_atomic_write_keeps_file_permissions(tmp_path):
+    """A new file gets the umask default, a replaced file keeps its mode"""
+    path = str(tmp_path / "context_data.json")
+    umask = os.umask(0)
+    os.umask(umask)
+    atomic_write_json(path, {})
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~umask
+
+    os.chmod(path, 0o640)
+    atomic_write_json(path, {"mode_usage": {}})
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+
+def test_corrupt_file_is_kept_aside(tmp_path):
+    """A truncated file is moved aside instead of being overwritten with zeros"""
+    path = str(tmp_path / "context_data.json")
+    with open(path, "w") as f:
+        f.write('{"mode_usage": {"Shop')
+
+    data = load_context_file(path)
+    assert data["mode_usage"] == {}
+    assert os.path.exists(path + ".bad")
@@ -0,0 +1,53 @@
+"""Cache of rendered text surfaces for the GUI
+
+font.render() rasterizes anti-aliased glyphs every time it is called, which
+is the most expensive part of drawing a frame. Almost all text on screen
+repeats from frame to frame, so rendered surfaces are kept in an LRU keyed
+by (font, text, color) and blitted again instead of rendered again.
+"""
+
+from collections import OrderedDict
+
+TEXT_CACHE_SIZE = 512
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces"""
+
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color):
+        """Return the anti-aliased surface for text, rendering it only once"""
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.surfaces[key] = font.render(text, True, color)
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def warm(self, items):
+        """Render (font, text, color) items ahead of the frames that draw them"""
+        for font, text, color in items:
+            self.render(font, text, color)
+
+    def stats(self):
+        """Return the counters as a dict"""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.surfaces), "maxsize": self.maxsize}
+
+    def clear(self):
+        """Drop every surface and reset the counters"""
+        self.surfaces.clear()
+        self.hits = self.misses = self.evictions = 0
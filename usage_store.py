@@ -0,0 +1,98 @@
+"""In-memory usage counters with batched, atomic persistence"""
+
+import copy
+import json
+import os
+import tempfile
+import time
+
+# Read once: os.umask() can only be queried by setting it, which is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def default_context_data():
+    """Return an empty context data document"""
+    return {"patterns": {}, "mode_usage": {}, "preferences": {}}
+
+
+def load_context_file(path):
+    """Load a context data document, falling back to an empty one"""
+    if not os.path.exists(path):
+        return default_context_data()
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        # Keep the unreadable file around instead of overwriting it on the next flush
+        try:
+            os.replace(path, path + ".bad")
+        except OSError:
+            pass
+        return default_context_data()
+
+    for key, value in default_context_data().items():
+        data.setdefault(key, value)
+    return data
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory, then rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(prefix=".context_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; keep the permissions a plain open() would give
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class UsageStore:
+    """Usage counters loaded once and flushed to disk in batches"""
+
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.data = load_context_file(path)
+        self.dirty = False
+        self.last_flush = time.monotonic()
+
+    @property
+    def mode_usage(self):
+        return self.data["mode_usage"]
+
+    def increment(self, context, amount=1):
+        """Count usage of a context mode in memory"""
+        usage = self.data["mode_usage"]
+        usage[context] = usage.get(context, 0) + amount
+        self.dirty = True
+
+    def apply_event(self, seq, context, operation):
+        """Fold one journaled operation into the summary counters"""
+        self.increment(context)
+        operations = self.data.setdefault("operation_usage", {}).setdefault(context, {})
+        operations[operation] = operations.get(operation, 0) + 1
+        self.data["journal_seq"] = seq
+
+    @property
+    def journal_seq(self):
+        return self.data.get("journal_seq", 0)
+
+    def take_snapshot(self, now=None):
+        """Return a copy of the summary to be written elsewhere and mark it clean"""
+        self.last_flush = time.monotonic() if now is None else now
+        self.dirty = False
+        return copy.deepcopy(self.data)